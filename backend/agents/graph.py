@@ -5,11 +5,13 @@ from agents.state import AgentState
 from agents.tools import (
     detect_user_lang,
     decide_pivot,
+    question_in,
     retrieve_evidence,
+    build_answer_evidence,
     llm_write_answer,
 )
 from api.deps import rag
-from api.helpers import translate_text  # same note: import from your helpers
+from utils.tracing import traced
 
 def retriever_node(state: AgentState) -> AgentState:
     contract_id = state.get("contract_id")
@@ -17,19 +19,17 @@ def retriever_node(state: AgentState) -> AgentState:
 
     user_lang = state.get("user_lang") or detect_user_lang(question)
 
-    # detect contract lang
+    # contract language is stored with the contract (O(1), includes "mixed")
     pivot_lang = "en"
     if contract_id:
-        bundle = rag.store.get(contract_id)
-        contract_lang = bundle["meta"][0].get("language", "en") if bundle and bundle.get("meta") else "en"
-        pivot_lang = decide_pivot(contract_lang)
-    else:
-        pivot_lang = "en"
+        pivot_lang = decide_pivot(rag.store.language(contract_id), user_lang)
 
-    contract_hits, law_hits = retrieve_evidence(contract_id, question, user_lang, pivot_lang)
+    translations = state.get("translations") or {}
+    contract_hits, law_hits = retrieve_evidence(contract_id, question, user_lang, pivot_lang, translations)
 
     state["user_lang"] = user_lang
     state["pivot_lang"] = pivot_lang
+    state["translations"] = translations
     state["contract_hits"] = contract_hits
     state["law_hits"] = law_hits
     return state
@@ -43,7 +43,8 @@ def analyst_node(state: AgentState) -> AgentState:
     user_lang = state["user_lang"]
     pivot_lang = state["pivot_lang"]
 
-    normalized = question if user_lang == pivot_lang else translate_text(question, source_lang=user_lang, target_lang=pivot_lang)
+    # reuses the pivot translation made during retrieval
+    normalized = question_in(question, user_lang, pivot_lang, state.get("translations"))
 
     state["answer_plan"] = {
         "normalized_question": normalized,
@@ -56,23 +57,31 @@ def writer_node(state: AgentState) -> AgentState:
     plan = state.get("answer_plan") or {}
     normalized = plan.get("normalized_question", state["question"])
 
+    evidence_lines, report = build_answer_evidence(
+        normalized,
+        state.get("contract_hits", []),
+        state.get("law_hits", []),
+    )
+
     final_answer = llm_write_answer(
         question=state["question"],
         user_lang=state["user_lang"],
         normalized_question=normalized,
         contract_hits=state.get("contract_hits", []),
         law_hits=state.get("law_hits", []),
+        evidence_lines=evidence_lines,
     )
 
+    state["evidence_report"] = report
     state["final_answer"] = final_answer
     return state
 
 def build_ask_graph():
     g = StateGraph(AgentState)
 
-    g.add_node("retriever", retriever_node)
-    g.add_node("analyst", analyst_node)
-    g.add_node("writer", writer_node)
+    g.add_node("retriever", traced("retriever", retriever_node))
+    g.add_node("analyst", traced("analyst", analyst_node))
+    g.add_node("writer", traced("writer", writer_node))
 
     g.set_entry_point("retriever")
     g.add_edge("retriever", "analyst")
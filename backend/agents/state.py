@@ -7,10 +7,12 @@ class AgentState(TypedDict, total=False):
     question: str
     user_lang: str              # "ar" / "en" / "ur" / "hi" / "tl"
     pivot_lang: str             # "ar" or "en" for retrieval
+    translations: Dict[str, str]  # question translated per language (memo)
 
     # Evidence
     contract_hits: List[Dict[str, Any]]
     law_hits: List[Dict[str, Any]]
+    evidence_report: Dict[str, Any]   # token budget report (before/after)
 
     # Analysis / Plan
     answer_plan: Dict[str, Any]
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# (content_hash, mode, strategy, topics, model, prompt_version) -> language-independent part
+BaseKey = Tuple[str, str, str, Tuple[str, ...], str, str]
+# (contract_id, base key, language): contracts with identical text keep separate entries
+EntryKey = Tuple[str, BaseKey, str]
+
+
+class SummaryCache:
+    """
+    LRU cache of finished summaries.
+
+    Key: contract_id + (contract content hash, mode, strategy, sorted
+    topics, model, prompt version) + language. Entries for the same base
+    key in other languages can be looked up with any_language() so a
+    summary can be translated instead of regenerated; only generated
+    (not translated) entries are used as translation sources.
+
+    Entries are dropped when their contract is re-indexed (invalidate()).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[EntryKey, Dict[str, Any]]" = OrderedDict()
+        self._by_contract: Dict[str, set] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "translated": 0, "invalidations": 0, "evictions": 0}
+
+    @staticmethod
+    def base_key(content_hash: str, mode: str, strategy: str, topics, model: str, prompt_version: str) -> BaseKey:
+        return (content_hash, mode, strategy, tuple(sorted(topics or [])), model, prompt_version)
+
+    def get(self, contract_id: str, base: BaseKey, lang: str) -> Optional[Dict[str, Any]]:
+        key = (contract_id, base, lang)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry["summary"]
+
+    def any_language(self, contract_id: str, base: BaseKey) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """
+        (language, summary) of a generated summary for the same request in
+        another language. Translated entries are skipped so errors don't chain.
+        """
+        with self._lock:
+            for (cid, b, lang), entry in reversed(self._entries.items()):
+                if cid == contract_id and b == base and not entry["translated"]:
+                    return lang, entry["summary"]
+        return None
+
+    def put(self, contract_id: str, base: BaseKey, lang: str, summary: Dict[str, Any], translated: bool = False) -> None:
+        with self._lock:
+            key = (contract_id, base, lang)
+            self._entries[key] = {"contract_id": contract_id, "summary": summary, "translated": translated}
+            self._entries.move_to_end(key)
+            self._by_contract.setdefault(contract_id, set()).add(key)
+            if translated:
+                self._stats["translated"] += 1
+
+            while len(self._entries) > self.max_entries:
+                old_key, old = self._entries.popitem(last=False)
+                self._by_contract.get(old["contract_id"], set()).discard(old_key)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, contract_id: str) -> None:
+        with self._lock:
+            keys = self._by_contract.pop(contract_id, set())
+            for key in keys:
+                self._entries.pop(key, None)
+            if keys:
+                self._stats["invalidations"] += len(keys)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+            stats["max_entries"] = self.max_entries
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        return stats
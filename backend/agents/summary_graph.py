@@ -1,20 +1,33 @@
 from __future__ import annotations
 
+import contextvars
 import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import TypedDict, List, Optional, Dict, Any, Set
-from security.pii import mask_hits_contract, mask_hits_law
 
 from langgraph.graph import StateGraph, END
+from openai import BadRequestError
 
-from api.constants import DEFAULT_TOPICS, TOPIC_QUERIES, SUPPORTED_UI_LANGS
+from api.constants import (
+    DEFAULT_TOPICS, TOPIC_QUERIES, SUPPORTED_UI_LANGS,
+    SUMMARY_EVIDENCE_TOKENS, SECTION_EVIDENCE_TOKENS, EVIDENCE_CONTRACT_SHARE,
+    SUMMARY_SCHEMA, SECTION_SCHEMA, OVERVIEW_SCHEMA,
+)
 from api.schemas import SummaryRequest
-from api.deps import rag, client
+from api.deps import rag, client, reranker
 from api.helpers import (
     build_contract_evidence,
     build_law_evidence,
-    format_contract_hits,
-    format_law_hits,
+    build_budgeted_evidence,
 )
+from agents.summary_cache import SummaryCache
+from agents.tools import decide_pivot
+from utils.json_recovery import strip_fences, loads_lenient, salvage_summary
+from utils.metrics import metrics
+from utils.tracing import traced, record_llm
 
 # UI topic -> classifier label (same as you used)
 TOPIC_TO_LABEL = {
@@ -29,6 +42,52 @@ TOPIC_TO_LABEL = {
     "Non-Compete": "non_compete",
 }
 
+SUMMARY_MODEL = "gpt-4o-mini"
+# bump whenever the summary prompts change (part of the cache key)
+SUMMARY_PROMPT_VERSION = "3"
+
+# clauses kept after cross-encoder reranking (vs 18 bi-encoder hits without it)
+RERANK_TOP_N = 10
+
+# map-reduce ("sections") strategy
+SECTION_WORKERS = 5         # concurrent section generations
+SECTION_RETRIES = 1         # extra attempts per failed section
+SECTION_K_CONTRACT = 5
+SECTION_K_LAW = 3
+
+# How often partial-JSON recovery saved a full regeneration
+_recovery_lock = threading.Lock()
+RECOVERY_STATS = {
+    "parsed": 0,                # valid JSON on first try
+    "recovered": 0,             # salvaged (+ missing sections re-requested)
+    "failed": 0,                # nothing salvageable -> BAD_JSON
+    "sections_rerequested": 0,
+}
+
+
+def _count(key: str, n: int = 1) -> None:
+    with _recovery_lock:
+        RECOVERY_STATS[key] += n
+
+
+logger = logging.getLogger("daleel.summary")
+
+# Finished summaries, dropped when the contract is re-indexed
+summary_cache = SummaryCache(max_entries=512)
+rag.store.subscribe(summary_cache.invalidate)
+metrics.register_collector("summary_cache", lambda: summary_cache.stats())
+
+
+def recovery_stats() -> dict:
+    with _recovery_lock:
+        stats = dict(RECOVERY_STATS)
+    broken = stats["recovered"] + stats["failed"]
+    stats["avoided_regeneration_rate"] = round(stats["recovered"] / broken, 4) if broken else None
+    return stats
+
+
+metrics.register_collector("summary_json", recovery_stats)
+
 
 class SummaryState(TypedDict, total=False):
     req: SummaryRequest
@@ -46,6 +105,11 @@ class SummaryState(TypedDict, total=False):
     law_hits: List[Dict[str, Any]]
 
     evidence_lines: List[str]
+    evidence_report: Dict[str, Any]
+
+    # map-reduce strategy: topic -> {"contract_hits", "law_hits"} / section dict
+    section_evidence: Dict[str, Dict[str, Any]]
+    sections: Dict[str, Dict[str, Any]]
 
     summary_obj: Dict[str, Any]
     error: str
@@ -60,9 +124,8 @@ def _prepare_node(state: SummaryState) -> SummaryState:
     req = state["req"]
 
     user_lang = _safe_lang(req.language)
-    bundle = rag.store.get(req.contract_id)
-    contract_lang = bundle["meta"][0].get("language", "en") if bundle and bundle.get("meta") else "en"
-    pivot_lang = "en" if contract_lang == "en" else "ar"
+    contract_lang = rag.store.language(req.contract_id)
+    pivot_lang = decide_pivot(contract_lang, user_lang)
 
     # focused vs full
     if req.mode == "focused":
@@ -84,6 +147,10 @@ def _prepare_node(state: SummaryState) -> SummaryState:
         queries = DEFAULT_TOPICS
         wanted_labels = None
 
+        if req.strategy == "sections":
+            # one section per known topic
+            topics = list(TOPIC_QUERIES)
+
     return {
         **state,
         "user_lang": user_lang,
@@ -119,8 +186,16 @@ def _retrieve_node(state: SummaryState) -> SummaryState:
                 h["_boosted"] = False
 
     contract_hits = sorted(contract_hits_raw, key=lambda x: x.get("score", 0), reverse=True)[:18]
-    
-    # 3) Law evidence
+
+    # 3) Optional cross-encoder rerank -> fewer, better clauses for the prompt
+    if reranker.enabled:
+        contract_hits = reranker.rerank(" ".join(queries), contract_hits, query_key="_topic_query")
+        if wanted_labels:
+            # keep the label boost: boosted clauses first, rerank order inside each group
+            contract_hits.sort(key=lambda x: bool(x.get("_boosted")), reverse=True)
+        contract_hits = contract_hits[:RERANK_TOP_N]
+
+    # 4) Law evidence
     pivot_lang = state.get("pivot_lang", "en")
     law_hits = build_law_evidence(queries, lang=pivot_lang, k_each=2, max_total=10) or []
 
@@ -180,11 +255,15 @@ def _build_evidence_node(state: SummaryState) -> SummaryState:
     if not contract_hits and not law_hits:
         return {**state, "error": "NO_EVIDENCE"}
 
-    evidence_lines: List[str] = []
-    evidence_lines += format_contract_hits(contract_hits)
-    evidence_lines += format_law_hits(law_hits)
+    evidence_lines, report = build_budgeted_evidence(
+        contract_hits,
+        law_hits,
+        query=" ".join(state.get("queries", [])),
+        max_tokens=SUMMARY_EVIDENCE_TOKENS,
+        contract_share=EVIDENCE_CONTRACT_SHARE,
+    )
 
-    return {**state, "evidence_lines": evidence_lines}
+    return {**state, "evidence_lines": evidence_lines, "evidence_report": report}
 
 
 
@@ -228,29 +307,305 @@ OUTPUT JSON STRUCTURE:
         + "\n".join(evidence_lines)
     )
 
-    resp = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
+    resp = _chat_json(
+        [
             {"role": "system", "content": system},
             {"role": "user", "content": user},
         ],
-        temperature=0.2,
+        SUMMARY_SCHEMA,
     )
-
-    raw = (resp.choices[0].message.content or "").strip()
-
-    # remove code fences if model adds them
-    if raw.startswith("```"):
-        raw = raw.replace("```json", "").replace("```", "").strip()
+    raw = resp.choices[0].message.content
 
     try:
-        obj = json.loads(raw)
+        obj = _parse_json(raw)
+        _count("parsed")
+        return {**state, "summary_obj": obj}
     except Exception:
+        pass
+
+    # Truncated / malformed: keep the complete parts, re-request only what is missing
+    obj = _recover_summary(state, raw)
+    if obj is None:
+        _count("failed")
         return {**state, "error": "BAD_JSON"}
 
+    _count("recovered")
     return {**state, "summary_obj": obj}
 
 
+def _recover_summary(state: SummaryState, raw: str) -> Optional[Dict[str, Any]]:
+    req = state["req"]
+    user_lang = state.get("user_lang", "en")
+    partial = salvage_summary(raw or "")
+    if not partial["sections"] and not partial["overview"]:
+        return None
+
+    sections = partial["sections"]
+    missing = [t for t in _evidenced_topics(state) if not _has_section(sections, t)]
+
+    if missing:
+        evidence = _collect_section_evidence(req.contract_id, missing, state.get("pivot_lang", "en"))
+        regenerated = _run_sections(evidence, user_lang)
+        _count("sections_rerequested", len(evidence))
+        sections = sections + [regenerated[t] for t in evidence if t in regenerated]
+
+    overview = partial["overview"] or _run_overview(sections, user_lang)
+
+    return {
+        "mode": req.mode,
+        "language": user_lang,
+        "overview": overview,
+        "sections": sections,
+    }
+
+
+# -------------------------
+# Map-reduce ("sections") strategy
+# -------------------------
+
+def _section_key(topic: str) -> str:
+    return topic.lower().replace(" ", "_").replace("-", "_")
+
+
+def _has_section(sections: List[Dict[str, Any]], topic: str) -> bool:
+    """
+    Exact key match after normalization; the topic's classifier label
+    (e.g. "contract_duration" for Duration) counts as the same key.
+    """
+    keys = {_section_key(topic)}
+    if TOPIC_TO_LABEL.get(topic):
+        keys.add(TOPIC_TO_LABEL[topic])
+    return any(_section_key(str(sec.get("key", ""))) in keys for sec in sections)
+
+
+def _evidenced_topics(state: SummaryState) -> List[str]:
+    """
+    Topics the summary call had evidence for: requested (focused) or known
+    (full) topics whose label is on at least one contract hit it was given.
+    Topics without a label mapping are kept. Sections the model left out
+    for lack of evidence are then not re-requested.
+    """
+    labels = {h.get("label") for h in state.get("contract_hits") or []}
+    topics = state.get("topics") or list(TOPIC_QUERIES)
+    return [t for t in topics if TOPIC_TO_LABEL.get(t) is None or TOPIC_TO_LABEL[t] in labels]
+
+
+def _parse_json(raw: str):
+    # remove code fences if model adds them
+    return loads_lenient(strip_fences(raw))
+
+
+# Structured outputs (json_schema) where the backend supports it. A rejected
+# schema falls back to plain JSON mode for that schema only, and strict mode
+# is tried again after STRUCTURED_RETRY_S.
+STRUCTURED_RETRY_S = 600.0
+_structured_off: Dict[str, float] = {}     # schema name -> monotonic time strict mode is retried
+_structured_lock = threading.Lock()
+
+
+def _chat_json(messages: List[Dict[str, str]], schema: Dict[str, Any], stage: str = "generate"):
+    with metrics.timer(stage, graph="summary"):
+        resp = _chat_json_call(messages, schema)
+    record_llm(resp)
+    return resp
+
+
+def _chat_json_call(messages: List[Dict[str, str]], schema: Dict[str, Any]):
+    name = schema.get("name", "")
+    with _structured_lock:
+        strict = time.monotonic() >= _structured_off.get(name, 0.0)
+    if strict:
+        try:
+            return client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=messages,
+                temperature=0.2,
+                response_format={"type": "json_schema", "json_schema": {**schema, "strict": True}},
+            )
+        except BadRequestError as e:
+            if "response_format" not in str(e) and "json_schema" not in str(e):
+                raise
+            with _structured_lock:
+                _structured_off[name] = time.monotonic() + STRUCTURED_RETRY_S
+            metrics.inc("summary_structured_fallback_total", schema=name)
+            logger.warning("structured output rejected for schema %s, plain JSON mode for %.0fs: %s",
+                           name, STRUCTURED_RETRY_S, e)
+
+    return client.chat.completions.create(
+        model=SUMMARY_MODEL,
+        messages=messages,
+        temperature=0.2,
+        response_format={"type": "json_object"},
+    )
+
+
+def _collect_section_evidence(contract_id: str, topics: List[str], pivot_lang: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Per-topic evidence with batched retrieval:
+    one encoder pass + one search for all topic queries (contract and law).
+    Topics without any evidence are left out.
+    """
+    queries = [TOPIC_QUERIES.get(t, t) for t in topics]
+
+    with metrics.timer("retrieve", scope="sections"):
+        contract_batches = rag.retrieve_contract_batch(contract_id, queries, k=SECTION_K_CONTRACT)
+        law_batches = rag.retrieve_law_batch(queries, lang=pivot_lang, k=SECTION_K_LAW)
+
+    section_evidence = {}
+    for topic, query, c_hits, l_hits in zip(topics, queries, contract_batches, law_batches):
+        label = TOPIC_TO_LABEL.get(topic)
+        if label:
+            # same label boost as the single-call path
+            for h in c_hits:
+                if h.get("label") == label:
+                    h["score"] = float(h.get("score", 0)) + 0.10
+            c_hits.sort(key=lambda x: x.get("score", 0), reverse=True)
+        if c_hits or l_hits:
+            section_evidence[topic] = {"query": query, "contract_hits": c_hits, "law_hits": l_hits}
+    return section_evidence
+
+
+def _retrieve_sections_node(state: SummaryState) -> SummaryState:
+    req = state["req"]
+    section_evidence = _collect_section_evidence(
+        req.contract_id, state.get("topics", []), state.get("pivot_lang", "en")
+    )
+    if not section_evidence:
+        return {**state, "error": "NO_EVIDENCE"}
+    return {**state, "section_evidence": section_evidence}
+
+
+def _generate_section(topic: str, evidence: Dict[str, Any], user_lang: str) -> Dict[str, Any]:
+    evidence_lines, _ = build_budgeted_evidence(
+        evidence["contract_hits"],
+        evidence["law_hits"],
+        query=evidence["query"],
+        max_tokens=SECTION_EVIDENCE_TOKENS,
+        contract_share=EVIDENCE_CONTRACT_SHARE,
+    )
+    key = _section_key(topic)
+
+    system = f"""
+You are writing ONE SECTION of a contract summary (not Q&A).
+
+STRICT RULES:
+- Output MUST be valid JSON only (no markdown, no extra text).
+- Write ALL text in language: {user_lang}.
+- Use ONLY the provided evidence snippets; cover only the topic: {topic}.
+- Every bullet MUST include at least one source:
+  - Contract: {{ "type": "contract", "id": "A015" }}
+  - Law: {{ "type": "law", "id": "Article 53" }}
+
+OUTPUT JSON STRUCTURE:
+{{
+  "key": "{key}",
+  "title": "...",
+  "bullets": [ {{ "text": "...", "sources": [{{"type":"contract","id":"A015"}}] }} ]
+}}
+""".strip()
+
+    resp = _chat_json(
+        [
+            {"role": "system", "content": system},
+            {"role": "user", "content": f"TOPIC: {topic}\n\n" + "\n".join(evidence_lines)},
+        ],
+        SECTION_SCHEMA,
+    )
+    obj = _parse_json(resp.choices[0].message.content)
+    if not isinstance(obj, dict) or not isinstance(obj.get("bullets"), list):
+        raise ValueError(f"Bad section JSON for {topic}")
+    obj["key"] = key
+    obj.setdefault("title", topic)
+    return obj
+
+
+def _generate_overview(sections: List[Dict[str, Any]], user_lang: str) -> List[Dict[str, Any]]:
+    system = f"""
+You are writing the OVERVIEW of a contract summary from its section bullets.
+
+STRICT RULES:
+- Output MUST be valid JSON only (no markdown, no extra text).
+- Write ALL text in language: {user_lang}.
+- 3 to 5 short items, each keeping the sources of the bullets it is based on.
+
+OUTPUT JSON STRUCTURE:
+{{ "overview": [ {{ "text": "...", "sources": [{{"type":"contract","id":"A015"}}] }} ] }}
+""".strip()
+
+    resp = _chat_json(
+        [
+            {"role": "system", "content": system},
+            {"role": "user", "content": json.dumps(sections, ensure_ascii=False)},
+        ],
+        OVERVIEW_SCHEMA,
+    )
+    obj = _parse_json(resp.choices[0].message.content)
+    overview = obj.get("overview") if isinstance(obj, dict) else None
+    if not isinstance(overview, list):
+        raise ValueError("Bad overview JSON")
+    return overview
+
+
+def _run_sections(section_evidence: Dict[str, Dict[str, Any]], user_lang: str) -> Dict[str, Dict[str, Any]]:
+    """
+    One small generation per topic, run concurrently.
+    Failed sections are retried on their own (SECTION_RETRIES times).
+    """
+    sections: Dict[str, Dict[str, Any]] = {}
+    pending = list(section_evidence)
+
+    with ThreadPoolExecutor(max_workers=SECTION_WORKERS) as pool:
+        for _ in range(1 + SECTION_RETRIES):
+            if not pending:
+                break
+            futures = {
+                # copy_context: section LLM calls count towards the calling node's trace span
+                t: pool.submit(contextvars.copy_context().run, _generate_section, t, section_evidence[t], user_lang)
+                for t in pending
+            }
+            pending = []
+            for t, fut in futures.items():
+                try:
+                    sections[t] = fut.result()
+                except Exception:
+                    pending.append(t)
+    return sections
+
+
+def _run_overview(sections: List[Dict[str, Any]], user_lang: str) -> List[Dict[str, Any]]:
+    if not sections:
+        return []
+    for _ in range(1 + SECTION_RETRIES):
+        try:
+            return _generate_overview(sections, user_lang)
+        except Exception:
+            continue
+    return []
+
+
+def _generate_sections_node(state: SummaryState) -> SummaryState:
+    """
+    Map: per-topic sections (concurrent). Reduce: overview + merge into SUMMARY_SCHEMA shape.
+    """
+    req = state["req"]
+    user_lang = state.get("user_lang", "en")
+    section_evidence = state.get("section_evidence", {})
+
+    sections = _run_sections(section_evidence, user_lang)
+    if not sections:
+        return {**state, "error": "BAD_JSON"}
+
+    ordered = [sections[t] for t in section_evidence if t in sections]
+
+    summary_obj = {
+        "mode": req.mode,
+        "language": user_lang,
+        "overview": _run_overview(ordered, user_lang),
+        "sections": ordered,
+    }
+    return {**state, "sections": sections, "summary_obj": summary_obj}
+
+
 def _finalize_node(state: SummaryState) -> SummaryState:
     # This node exists mainly to keep the graph clean.
     return state
@@ -259,20 +614,43 @@ def _finalize_node(state: SummaryState) -> SummaryState:
 def build_summary_graph():
     g = StateGraph(SummaryState)
 
-    g.add_node("prepare", _prepare_node)
-    g.add_node("retrieve", _retrieve_node)
-    g.add_node("coverage", _coverage_node)
-    g.add_node("build_evidence", _build_evidence_node)
-    g.add_node("generate", _generate_node)
-    g.add_node("finalize", _finalize_node)
+    g.add_node("prepare", traced("prepare", _prepare_node))
+    g.add_node("retrieve", traced("retrieve", _retrieve_node))
+    g.add_node("coverage", traced("coverage", _coverage_node))
+    g.add_node("build_evidence", traced("build_evidence", _build_evidence_node))
+    g.add_node("generate", traced("generate", _generate_node))
+    g.add_node("retrieve_sections", traced("retrieve_sections", _retrieve_sections_node))
+    g.add_node("generate_sections", traced("generate_sections", _generate_sections_node))
+    g.add_node("finalize", traced("finalize", _finalize_node))
 
     g.set_entry_point("prepare")
 
     # If topics missing in focused mode -> stop early
     def route_after_prepare(state: SummaryState):
-        return END if state.get("error") == "NO_TOPICS" else "retrieve"
+        if state.get("error") == "NO_TOPICS":
+            return END
+        return "retrieve_sections" if state["req"].strategy == "sections" else "retrieve"
+
+    g.add_conditional_edges(
+        "prepare",
+        route_after_prepare,
+        {"retrieve": "retrieve", "retrieve_sections": "retrieve_sections", END: END},
+    )
+
+    # map-reduce path: prepare -> retrieve_sections -> generate_sections -> finalize
+    def route_after_sections(state: SummaryState):
+        return END if state.get("error") else "generate_sections"
+
+    g.add_conditional_edges(
+        "retrieve_sections", route_after_sections, {"generate_sections": "generate_sections", END: END}
+    )
 
-    g.add_conditional_edges("prepare", route_after_prepare, {"retrieve": "retrieve", END: END})
+    def route_after_generate_sections(state: SummaryState):
+        return END if state.get("error") else "finalize"
+
+    g.add_conditional_edges(
+        "generate_sections", route_after_generate_sections, {"finalize": "finalize", END: END}
+    )
 
     g.add_edge("retrieve", "coverage")
     g.add_edge("coverage", "build_evidence")
@@ -297,11 +675,68 @@ def build_summary_graph():
 SUMMARY_GRAPH = build_summary_graph()
 
 
+def _translate_summary(summary_obj: Dict[str, Any], source_lang: str, target_lang: str) -> Optional[Dict[str, Any]]:
+    """
+    Derive a cached summary in another UI language (one small call instead
+    of retrieval + full generation). Returns None if the result looks off.
+    """
+    system = f"""
+Translate this CONTRACT SUMMARY JSON from {source_lang} to {target_lang}.
+
+STRICT RULES:
+- Output MUST be valid JSON only (no markdown, no extra text).
+- Translate ONLY the "text" and "title" values.
+- Keep every key, section "key" value and every source unchanged.
+- Set "language" to "{target_lang}".
+""".strip()
+
+    try:
+        resp = _chat_json(
+            [
+                {"role": "system", "content": system},
+                {"role": "user", "content": json.dumps(summary_obj, ensure_ascii=False)},
+            ],
+            SUMMARY_SCHEMA,
+            stage="translate",
+        )
+        obj = _parse_json(resp.choices[0].message.content)
+    except Exception:
+        return None
+
+    if not isinstance(obj, dict) or len(obj.get("sections") or []) != len(summary_obj.get("sections") or []):
+        return None
+    obj["mode"] = summary_obj.get("mode")
+    obj["language"] = target_lang
+    return obj
+
+
 def run_summary(req: SummaryRequest) -> dict:
+    user_lang = _safe_lang(req.language)
+
+    content_hash = rag.store.content_hash(req.contract_id)
+    base = None
+    if content_hash:
+        base = SummaryCache.base_key(
+            content_hash, req.mode, req.strategy,
+            req.topics if req.mode == "focused" else None,
+            SUMMARY_MODEL, SUMMARY_PROMPT_VERSION,
+        )
+        cached = summary_cache.get(req.contract_id, base, user_lang)
+        if cached is not None:
+            return {"summary": cached, "contract_id": req.contract_id, "language": user_lang}
+
+        # Same summary cached in another language -> translate it
+        other = summary_cache.any_language(req.contract_id, base)
+        if other is not None:
+            translated = _translate_summary(other[1], other[0], user_lang)
+            if translated is not None:
+                summary_cache.put(req.contract_id, base, user_lang, translated, translated=True)
+                return {"summary": translated, "contract_id": req.contract_id, "language": user_lang}
+
     state: SummaryState = {"req": req}
     out = SUMMARY_GRAPH.invoke(state)
 
-    user_lang = out.get("user_lang", _safe_lang(req.language))
+    user_lang = out.get("user_lang", user_lang)
     if out.get("error") == "NO_TOPICS":
         msg_map = {
             "ar": "اختر موضوعًا واحدًا على الأقل للتلخيص المركز.",
@@ -332,4 +767,7 @@ def run_summary(req: SummaryRequest) -> dict:
         }
         return {"summary": msg_map.get(user_lang, msg_map["en"]), "contract_id": req.contract_id, "language": user_lang}
 
+    if base is not None:
+        summary_cache.put(req.contract_id, base, user_lang, out["summary_obj"])
+
     return {"summary": out["summary_obj"], "contract_id": req.contract_id, "language": user_lang}
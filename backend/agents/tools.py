@@ -2,14 +2,16 @@ from __future__ import annotations
 from typing import List, Dict, Any, Optional
 import re
 from security.pii import mask_hits_contract, mask_hits_law
+from utils.metrics import metrics
+from utils.tracing import record_llm
 
-from api.deps import rag, client
+from api.deps import rag, client, reranker
 from rag.engine import detect_lang
+from api.constants import ASK_EVIDENCE_TOKENS, EVIDENCE_CONTRACT_SHARE
 from api.helpers import (
     translate_text,   # if you moved it elsewhere adjust import
     ui_format_rules,
-    format_contract_hits,
-    format_law_hits,
+    build_budgeted_evidence,
     merge_hits,
     dedupe_hits,
 )
@@ -18,62 +20,105 @@ def detect_user_lang(question: str) -> str:
     # simple + reliable: Arabic script => ar, else en
     return detect_lang(question)
 
-def decide_pivot(contract_lang: str) -> str:
-    # If contract is mixed, we still pivot to en for law by default (your old logic)
+def decide_pivot(contract_lang: str, user_lang: Optional[str] = None) -> str:
+    """
+    Retrieval pivot ("ar"/"en"): the contract language, or for mixed
+    contracts the user's language when it is ar/en (no translation needed).
+    """
+    if contract_lang == "mixed":
+        return user_lang if user_lang in ("ar", "en") else "en"
     return "en" if contract_lang == "en" else "ar"
 
+
+def question_in(question: str, user_lang: str, target_lang: str, translations: Optional[dict] = None) -> str:
+    """
+    The question in target_lang, translating at most once per language
+    (results are memoized in `translations`, shared across graph nodes).
+    """
+    if target_lang == user_lang:
+        return question
+    if translations is None:
+        translations = {}
+    if target_lang not in translations:
+        translations[target_lang] = translate_text(question, source_lang=user_lang, target_lang=target_lang)
+    return translations[target_lang]
+
+
 def retrieve_evidence(
     contract_id: Optional[str],
     question: str,
     user_lang: str,
     pivot_lang: str,
+    translations: Optional[dict] = None,
 ) -> tuple[list[dict], list[dict]]:
     """
     Returns (contract_hits, law_hits)
+
+    Only mixed contracts need the question in both ar and en; everything
+    else (contract, law, rerank) uses the pivot translation.
     """
-    
+    if translations is None:
+        translations = {}
+    q_pivot = question_in(question, user_lang, pivot_lang, translations)
+
     contract_hits = []
+    pii_stats_c = {}
     if contract_id:
-        bundle = rag.store.get(contract_id)
-        contract_lang = bundle["meta"][0].get("language", "en") if bundle and bundle.get("meta") else "en"
-
-        # bilingual retrieval for mixed contracts (same idea as your existing /ask)
-        q_ar = question if user_lang == "ar" else translate_text(question, source_lang=user_lang, target_lang="ar")
-        q_en = question if user_lang == "en" else translate_text(question, source_lang=user_lang, target_lang="en")
-
-        if contract_lang == "mixed":
-            hits_ar = rag.retrieve_contract(contract_id, q_ar, k=6) or []
-            hits_en = rag.retrieve_contract(contract_id, q_en, k=6) or []
-            contract_hits = merge_hits(hits_ar, hits_en, max_total=12)
-        else:
-            q_pivot = q_en if pivot_lang == "en" else q_ar
-            contract_hits = rag.retrieve_contract(contract_id, q_pivot, k=12) or []
+        contract_lang = rag.store.language(contract_id)
+
+        with metrics.timer("retrieve", scope="contract"):
+            if contract_lang == "mixed":
+                # bilingual retrieval for mixed contracts
+                q_ar = question_in(question, user_lang, "ar", translations)
+                q_en = question_in(question, user_lang, "en", translations)
+                # one encoder pass; each query searches its own language partition
+                hits = rag.retrieve_contract_multi(contract_id, {"ar": q_ar, "en": q_en}, k=6)
+                contract_hits = merge_hits(hits["ar"], hits["en"], max_total=12)
+            else:
+                contract_hits = rag.retrieve_contract(contract_id, q_pivot, k=12) or []
 
         # extra safety: dedupe
         contract_hits = sorted(dedupe_hits(contract_hits), key=lambda x: x.get("score", 0), reverse=True)[:12]
 
+        # optional cross-encoder rerank (falls back to bi-encoder order on budget)
+        if reranker.enabled:
+            with metrics.timer("rerank"):
+                contract_hits = reranker.rerank(q_pivot, contract_hits, top_n=8)
 
-        # ✅ PII MASKING for CONTRACT hits (right here)
+        # ✅ PII MASKING for CONTRACT hits (no-op for clauses redacted at upload)
         contract_hits, pii_stats_c = mask_hits_contract(contract_hits)
 
-        # law retrieval
-        q_law = question if user_lang == pivot_lang else translate_text(
-            question, source_lang=user_lang, target_lang=pivot_lang
-        )
-        law_hits = rag.retrieve_law(q_law, lang=pivot_lang, k=10) or []
+    # law retrieval (pivot question, already translated above)
+    with metrics.timer("retrieve", scope="law"):
+        law_hits = rag.retrieve_law(q_pivot, lang=pivot_lang, k=10) or []
 
-        # ✅ PII MASKING for LAW hits (right here)
-        law_hits, pii_stats_l = mask_hits_law(law_hits)
+    # ✅ PII MASKING for LAW hits (no-op: law text is redacted at load, see api/deps)
+    law_hits, pii_stats_l = mask_hits_law(law_hits)
 
-        # Optional: log stats for debugging + report evidence
-        try:
-            total = {k: pii_stats_c.get(k, 0) + pii_stats_l.get(k, 0) for k in pii_stats_l}
-            print("[SECURITY] PII masked:", total)
-        except Exception:
-            pass
+    for kind in set(pii_stats_c) | set(pii_stats_l):
+        n = pii_stats_c.get(kind, 0) + pii_stats_l.get(kind, 0)
+        if n:
+            metrics.inc("pii_masked_total", n, kind=kind, stage="retrieve")
 
     return contract_hits, law_hits
-\
+
+
+def build_answer_evidence(
+    normalized_question: str,
+    contract_hits: list[dict],
+    law_hits: list[dict],
+) -> tuple[list[str], dict]:
+    """
+    Token-budgeted evidence lines for the writer + tokens before/after report.
+    """
+    return build_budgeted_evidence(
+        contract_hits,
+        law_hits,
+        query=normalized_question,
+        max_tokens=ASK_EVIDENCE_TOKENS,
+        contract_share=EVIDENCE_CONTRACT_SHARE,
+    )
+
 
 def llm_write_answer(
     question: str,
@@ -81,11 +126,11 @@ def llm_write_answer(
     normalized_question: str,
     contract_hits: list[dict],
     law_hits: list[dict],
+    evidence_lines: Optional[list[str]] = None,
 ) -> str:
-    # Build evidence blocks (same as your existing /ask)
-    evidence_lines = []
-    evidence_lines += format_contract_hits(contract_hits)
-    evidence_lines += format_law_hits(law_hits)
+    # Build evidence blocks (budgeted) unless the caller already did
+    if evidence_lines is None:
+        evidence_lines, _ = build_answer_evidence(normalized_question, contract_hits, law_hits)
 
     system = ui_format_rules(user_lang)
 
@@ -95,12 +140,14 @@ def llm_write_answer(
 
     user = f"USER QUESTION (normalized for retrieval):\n{normalized_question}\n\n" + "\n".join(evidence_lines)
 
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=[{"role": "system", "content": system},
-               {"role": "user", "content": user}],
-        temperature=0.2
-    )
+    with metrics.timer("generate", graph="ask"):
+        resp = client.responses.create(
+            model="gpt-4o-mini",
+            input=[{"role": "system", "content": system},
+                   {"role": "user", "content": user}],
+            temperature=0.2
+        )
+    record_llm(resp)
 
     # Remove any forbidden “insufficient evidence” lines (same as your ask cleanup)
     final_answer = (resp.output_text or "").strip()
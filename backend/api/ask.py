@@ -3,45 +3,45 @@ from fastapi import APIRouter
 from api.schemas import AskRequest, GeneralAskRequest
 from api.constants import SUPPORTED_UI_LANGS
 
-from fastapi import Request
 from security.pii import mask_hits_contract, mask_hits_law
 from security.guardrails import validate_question
-from security.rate_limit import limiter
-from api.deps import rag, client
+from api.deps import rag, client, answer_cache
 from api.helpers import (
     translate_text, ui_format_rules, detect_user_lang_llm,
     format_contract_hits, format_law_hits,
     dedupe_hits, merge_hits
 )
 from rag.engine import detect_lang
+from utils.metrics import metrics
+from utils.tracing import start_trace
 router = APIRouter(tags=["ask"])
 
 from agents.graph import ASK_GRAPH
 
 @router.post("/ask")
-def ask(req: AskRequest, request: Request):
-    ip = request.client.host if request.client else "unknown"
-    limiter.check(f"ask:{ip}", limit=30)
-
+def ask(req: AskRequest):
     validate_question(req.question)
-    
-    result = ASK_GRAPH.invoke({
-        "contract_id": req.contract_id,
-        "question": req.question,
-    })
-    return {
+
+    with start_trace("ask") as trace:
+        result = ASK_GRAPH.invoke({
+            "contract_id": req.contract_id,
+            "question": req.question,
+        })
+    out = {
         "answer": result["final_answer"],
         "contract_id": req.contract_id,
         "language": result["user_lang"],
     }
+    if req.debug:
+        out["debug"] = trace.to_dict()
+    return out
 
 
 # @router.post("/ask")
 # def ask(req: AskRequest):
 #     user_lang = detect_lang(req.question)
 
-#     bundle = rag.store.get(req.contract_id)
-#     contract_lang = bundle["meta"][0].get("language", "en") if bundle else "en"
+#     contract_lang = rag.store.language(req.contract_id)
 
 #     # Always build both query versions (AR + EN) when contract is mixed OR user is AR
 #     q_ar = req.question if user_lang == "ar" else translate_text(req.question, source_lang=user_lang, target_lang="ar")
@@ -145,13 +145,21 @@ def ask(req: AskRequest, request: Request):
 
 @router.post("/ask_general")
 def ask_general(req: GeneralAskRequest):
-    # 1) user language (override or LLM)
+    # 1) user language (override, remembered, or LLM)
     user_lang = (req.language or "").lower().strip() if req.language else None
+    if not user_lang:
+        user_lang = answer_cache.known_language(req.question)
     if not user_lang:
         user_lang = detect_user_lang_llm(req.question)
+        answer_cache.remember_language(req.question, user_lang)
     if user_lang not in SUPPORTED_UI_LANGS:
         user_lang = "en"
 
+    # semantic cache: same (or near-identical) question already answered in this language
+    cached, q_vec = answer_cache.lookup(req.question, user_lang)
+    if cached is not None:
+        return {"answer": cached["answer"], "mode": "general", "language": user_lang, "cached": True}
+
     # 2) retrieval pivot strategy
     primary_pivot = "en"
     fallback_pivot = "ar"
@@ -185,13 +193,21 @@ def ask_general(req: GeneralAskRequest):
     system = ui_format_rules(user_lang) + "\nThis is GENERAL Q&A (no uploaded contract). Use only LABOR LAW EVIDENCE."
     user = f"USER QUESTION (normalized for retrieval):\n{normalized_question}\n\n" + "\n".join(evidence_lines)
 
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=[{"role": "system", "content": system}, {"role": "user", "content": user}],
-        temperature=0.2
-    )
+    with metrics.timer("generate", graph="general"):
+        resp = client.responses.create(
+            model="gpt-4o-mini",
+            input=[{"role": "system", "content": system}, {"role": "user", "content": user}],
+            temperature=0.2
+        )
     # Generate directly in user_lang, no translation needed
     final_answer = resp.output_text.strip()
+    if final_answer:
+        answer_cache.put(req.question, user_lang, final_answer, vec=q_vec)
 
     return {"answer": final_answer, "mode": "general", "language": user_lang}
 
+
+@router.get("/ask_general/cache")
+def ask_general_cache():
+    return {"stats": answer_cache.stats(), "tuning": answer_cache.tuning_report()}
+
@@ -29,6 +29,12 @@ TOPIC_QUERIES = {
 
 SUPPORTED_UI_LANGS = {"ar", "en", "ur", "hi", "tl"}  # tl = Tagalog/Filipino
 
+# Evidence token budgets per LLM call (contract + law snippets)
+SUMMARY_EVIDENCE_TOKENS = 6000
+ASK_EVIDENCE_TOKENS = 3000
+SECTION_EVIDENCE_TOKENS = 1500   # per section in the map-reduce summary
+EVIDENCE_CONTRACT_SHARE = 0.7
+
 # =========================
 # Summary JSON Schema
 # =========================
@@ -103,3 +109,20 @@ SUMMARY_SCHEMA = {
         "required": ["mode", "language", "overview", "sections"]
     }
 }
+
+# Per-section / overview schemas for the map-reduce summary and for
+# re-requesting sections that were lost in a truncated generation.
+SECTION_SCHEMA = {
+    "name": "contract_summary_section",
+    "schema": SUMMARY_SCHEMA["schema"]["properties"]["sections"]["items"],
+}
+
+OVERVIEW_SCHEMA = {
+    "name": "contract_summary_overview",
+    "schema": {
+        "type": "object",
+        "additionalProperties": False,
+        "properties": {"overview": SUMMARY_SCHEMA["schema"]["properties"]["overview"]},
+        "required": ["overview"],
+    },
+}
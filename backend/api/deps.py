@@ -1,10 +1,20 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import joblib
 from dotenv import load_dotenv
 from openai import OpenAI
 
 from rag.engine import RAGEngine
+from api.constants import DEFAULT_TOPICS, TOPIC_QUERIES
+from rag.rerank import Reranker, DEFAULT_RERANK_MODEL
+from rag.answer_cache import SemanticAnswerCache
+from security.guardrails import injection_guard
+from security.pii import mask_rows
+from security.raw_store import RawClauseStore
+from security.tenants import TenantKeys, parse_tenant_keys
+from services.ocr import PageOCR
+from utils.metrics import metrics
 
 load_dotenv()
 
@@ -14,9 +24,83 @@ ARTIFACTS_DIR = BASE_DIR / "artifacts"
 LAW_INDEX_PATH = ARTIFACTS_DIR / "law" / "law.index"
 LAW_META_PATH  = ARTIFACTS_DIR / "law" / "law_meta.json"
 
-rag = RAGEngine(str(LAW_INDEX_PATH), str(LAW_META_PATH))
+rag = RAGEngine(
+    str(LAW_INDEX_PATH),
+    str(LAW_META_PATH),
+    # summary topic queries: precomputed per contract at upload
+    profile_queries=list(TOPIC_QUERIES.values()) + DEFAULT_TOPICS,
+    # "flat" (float32) / "fp16" / "int8" storage for contract indexes
+    contract_index_mode=os.environ.get("CONTRACT_INDEX_MODE", "flat"),
+)
 
+# law text is static: redact once here instead of on every request
+mask_rows(rag.law_meta, "text")
 
-# OpenAI client
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+# Unmasked clause text from uploads (the contract store only keeps redacted text).
+# Off unless STORE_RAW_CLAUSES=1; bounded, and dropped whenever a contract is re-indexed.
+raw_store = RawClauseStore(
+    enabled=os.environ.get("STORE_RAW_CLAUSES", "0") == "1",
+    max_contracts=int(os.environ.get("RAW_CLAUSES_MAX_CONTRACTS", "100")),
+)
+rag.store.subscribe(raw_store.drop)
+
+# Optional cross-encoder reranking (off by default, CPU-bound)
+reranker = Reranker(
+    model_name=os.environ.get("RERANK_MODEL", DEFAULT_RERANK_MODEL),
+    enabled=os.environ.get("RERANK_ENABLED", "0") == "1",
+    budget_ms=float(os.environ.get("RERANK_BUDGET_MS", "250")),
+)
+
+# Semantic cache of /ask_general answers (per language)
+answer_cache = SemanticAnswerCache(
+    rag.embedder,
+    threshold=float(os.environ.get("ANSWER_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=float(os.environ.get("ANSWER_CACHE_TTL_S", str(24 * 3600))),
+    max_per_lang=int(os.environ.get("ANSWER_CACHE_MAX", "2000")),
+)
+metrics.register_collector("answer_cache", answer_cache.stats)
+metrics.register_collector("guardrails", injection_guard.stats)
+
+
+# API key -> tenant ("key1:tenant_a,key2:tenant_b"). Uploads made with a key join
+# that tenant's portfolio index (/search_clauses); without one they stay private.
+tenant_keys = TenantKeys(parse_tenant_keys(os.environ.get("TENANT_API_KEYS", "")))
+
+
+# Upload limits (checked while streaming, before parsing)
+MAX_UPLOAD_BYTES = int(float(os.environ.get("MAX_UPLOAD_MB", "20")) * (1 << 20))
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "200"))
+
+# OCR for scanned PDF pages (optional pytesseract + tesseract binary); OCR_ENABLED=0 turns it off
+ocr = PageOCR(
+    enabled=os.environ.get("OCR_ENABLED", "1") == "1",
+    langs=os.environ.get("OCR_LANGS", "ara+eng"),
+    workers=int(os.environ.get("OCR_WORKERS", "2")),
+    budget_s=float(os.environ.get("OCR_BUDGET_S", "60")),
+    dpi=int(os.environ.get("OCR_DPI", "300")),
+    cache_size=int(os.environ.get("OCR_CACHE_PAGES", "512")),
+)
+metrics.register_collector("ocr", ocr.stats)
+
+# Streaming ingestion: parse / split / redact / classify run on this pool,
+# overlapped with embedding + indexing in the request thread (api/upload.py)
+INGEST_BATCH = int(os.environ.get("INGEST_BATCH", "32"))
+ingest_pool = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("INGEST_WORKERS", "4")), thread_name_prefix="ingest"
+)
+
+# Per-IP request budget (units per minute, see api/middleware.ROUTE_COSTS); 0 disables
+RATE_LIMIT_UNITS = int(os.environ.get("RATE_LIMIT_UNITS", "60"))
+
+
+# OpenAI client (LLM_STUB=1: deterministic local stub for benchmarks, see benchmarks/llm_stub.py)
+if os.environ.get("LLM_STUB", "0") == "1":
+    from benchmarks.llm_stub import StubClient
+    client = StubClient(
+        latency_ms=float(os.environ.get("LLM_STUB_LATENCY_MS", "300")),
+        ms_per_token=float(os.environ.get("LLM_STUB_MS_PER_TOKEN", "0")),
+        jitter=float(os.environ.get("LLM_STUB_JITTER", "0.1")),
+    )
+else:
+    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
 
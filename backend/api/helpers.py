@@ -6,6 +6,14 @@ from api.constants import SUPPORTED_UI_LANGS
 from api.constants import DEFAULT_TOPICS, TOPIC_QUERIES, SUPPORTED_UI_LANGS, SUMMARY_SCHEMA
 
 from rag.engine import detect_lang
+from services.token_budget import count_tokens, drop_near_duplicates, fit_hits, tokenizer_name
+from utils.metrics import metrics
+from utils.tracing import record_evidence, record_llm
+
+# evidence_tokens_{before,after} histograms (build_budgeted_evidence)
+TOKEN_BUCKETS = (250, 500, 1000, 2000, 4000, 8000, 16000, 32000)
+metrics.describe("evidence_tokens_before", "Evidence prompt tokens before budgeting, per budget.")
+metrics.describe("evidence_tokens_after", "Evidence prompt tokens after budgeting, per budget.")
 
 
 # ----------------------------
@@ -31,11 +39,13 @@ def translate_text(text: str, source_lang: str, target_lang: str) -> str:
         f"Do NOT explain. Return only the translation.\n\n{text}"
     )
 
-    resp = client.responses.create(
-        model="gpt-4o-mini",
-        input=prompt,
-        temperature=0
-    )
+    with metrics.timer("translate"):
+        resp = client.responses.create(
+            model="gpt-4o-mini",
+            input=prompt,
+            temperature=0
+        )
+    record_llm(resp)
     return resp.output_text.strip()
 
 
@@ -54,6 +64,7 @@ def detect_user_lang_llm(text: str) -> str:
         input=prompt,
         temperature=0
     )
+    record_llm(resp)
     code = resp.output_text.strip().lower()
     return code if code in SUPPORTED_UI_LANGS else "en"
 
@@ -178,13 +189,13 @@ def build_contract_evidence(
         cid = m.get("clause_id")
         if cid:
             id_to_label[cid] = m.get("label")
-    print("META_LEN:", len(meta_list))
-    print("META_SAMPLE_LABELS:", [(m.get("clause_id"), m.get("label")) for m in meta_list[:8]])
+    metrics.debug("evidence.meta", clauses=len(meta_list), labelled=sum(1 for v in id_to_label.values() if v))
 
-    # Collect hits for each query
+    # Collect hits for each query (batched; topic queries come precomputed from the profile)
     all_hits = []
-    for q in queries:
-        hits = rag.retrieve_contract(contract_id, q, k=k_each) or []
+    with metrics.timer("retrieve", scope="contract_batch"):
+        batch = rag.retrieve_contract_batch(contract_id, list(queries), k=k_each)
+    for q, hits in zip(queries, batch):
         for h in hits:
             # attach label if missing
             if "label" not in h:
@@ -216,8 +227,9 @@ def build_contract_evidence(
 
 def build_law_evidence(queries: List[str], lang: str, k_each=3, max_total=10):
     all_hits = []
-    for q in queries:
-        all_hits.extend(rag.retrieve_law(q, lang=lang, k=k_each))
+    with metrics.timer("retrieve", scope="law"):
+        for q in queries:
+            all_hits.extend(rag.retrieve_law(q, lang=lang, k=k_each))
     seen = set()
     out = []
     for h in sorted(all_hits, key=lambda x: x["score"], reverse=True):
@@ -253,6 +265,61 @@ def format_law_hits(law_hits):
     return lines
 
 
+def build_budgeted_evidence(
+    contract_hits,
+    law_hits,
+    query: str,
+    max_tokens: int = 4000,
+    contract_share: float = 0.7,
+):
+    """
+    Token-budgeted version of format_contract_hits + format_law_hits.
+
+    - near-duplicate snippets are dropped
+    - contract evidence gets contract_share of the budget, law gets the rest
+      plus whatever the contract side leaves unused
+    - long clauses/articles are trimmed at sentence boundaries around the
+      query-relevant part
+
+    Returns (evidence_lines, report) where report has tokens before/after.
+    The report also goes to the request trace (debug field / trace sink) and
+    the evidence_tokens_{before,after} histograms.
+    """
+    contract_hits = contract_hits or []
+    law_hits = law_hits or []
+    tokens_before = count_tokens("\n".join(format_contract_hits(contract_hits) + format_law_hits(law_hits)))
+
+    c_hits, c_dups = drop_near_duplicates(contract_hits, "clause_text")
+    l_hits, l_dups = drop_near_duplicates(law_hits, "text")
+
+    def c_header(h):
+        return format_contract_hits([{**h, "clause_text": ""}])[1]
+
+    def l_header(h):
+        return format_law_hits([{**h, "text": ""}])[1]
+
+    c_budget = int(max_tokens * contract_share) if l_hits else max_tokens
+    c_fit, c_used, c_trim = fit_hits(c_hits, "clause_text", query, c_budget, c_header)
+    l_fit, l_used, l_trim = fit_hits(l_hits, "text", query, max_tokens - c_used, l_header)
+
+    lines = format_contract_hits(c_fit) + format_law_hits(l_fit)
+
+    report = {
+        "budget": max_tokens,
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens("\n".join(lines)),
+        "contract_tokens": c_used,
+        "law_tokens": l_used,
+        "contract_hits": {"in": len(contract_hits), "out": len(c_fit), "duplicates": c_dups, "trimmed": c_trim},
+        "law_hits": {"in": len(law_hits), "out": len(l_fit), "duplicates": l_dups, "trimmed": l_trim},
+        "tokenizer": tokenizer_name(),
+    }
+    metrics.observe("evidence_tokens_before", tokens_before, buckets=TOKEN_BUCKETS, budget=max_tokens)
+    metrics.observe("evidence_tokens_after", report["tokens_after"], buckets=TOKEN_BUCKETS, budget=max_tokens)
+    record_evidence(report)
+    return lines, report
+
+
 def is_mixed_lang(text: str) -> bool:
     has_ar = bool(re.search(r"[\u0600-\u06FF]", text))
     has_lat = bool(re.search(r"[A-Za-z]", text))
@@ -0,0 +1,135 @@
+import json
+import math
+from typing import Dict
+
+from security.rate_limit import RateDecision, RateLimiter
+from utils.metrics import metrics
+
+# Units per request, charged against one per-IP budget per window.
+# With the default 60 units / minute: 30 asks, 15 summaries or 10 uploads.
+ROUTE_COSTS: Dict[str, int] = {
+    "/ask": 2,
+    "/ask_general": 2,
+    "/search_clauses": 2,
+    "/summary": 4,
+    "/upload_contract": 6,
+}
+
+
+def rate_limit_headers(d: RateDecision) -> Dict[str, str]:
+    headers = {
+        "X-RateLimit-Limit": str(d.limit),
+        "X-RateLimit-Remaining": str(d.remaining),
+        "X-RateLimit-Reset": str(math.ceil(d.reset_after)),
+    }
+    if not d.allowed:
+        headers["Retry-After"] = str(max(1, math.ceil(d.retry_after)))
+    return headers
+
+
+# multipart framing / form fields on top of the file itself
+MULTIPART_SLACK_BYTES = 64 * 1024
+
+
+async def _send_json(send, status: int, payload: dict, headers=()) -> None:
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class BodySizeLimitMiddleware:
+    """
+    Caps request bodies per route. A declared Content-Length over the limit
+    gets 413 before any of the body is read; otherwise the body is counted
+    as the app receives it (chunked uploads included) and the request is cut
+    off with 413 as soon as it passes the limit, before the form parser has
+    written the rest to disk.
+    """
+
+    def __init__(self, app, limits: Dict[str, int]):
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        limit = self.limits.get(scope.get("path")) if scope["type"] == "http" else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        message_413 = {"error": f"File too large. Max {limit // (1 << 20)} MB."}
+        length = dict(scope.get("headers") or []).get(b"content-length")
+        if length is not None and length.isdigit() and int(length) > limit + MULTIPART_SLACK_BYTES:
+            metrics.inc("upload_rejected_total", reason="content_length")
+            return await _send_json(send, 413, message_413)
+
+        received = 0
+        rejected = started = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit + MULTIPART_SLACK_BYTES:
+                    # answer now; the app sees a disconnect and its own response is dropped
+                    rejected = True
+                    metrics.inc("upload_rejected_total", reason="body_size")
+                    if not started:
+                        await _send_json(send, 413, message_413)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        await self.app(scope, limited_receive, guarded_send)
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware: charges ROUTE_COSTS[path] against the client's budget
+    before the request body is read. Over budget -> 429 with Retry-After;
+    every limited response carries X-RateLimit-* headers.
+    limit <= 0 disables limiting.
+    """
+
+    def __init__(self, app, limiter: RateLimiter, limit: int, costs: Dict[str, int] = ROUTE_COSTS):
+        self.app = app
+        self.limiter = limiter
+        self.limit = limit
+        self.costs = costs
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.limit <= 0 or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        cost = self.costs.get(scope["path"])
+        if cost is None:
+            return await self.app(scope, receive, send)
+
+        ip = scope["client"][0] if scope.get("client") else "unknown"
+        d = await self.limiter.hit_async(f"api:{ip}", limit=self.limit, cost=cost)
+        headers = [(k.lower().encode(), v.encode()) for k, v in rate_limit_headers(d).items()]
+
+        if not d.allowed:
+            metrics.inc("rate_limited_total", route=scope["path"])
+            return await _send_json(send, 429, {
+                "error": "Rate limit exceeded. Please slow down.",
+                "retry_after": max(1, math.ceil(d.retry_after)),
+            }, headers)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": list(message.get("headers", [])) + headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
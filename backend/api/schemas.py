@@ -1,16 +1,26 @@
 from typing import List, Optional, Literal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 class AskRequest(BaseModel):
     contract_id: str
     question: str
+    debug: bool = False  # include the per-node trace in the response
 
 class SummaryRequest(BaseModel):
     contract_id: str
     mode: Literal["full", "focused"] = "full"
     topics: Optional[List[str]] = None
     language: Optional[str] = None  # "ar"/"en"/"ur"/"hi"/"tl"
+    strategy: Literal["single", "sections"] = "single"  # "sections" = per-topic map-reduce
+    debug: bool = False  # include the per-node trace in the response
 
 class GeneralAskRequest(BaseModel):
     question: str
     language: Optional[str] = None
+
+class SearchClausesRequest(BaseModel):
+    query: str                               # tenant comes from the X-API-Key header, not the body
+    labels: Optional[List[str]] = None       # classifier labels, e.g. ["non_compete"]
+    language: Optional[Literal["ar", "en"]] = None
+    contract_ids: Optional[List[str]] = None
+    k: int = Field(20, ge=1, le=100)
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from fastapi import APIRouter, Header
+
+from api.schemas import SearchClausesRequest
+from api.deps import rag, tenant_keys
+from security.guardrails import validate_question
+from security.pii import mask_hits_contract
+
+router = APIRouter(tags=["search"])
+
+
+@router.post("/search_clauses")
+def search_clauses(req: SearchClausesRequest, x_api_key: Optional[str] = Header(None)):
+    tenant_id = tenant_keys.require(x_api_key)
+    validate_question(req.query)
+
+    hits = rag.search_clauses(
+        req.query,
+        tenant_id=tenant_id,
+        k=req.k,
+        labels=req.labels,
+        language=req.language,
+        contract_ids=req.contract_ids,
+    )
+    hits, _ = mask_hits_contract(hits)
+    return {"hits": hits, "tenant_id": tenant_id, "count": len(hits)}
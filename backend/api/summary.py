@@ -13,31 +13,35 @@
 
 # router = APIRouter(tags=["summary"])
 
-from fastapi import APIRouter, Request
+from fastapi import APIRouter
 from api.schemas import SummaryRequest
-from agents.summary_graph import run_summary
+from agents.summary_graph import run_summary, recovery_stats, summary_cache
 
-from security.rate_limit import limiter
+from utils.tracing import start_trace
 from security.guardrails import validate_topics
 from security.pii import mask_hits_contract, mask_hits_law  # (optional, see notes below)
 
 router = APIRouter(tags=["summary"])
 
 @router.post("/summary")
-def summary(req: SummaryRequest, request: Request):
-    # 1) Rate limit (summary is heavier than ask)
-    ip = request.client.host if request.client else "unknown"
-    limiter.check(f"summary:{ip}", limit=15)
-
-    # 2) Validate topics only when focused
+def summary(req: SummaryRequest):
+    # 1) Validate topics only when focused (rate limit: api/middleware, summary costs 2x ask)
     if req.mode == "focused" and req.topics:
         validate_topics(req.topics)
 
-    # 3) Run LangGraph summary
-    result = run_summary(req)
+    # 2) Run LangGraph summary
+    with start_trace("summary") as trace:
+        result = run_summary(req)
 
+    if req.debug:
+        result["debug"] = trace.to_dict()
     return result
 
+
+@router.get("/summary/stats")
+def summary_stats():
+    return {"json_recovery": recovery_stats(), "cache": summary_cache.stats()}
+
 # @router.post("/summary")
 # def summary(req: SummaryRequest):
 #     # 1) Output language (UI language)
@@ -46,8 +50,7 @@ def summary(req: SummaryRequest, request: Request):
 #         user_lang = "en"
 
 #     # 2) Contract language from stored clauses
-#     bundle = rag.store.get(req.contract_id)
-#     contract_lang = bundle["meta"][0].get("language", "en") if bundle and bundle.get("meta") else "en"
+#     contract_lang = rag.store.language(req.contract_id)
 
 #     # 3) Pivot language for retrieval (match evidence language)
 #     pivot_lang = "en" if contract_lang == "en" else "ar"
@@ -1,99 +1,222 @@
+import os
 import uuid
-from fastapi import APIRouter, UploadFile, File
-from services.parser import extract_text_pdf, extract_text_docx
-from services.chunker import split_into_clauses
-from rag.engine import detect_lang
-from api.deps import rag
-from api.helpers import is_mixed_lang
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from fastapi import APIRouter, UploadFile, File, Form, Header
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from services.parser import iter_pdf_pages, iter_docx_blocks
+from services.pipeline import batched, prefetch, timed
+from services.spool import UploadRejected, spool_upload, sniff_format, pdf_page_count
+from services.chunker import iter_clauses
+from rag.engine import detect_lang, clause_keys
+from api.deps import rag, raw_store, ocr, tenant_keys, ingest_pool, INGEST_BATCH, MAX_UPLOAD_BYTES, MAX_PDF_PAGES
 from api.helpers import norm_clause_id
 
-from ml.infer import predict_clause
-from rag.engine import detect_lang
+from ml.infer import predict_clauses
+from security.pii import empty_stats, mask_rows
+from utils.metrics import metrics
 
 
 router = APIRouter(tags=["upload_contract"])
 
-@router.post("/upload_contract")
-async def upload_contract(file: UploadFile = File(...)):
-    ext = file.filename.lower().split(".")[-1]
-    data = await file.read()
-
-    if ext == "pdf":
-        text = extract_text_pdf(data)
-
-
-    elif ext == "docx":
-        text = extract_text_docx(data)
-
+CHAR_BUCKETS = (1e3, 5e3, 1e4, 2.5e4, 5e4, 1e5, 2.5e5, 5e5)
+CLAUSE_BUCKETS = (5, 10, 25, 50, 100, 200, 400, 800)
+BYTE_BUCKETS = (1e5, 5e5, 1e6, 5e6, 1e7, 2.5e7, 5e7)
+
+
+async def open_upload(file: UploadFile) -> Tuple[str, str]:
+    """
+    Spool the upload to a temp file (size-capped), sniff the format from its
+    bytes and check the page limit. Returns (format, path); the caller
+    deletes the file. Raises UploadRejected.
+    """
+    path, size = await spool_upload(file, MAX_UPLOAD_BYTES)
+    try:
+        metrics.observe("upload_bytes", size, buckets=BYTE_BUCKETS)
+        fmt = sniff_format(path)
+        if fmt is None:
+            raise UploadRejected("Only PDF and DOCX are supported.", 415, "format")
+        if fmt == "pdf":
+            pages = pdf_page_count(path)
+            if pages > MAX_PDF_PAGES:
+                raise UploadRejected(f"Too many pages ({pages}). Max {MAX_PDF_PAGES}.", 413, "pages")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return fmt, path
+
+
+def _counted(pages: Iterable[str], stats: dict) -> Iterator[str]:
+    for page in pages:
+        stats["chars"] += len(page)
+        stats["lines"] += len(page.splitlines())
+        yield page
+
+
+def _require_text(clauses: List[dict], fmt: str) -> None:
+    """
+    Nothing readable (e.g. a scanned PDF without OCR): reject instead of
+    indexing an empty contract.
+    """
+    if clauses:
+        return
+    hint = " Scanned PDFs need OCR (pytesseract + tesseract), which is not available." \
+        if fmt == "pdf" and not ocr.available else ""
+    raise UploadRejected("No readable text found in the document." + hint, 422, "empty")
+
+
+def classify_clauses(
+    clauses: List[dict], contract_id: str, keys: Optional[List[str]] = None, previous: Optional[dict] = None
+) -> List[dict]:
+    """
+    Clause meta rows with language + label; one classifier call per batch.
+    previous (amended uploads): clause_keys() entry -> old meta, whose label is reused.
+    """
+    langs = [detect_lang(c["clause_text"]) for c in clauses]
+    labels = [None] * len(clauses)
+    if previous and keys:
+        for i, key in enumerate(keys):
+            old = previous.get(key)
+            if old:
+                labels[i] = old["label"]
+
+    todo = [i for i, label in enumerate(labels) if label is None]
+    with metrics.timer("classify"):
+        predicted = predict_clauses([clauses[i]["clause_text"] for i in todo], [langs[i] for i in todo])
+    for i, label in zip(todo, predicted):
+        labels[i] = label
+
+    out = []
+    for c, lang, label in zip(clauses, langs, labels):
+        meta = {
+            "contract_id": contract_id,
+            "clause_id": c["clause_id"],
+            "clause_text": c["clause_text"],
+            "language": lang,
+            "label": label,
+            "pii_masked": True,
+        }
+        if "pii" in c:
+            meta["pii"] = c["pii"]
+        out.append(meta)
+    return out
+
+
+def ingest(
+    path: str, fmt: str, contract_id: str, tenant_id: Optional[str], previous_contract_id: Optional[str]
+) -> dict:
+    """
+    Streaming ingestion: pages -> cleaned text -> clauses -> redacted,
+    classified batches run on ingest_pool, while this thread embeds each
+    batch and adds it to the contract index as it arrives.
+    Amended uploads are diffed against the previous version batch by batch:
+    unchanged clauses (same text) keep their label and vector.
+    """
+    stats = {"chars": 0, "lines": 0}
+    raw: Dict[str, str] = {}
+    pii_totals = empty_stats()
+    previous = rag.previous_clauses_by_key(previous_contract_id) if previous_contract_id else None
+    key_counts: Dict[str, int] = {}
+
+    def batches() -> Iterator[List[dict]]:
+        pages = iter_pdf_pages(path, ocr=ocr) if fmt == "pdf" else iter_docx_blocks(path)
+        pages = _counted(timed(pages, "extract", format=fmt), stats)
+        for batch in batched(iter_clauses(pages, sep="\n\n" if fmt == "pdf" else "\n"), INGEST_BATCH):
+            # redact once here: everything downstream (labels, index, hits, prompts) sees masked text
+            for c in batch:
+                c["clause_id"] = norm_clause_id(c["clause_id"])
+                if raw_store.enabled:
+                    raw[c["clause_id"]] = c["clause_text"]
+            with metrics.timer("redact"):
+                for kind, n in mask_rows(batch, "clause_text").items():
+                    pii_totals[kind] += n
+            keys = clause_keys(batch, key_counts) if previous is not None else None
+            yield classify_clauses(batch, contract_id, keys=keys, previous=previous)
+
+    if previous_contract_id:
+        builder = rag.begin_contract_update(contract_id)
     else:
-        return {"error": "Only PDF and DOCX are supported."}
-    
-    print("---- EXTRACT DEBUG ----")
-    print("chars:", len(text))
-    print("lines:", len(text.splitlines()))
-    print("head:\n", text[:700])
-    print("tail:\n", text[-700:])
-    print("-----------------------")   
-
-    clauses = split_into_clauses(text)
-
-    total_chars = len(text)
-    covered_chars = sum(len(c["clause_text"]) for c in clauses)
-    print("Total chars:", total_chars)
-    print("Covered chars:", covered_chars)
-    print("Coverage %:", round(covered_chars / max(total_chars, 1) * 100, 2))
-    print("Clauses:", len(clauses))
-
-    print("FIRST CLAUSE:\n", clauses[0]["clause_text"][:800])
-    print("\nMIDDLE CLAUSE:\n", clauses[len(clauses)//2]["clause_text"][:800])
-    print("\nLAST CLAUSE:\n", clauses[-1]["clause_text"][:800])
-
-    # --- DEBUG: keyword scan ---
-    salary_keys = ["الراتب", "الأجر", "أجر", "basic wage", "salary", "wage", "SAR", "ريال", "ر.س"]
-
-    hits = []
-    for c in clauses:
-        low = c["clause_text"].lower()
-        if any(k.lower() in low for k in salary_keys):
-            hits.append((c["clause_id"], c["clause_text"][:200]))
-
-    print("SALARY KEYWORD HITS:", len(hits))
-    for h in hits[:10]:
-        print(" -", h[0], ":", h[1].replace("\n", " "))
-
-
-    contract_id = "U" + uuid.uuid4().hex[:8].upper()
-    lang = "mixed" if is_mixed_lang(text) else detect_lang(text)
-
-
+        builder = rag.begin_contract_index(contract_id, tenant_id)
     clauses_meta = []
-    for c in clauses:
-        clause_id = norm_clause_id(c["clause_id"])
-
-        clause_text = c["clause_text"]
-        pred_label = predict_clause(clause_text, detect_lang(clause_text))
-
-
-
-        clauses_meta.append({
-            "contract_id": contract_id,
-            "clause_id": clause_id,
-            "clause_text": clause_text,
-            "language": detect_lang(clause_text),
-            "label": pred_label,
-        })
-    print("=== LABEL COUNTS ===")
-    from collections import Counter
-    print(Counter([m["label"] for m in clauses_meta]))
-
-
-
-    rag.build_contract_index(contract_id, clauses_meta)
-    print("=== SAMPLE CLAUSE LABELS ===")
-    for m in clauses_meta[:5]:
-        print(m["clause_id"], "->", m.get("label"), "|", m["clause_text"][:80])
-
-
-    return {"contract_id": contract_id, "language": lang, "num_clauses": len(clauses_meta)}
+    for batch in prefetch(batches(), ingest_pool):
+        builder.add(batch)
+        clauses_meta += batch
+    _require_text(clauses_meta, fmt)
+    changes = builder.finalize()
+    # only once the (redacted) version is published: a failed upload leaves no raw text behind
+    raw_store.put(contract_id, raw)
+    metrics.inc("uploads_total", kind="amended" if previous_contract_id else "new")
+
+    for kind, n in pii_totals.items():
+        if n:
+            metrics.inc("pii_masked_total", n, kind=kind, stage="upload")
+    for label, n in Counter(m["label"] for m in clauses_meta).items():
+        metrics.inc("clauses_classified_total", n, label=label)
+
+    covered_chars = sum(len(c["clause_text"]) for c in clauses_meta)
+    metrics.observe("upload_chars", stats["chars"], buckets=CHAR_BUCKETS)
+    metrics.observe("upload_clauses", len(clauses_meta), buckets=CLAUSE_BUCKETS)
+    metrics.debug(
+        "upload.extract",
+        format=fmt,
+        chars=stats["chars"],
+        lines=stats["lines"],
+        clauses=len(clauses_meta),
+        coverage_pct=round(covered_chars / max(stats["chars"], 1) * 100, 2),
+    )
+
+    out = {
+        "contract_id": contract_id,
+        "language": rag.store.language(contract_id),
+        "language_counts": rag.store.language_counts(contract_id),
+        "num_clauses": len(clauses_meta),
+        "pii_masked": {k: n for k, n in pii_totals.items() if n},
+    }
+    if changes is not None:
+        out["changes"] = changes
+    return out
 
 
+@router.post("/upload_contract")
+async def upload_contract(
+    file: UploadFile = File(...),
+    previous_contract_id: Optional[str] = Form(None),
+    x_api_key: Optional[str] = Header(None),
+):
+    """
+    previous_contract_id: upload an amended version of that contract. The
+    contract keeps its id and only added / changed clauses are classified
+    and embedded; the response includes a clause-level change summary.
+
+    X-API-Key (optional): the contract joins that key's tenant portfolio
+    (/search_clauses). Without a key it is only reachable by contract_id.
+    Amending a tenant's contract requires that tenant's key (401 / 403).
+    """
+    tenant_id = tenant_keys.require(x_api_key) if x_api_key else None
+    if previous_contract_id:
+        previous = rag.store.get(previous_contract_id)
+        if not previous:
+            metrics.inc("upload_rejected_total", reason="unknown_previous")
+            return JSONResponse(status_code=404, content={"error": f"Unknown previous_contract_id: {previous_contract_id}"})
+        # a tenant's contract (and its portfolio shard) can only be amended with that tenant's key
+        owner = previous.get("tenant_id")
+        if owner is not None and tenant_keys.require(x_api_key) != owner:
+            metrics.inc("upload_rejected_total", reason="forbidden")
+            return JSONResponse(status_code=403, content={"error": "This contract belongs to another tenant."})
+
+    try:
+        fmt, path = await open_upload(file)
+    except UploadRejected as e:
+        metrics.inc("upload_rejected_total", reason=e.reason)
+        return JSONResponse(status_code=e.status, content={"error": str(e)})
+
+    contract_id = previous_contract_id or "U" + uuid.uuid4().hex[:8].upper()
+    try:
+        # blocking CPU / model work: keep it off the event loop
+        return await run_in_threadpool(ingest, path, fmt, contract_id, tenant_id, previous_contract_id)
+    except UploadRejected as e:
+        metrics.inc("upload_rejected_total", reason=e.reason)
+        return JSONResponse(status_code=e.status, content={"error": str(e)})
+    finally:
+        os.unlink(path)
@@ -0,0 +1,121 @@
+"""
+Global clause index (one tenant shard) at portfolio scale.
+
+Synthetic clustered 384-d vectors with contract / label / language
+attributes; reports build time, memory, p50/p95/p99 latency for unfiltered
+and filtered queries, recall@k against an exact scan, and checks the
+TARGET_P50_MS / TARGET_P95_MS targets from rag/global_index.py.
+
+    cd backend
+    python -m benchmarks.bench_global_index --n 1000000 --queries 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from rag.global_index import (
+    ClauseShard, HNSW_M, TARGET_P50_MS, TARGET_P95_MS,
+)
+
+LABELS = [
+    "salary_terms", "probation", "termination", "working_hours", "leave",
+    "benefits", "penalties", "contract_duration", "non_compete", "general",
+]
+
+
+def synthetic_vectors(n: int, dim: int, centers: int, rng) -> np.ndarray:
+    c = rng.standard_normal((centers, dim)).astype("float32")
+    x = c[rng.integers(0, centers, n)] + 0.35 * rng.standard_normal((n, dim)).astype("float32")
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    return x
+
+
+def percentiles(ms):
+    return {p: float(np.percentile(ms, p)) for p in (50, 95, 99)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1_000_000)
+    ap.add_argument("--dim", type=int, default=384)
+    ap.add_argument("--clauses-per-contract", type=int, default=40)
+    ap.add_argument("--queries", type=int, default=500)
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--batch", type=int, default=50_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    shard = ClauseShard(args.dim)
+
+    t0 = time.perf_counter()
+    all_vecs = []
+    added = 0
+    cpc = args.clauses_per_contract
+    while added < args.n:
+        m = min(args.batch, args.n - added)
+        vecs = synthetic_vectors(m, args.dim, 1000, rng)
+        all_vecs.append(vecs)
+        # one "contract" per cpc rows
+        for start in range(0, m, cpc):
+            rows = vecs[start:start + cpc]
+            cid = f"C{(added + start) // cpc:07d}"
+            meta = [
+                {
+                    "clause_id": f"A{j + 1:03d}",
+                    "label": LABELS[int(rng.integers(0, len(LABELS)))],
+                    "language": "ar" if rng.random() < 0.5 else "en",
+                }
+                for j in range(len(rows))
+            ]
+            shard.add(cid, meta, rows)
+        added += m
+    build_s = time.perf_counter() - t0
+    xb = np.concatenate(all_vecs)
+
+    mem_mb = args.n * (args.dim * 4 + HNSW_M * 2 * 4 + 4 * 3 + 1) / 1e6
+    print(f"rows={args.n} dim={args.dim} build={build_s:.1f}s approx_mem={mem_mb:.0f}MB")
+
+    queries = synthetic_vectors(args.queries, args.dim, 1000, rng)
+    scenarios = {
+        "unfiltered": {},
+        "label": {"labels": ["non_compete"]},
+        "label+lang": {"labels": ["non_compete"], "language": "en"},
+        "contract": {"contract_ids": ["C0000042"]},
+    }
+
+    print(f"{'scenario':<12} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'recall@k':>9}")
+    ok = True
+    for name, filters in scenarios.items():
+        ms = []
+        recalls = []
+        for i, q in enumerate(queries):
+            q = q[None, :]
+            t = time.perf_counter()
+            hits = shard.search(q, args.k, **filters)
+            ms.append((time.perf_counter() - t) * 1000)
+
+            if i < 50:
+                # exact reference over the same filter
+                mask = shard._mask(filters.get("labels"), filters.get("language"), filters.get("contract_ids"))
+                scores = xb @ q[0]
+                if mask is not None:
+                    scores = np.where(mask, scores, -np.inf)
+                top = {int(r) for r in np.argpartition(-scores, args.k)[:args.k] if np.isfinite(scores[r])}
+                found = set()
+                for h in hits:
+                    for r in shard.rows_by_contract.get(h["contract_id"], []):
+                        if shard.clause_ids[r] == h["clause_id"]:
+                            found.add(r)
+                recalls.append(len(top & found) / max(1, min(args.k, len(top))))
+
+        p = percentiles(ms)
+        print(f"{name:<12} {p[50]:>8.2f} {p[95]:>8.2f} {p[99]:>8.2f} {np.mean(recalls):>9.3f}")
+        ok &= p[50] <= TARGET_P50_MS and p[95] <= TARGET_P95_MS
+
+    print(f"targets p50<={TARGET_P50_MS}ms p95<={TARGET_P95_MS}ms: {'PASS' if ok else 'FAIL'}")
+
+
+if __name__ == "__main__":
+    main()
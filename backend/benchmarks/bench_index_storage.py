@@ -0,0 +1,89 @@
+"""
+Ranking agreement + memory of compact contract index storage (fp16 / int8)
+against the float32 IndexFlatIP baseline.
+
+Uses the labeled clauses in data/dataset_contract_clean.csv as contracts and
+the summary topic queries as queries.
+
+    cd backend
+    python -m benchmarks.bench_index_storage --k 5
+"""
+import argparse
+import csv
+import json
+from pathlib import Path
+
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from api.constants import DEFAULT_TOPICS, TOPIC_QUERIES
+from rag.engine import EMBED_MODEL_NAME, make_contract_index
+
+BASE_DIR = Path(__file__).resolve().parents[1]   # backend/
+DATA_PATH = BASE_DIR / "data" / "dataset_contract_clean.csv"
+
+
+def load_contracts(path: Path) -> dict:
+    contracts = {}
+    with open(path, encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            contracts.setdefault(row["contract_id"], []).append({
+                "clause_id": row["clause_id"],
+                "clause_text": row["clause_text"],
+                "language": row["language"],
+                "label": row["label"],
+            })
+    return contracts
+
+
+def index_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--data", default=str(DATA_PATH))
+    ap.add_argument("--contracts", type=int, default=10_000, help="fleet size for the memory projection")
+    args = ap.parse_args()
+
+    contracts = load_contracts(Path(args.data))
+    embedder = SentenceTransformer(EMBED_MODEL_NAME)
+    queries = list(TOPIC_QUERIES.values()) + DEFAULT_TOPICS
+    q = embedder.encode(queries, normalize_embeddings=True)
+
+    modes = ["flat", "fp16", "int8"]
+    agg = {m: {"bytes": [], "overlap": [], "top1": []} for m in modes}
+    meta_bytes = []
+
+    for cid, clauses in contracts.items():
+        emb = embedder.encode([c["clause_text"] for c in clauses], normalize_embeddings=True)
+        k = min(args.k, len(clauses))
+        meta_bytes.append(len(json.dumps(clauses, ensure_ascii=False).encode("utf-8")))
+
+        _, base_ids = make_contract_index(emb, "flat").search(q, k)
+        for mode in modes:
+            index = make_contract_index(emb, mode)
+            _, ids = index.search(q, k)
+            agg[mode]["bytes"].append(index_bytes(index))
+            agg[mode]["overlap"].append(np.mean([len(set(a) & set(b)) / k for a, b in zip(base_ids, ids)]))
+            agg[mode]["top1"].append(np.mean(base_ids[:, 0] == ids[:, 0]))
+
+    flat_bytes = np.mean(agg["flat"]["bytes"])
+    avg_meta = np.mean(meta_bytes)
+
+    print(f"contracts={len(contracts)} queries={len(queries)} k={args.k} dim={q.shape[1]}")
+    print(f"{'mode':<6} {'index B/contract':>17} {'vs flat':>8} {'overlap@k':>10} {'top1 agree':>11} {f'{args.contracts} contracts (MB)':>22}")
+    for mode in modes:
+        b = np.mean(agg[mode]["bytes"])
+        fleet_mb = args.contracts * (b + avg_meta) / 1e6
+        print(
+            f"{mode:<6} {b:>17.0f} {b / flat_bytes:>8.2f} "
+            f"{np.mean(agg[mode]['overlap']):>10.4f} {np.mean(agg[mode]['top1']):>11.4f} {fleet_mb:>22.1f}"
+        )
+    print(f"clause meta B/contract (json): {avg_meta:.0f}")
+
+
+if __name__ == "__main__":
+    main()
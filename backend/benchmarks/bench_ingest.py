@@ -0,0 +1,160 @@
+"""
+Contract ingestion: the staged pipeline (whole text -> all clauses -> classify
+one by one -> embed all -> build index) vs. the streaming one in
+api.upload.ingest (pages -> clauses -> classified batches on ingest_pool,
+embedded and indexed batch by batch).
+
+The "amended" rows upload a second version of each document (another
+seed: most clauses change, a few stay) on top of the first: the previous
+path collected every clause and diffed the version as a whole, the
+streaming one diffs batch by batch (rag.engine.ContractUpdater).
+
+Reports wall time, time until the first clauses reach the index, peak
+Python heap (tracemalloc, separate pass: it slows everything down) and
+whether both produce the same clauses, labels and language.
+
+    cd backend
+    python -m benchmarks.bench_ingest --repeat 20 --runs 3
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import uuid
+from typing import Optional
+
+from benchmarks.fixtures import LANGS, contract_docx, contract_pdf
+from api.deps import rag
+from api.helpers import norm_clause_id
+from api.upload import classify_clauses, ingest
+from ml.infer import predict_clause
+from rag.engine import ContractIndexBuilder, ContractUpdater, clause_keys, detect_lang
+from security.pii import mask_rows
+from services.chunker import split_into_clauses
+from services.parser import extract_text_docx, extract_text_pdf
+
+first_batch = {}
+
+
+def _first_batch_timed(cls):
+    add = cls.add
+
+    def timed_add(self, clauses_meta):
+        first_batch.setdefault(self.contract_id, time.perf_counter())
+        add(self, clauses_meta)
+
+    cls.add = timed_add
+
+
+_first_batch_timed(ContractIndexBuilder)
+_first_batch_timed(ContractUpdater)
+
+
+def _staged_clauses(path: str, fmt: str) -> list:
+    text = extract_text_pdf(path) if fmt == "pdf" else extract_text_docx(path)
+    clauses = split_into_clauses(text)
+    for c in clauses:
+        c["clause_id"] = norm_clause_id(c["clause_id"])
+    mask_rows(clauses, "clause_text")
+    return clauses
+
+
+def staged(path: str, fmt: str, contract_id: str) -> None:
+    clauses = _staged_clauses(path, fmt)
+    meta = []
+    for c in clauses:
+        lang = detect_lang(c["clause_text"])
+        meta.append({
+            "contract_id": contract_id, "clause_id": c["clause_id"], "clause_text": c["clause_text"],
+            "language": lang, "label": predict_clause(c["clause_text"], lang), "pii_masked": True,
+            **({"pii": c["pii"]} if "pii" in c else {}),
+        })
+    rag.build_contract_index(contract_id, meta, tenant_id="bench")
+
+
+def streaming(path: str, fmt: str, contract_id: str) -> None:
+    ingest(path, fmt, contract_id, "bench", None)
+
+
+def staged_amended(path: str, fmt: str, contract_id: str) -> None:
+    # previous amended path: every clause collected, then the whole version diffed
+    clauses = _staged_clauses(path, fmt)
+    previous = rag.previous_clauses_by_key(contract_id)
+    meta = classify_clauses(clauses, contract_id, keys=clause_keys(clauses), previous=previous)
+    rag.update_contract_index(contract_id, meta)
+
+
+def streaming_amended(path: str, fmt: str, contract_id: str) -> None:
+    ingest(path, fmt, contract_id, "bench", contract_id)
+
+
+def measure(fn, path: str, fmt: str, runs: int, base: Optional[str] = None) -> dict:
+    """
+    base: document ingested (untimed) as the previous version before each run.
+    """
+    def fresh_contract() -> str:
+        cid = "B" + uuid.uuid4().hex[:8].upper()
+        if base:
+            ingest(base, fmt, cid, "bench", None)
+        return cid
+
+    times, firsts, cid = [], [], None
+    for _ in range(runs):
+        cid = fresh_contract()
+        t = time.perf_counter()
+        fn(path, fmt, cid)
+        end = time.perf_counter()
+        times.append(end - t)
+        firsts.append(first_batch.get(cid, end) - t)
+
+    peak_cid = fresh_contract()
+    tracemalloc.start()
+    fn(path, fmt, peak_cid)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"s": min(times), "first_s": min(firsts), "peak_mb": peak / 2**20, "contract_id": cid}
+
+
+def same_result(a: str, b: str) -> bool:
+    ma, mb = rag.store.get(a)["meta"], rag.store.get(b)["meta"]
+    key = lambda m: (m["clause_id"], m["clause_text"], m["label"], m["language"])
+    return list(map(key, ma)) == list(map(key, mb)) and rag.store.language(a) == rag.store.language(b)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=20, help="document length multiplier (fixtures.contract_articles)")
+    ap.add_argument("--runs", type=int, default=3)
+    ap.add_argument("--langs", default=",".join(LANGS))
+    args = ap.parse_args()
+
+    print(f"index mode={rag.contract_index_mode} repeat={args.repeat} (best of {args.runs})")
+    print(f"{'doc':>10} {'case':>8} {'staged s':>9} {'stream s':>9} {'staged 1st':>11} {'stream 1st':>11} "
+          f"{'staged MB':>10} {'stream MB':>10} {'same':>5}")
+    for lang in [l for l in args.langs.split(",") if l]:
+        for fmt, make in (("pdf", contract_pdf), ("docx", contract_docx)):
+            paths = []
+            for seed in (0, 1):
+                fd, path = tempfile.mkstemp(suffix="." + fmt)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(make(lang, seed=seed, repeat=args.repeat))
+                paths.append(path)
+            v1, v2 = paths
+            try:
+                rows = [
+                    ("new", measure(staged, v1, fmt, args.runs), measure(streaming, v1, fmt, args.runs)),
+                    ("amended", measure(staged_amended, v2, fmt, args.runs, base=v1),
+                     measure(streaming_amended, v2, fmt, args.runs, base=v1)),
+                ]
+            finally:
+                for path in paths:
+                    os.unlink(path)
+            for case, s, p in rows:
+                same = same_result(s["contract_id"], p["contract_id"])
+                print(f"{lang + '_' + fmt:>10} {case:>8} {s['s']:>9.2f} {p['s']:>9.2f} {s['first_s']:>11.2f} "
+                      f"{p['first_s']:>11.2f} {s['peak_mb']:>10.1f} {p['peak_mb']:>10.1f} {'yes' if same else 'NO':>5}")
+
+
+if __name__ == "__main__":
+    main()
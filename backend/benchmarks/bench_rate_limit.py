@@ -0,0 +1,106 @@
+"""
+Rate limiter microbenchmark at many distinct keys (e.g. one per client IP).
+
+Compares the sliding-window-counter LocalBackend with the previous
+deque-of-timestamps limiter: throughput, per-call latency, memory per key,
+idle-key sweep time, and that the limit holds under concurrent threads.
+
+    cd backend
+    python -m benchmarks.bench_rate_limit --keys 100000 --hits 5
+"""
+import argparse
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from security.rate_limit import WINDOW_SECONDS, LocalBackend
+
+
+class DequeLimiter:
+    """
+    The previous implementation (timestamps per key, never swept), as baseline.
+    """
+    def __init__(self):
+        self.buckets = defaultdict(deque)
+
+    def hit(self, key, limit, window, cost=1, now=None):
+        now = time.time() if now is None else now
+        q = self.buckets[key]
+        while q and (now - q[0]) > window:
+            q.popleft()
+        if len(q) >= limit:
+            return False
+        q.append(now)
+        return True
+
+
+def pct(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(q / 100 * len(sorted_vals)))]
+
+
+def run(name, make, keys, hits, limit):
+    backend = make()
+    lat = [0.0] * (len(keys) * hits)
+    i = 0
+    t0 = time.perf_counter()
+    for _ in range(hits):
+        for k in keys:
+            t = time.perf_counter()
+            backend.hit(k, limit, WINDOW_SECONDS)
+            lat[i] = time.perf_counter() - t
+            i += 1
+    wall = time.perf_counter() - t0
+    lat.sort()
+
+    # memory in a separate pass: tracemalloc slows every allocation
+    tracemalloc.start()
+    fresh = make()
+    for _ in range(hits):
+        for k in keys:
+            fresh.hit(k, limit, WINDOW_SECONDS)
+    mem, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"{name:<14} {i / wall:>12,.0f} {pct(lat, 50) * 1e6:>9.2f} "
+        f"{pct(lat, 99) * 1e6:>9.2f} {mem / len(keys):>10.0f}"
+    )
+    return backend
+
+
+def concurrency_check(threads: int, limit: int, attempts: int) -> None:
+    backend = LocalBackend()
+
+    def worker(_):
+        return sum(backend.hit("shared", limit, WINDOW_SECONDS).allowed for _ in range(attempts))
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        allowed = sum(pool.map(worker, range(threads)))
+    status = "OK" if allowed == limit else "FAIL"
+    print(f"concurrency: {threads} threads x {attempts} hits, limit={limit} -> allowed={allowed} [{status}]")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--keys", type=int, default=100_000)
+    ap.add_argument("--hits", type=int, default=5, help="hits per key")
+    ap.add_argument("--limit", type=int, default=30)
+    ap.add_argument("--threads", type=int, default=8)
+    args = ap.parse_args()
+
+    keys = [f"ask:10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(args.keys)]
+    print(f"keys={args.keys} hits/key={args.hits} limit={args.limit}")
+    print(f"{'limiter':<14} {'hits/s':>12} {'p50 us':>9} {'p99 us':>9} {'B/key':>10}")
+    run("deque (old)", DequeLimiter, keys, args.hits, args.limit)
+    local = run("sliding-window", LocalBackend, keys, args.hits, args.limit)
+
+    # every key is idle two windows later
+    t = time.perf_counter()
+    removed = local.sweep(now=time.monotonic() + 3 * WINDOW_SECONDS)
+    print(f"sweep: removed {removed} idle keys in {(time.perf_counter() - t) * 1000:.1f} ms, {len(local)} left")
+
+    concurrency_check(args.threads, args.limit, attempts=1000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+End-to-end load benchmark for /upload_contract, /ask, /ask_general and
+/summary, in-process (FastAPI TestClient) with the local LLM stub.
+
+    cd backend
+    LLM_STUB=1 LLM_STUB_LATENCY_MS=300 python -m benchmarks.e2e --requests 40 --concurrency 4 --out bench.json
+    LLM_STUB=1 python -m benchmarks.e2e --compare bench.json      # run again and diff against a saved run
+
+Per scenario: p50/p95/p99/mean latency, RPS, errors, per-stage time from
+utils.metrics (ms per request) and per-node time from the graph traces.
+Rate limiting is off unless RATE_LIMIT_UNITS is set.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+os.environ.setdefault("LLM_STUB", "1")
+os.environ.setdefault("RATE_LIMIT_UNITS", "0")   # no rate limiting (it has its own benchmark)
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from benchmarks.fixtures import build_fixtures
+from main import app
+from api.deps import answer_cache, client as llm_client
+from agents.summary_graph import summary_cache
+from utils.metrics import metrics
+
+ASK_QUESTIONS = {
+    "en": ["What is my basic salary?", "How long is the probation period?", "How many annual leave days do I get?",
+           "What notice is required to terminate the contract?", "Is there a non-compete clause?"],
+    "ar": ["كم الراتب الأساسي؟", "ما مدة فترة التجربة؟", "كم عدد أيام الإجازة السنوية؟",
+           "ما مدة الإشعار لإنهاء العقد؟", "هل يوجد شرط عدم منافسة؟"],
+}
+GENERAL_QUESTIONS = ASK_QUESTIONS["en"][:3] + ASK_QUESTIONS["ar"][:3] + [
+    "What does Article 80 say?", "How is the end of service award calculated?",
+]
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def run_load(name: str, fn: Callable[[int], dict], n: int, concurrency: int) -> dict:
+    """
+    Call fn(i) n times from `concurrency` threads. fn returns the response JSON.
+    """
+    stages_before = metrics.stage_totals()
+    lat: List[float] = []
+    errors = 0
+    nodes: Dict[str, List[float]] = {}
+
+    def one(i):
+        t = time.perf_counter()
+        try:
+            out = fn(i)
+            ok = True
+        except Exception:
+            out, ok = None, False
+        return (time.perf_counter() - t) * 1000, ok, out
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ms, ok, out in pool.map(one, range(n)):
+            lat.append(ms)
+            if not ok or (isinstance(out, dict) and out.get("error")):
+                errors += 1
+                continue
+            for node in ((out or {}).get("debug") or {}).get("nodes", []):
+                nodes.setdefault(node["node"], []).append(node["ms"])
+    wall = time.perf_counter() - t0
+
+    stages = {}
+    for stage, after in metrics.stage_totals().items():
+        before = stages_before.get(stage, {"calls": 0, "sampled": 0, "seconds": 0.0})
+        calls = after["calls"] - before["calls"]
+        sampled = after["sampled"] - before["sampled"]
+        if calls and sampled:
+            mean_s = (after["seconds"] - before["seconds"]) / sampled
+            stages[stage] = round(mean_s * calls / n * 1000, 2)   # ms per request
+
+    a = np.array(lat)
+    return {
+        "requests": n,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": round(float(np.percentile(a, 50)), 2),
+        "p95_ms": round(float(np.percentile(a, 95)), 2),
+        "p99_ms": round(float(np.percentile(a, 99)), 2),
+        "mean_ms": round(float(a.mean()), 2),
+        "rps": round(n / wall, 2),
+        "stages_ms_per_request": stages,
+        "nodes_mean_ms": {k: round(float(np.mean(v)), 2) for k, v in nodes.items()},
+    }
+
+
+def compare(current: dict, baseline: dict) -> None:
+    print(f"\nvs {baseline.get('meta', {}).get('commit')} -> {current['meta']['commit']}")
+    print(f"{'scenario':<20} {'p50':>16} {'p95':>16} {'rps':>14}")
+    for name, cur in current["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+
+        def d(key):
+            b, c = base[key], cur[key]
+            pct = (c - b) / b * 100 if b else 0.0
+            return f"{c:>8.1f} ({pct:+5.1f}%)"
+        print(f"{name:<20} {d('p50_ms'):>16} {d('p95_ms'):>16} {d('rps'):>14}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--repeat", type=int, default=1, help="fixture length multiplier")
+    ap.add_argument("--scenarios", default="upload,ask,ask_general,summary,summary_sections")
+    ap.add_argument("--warm", action="store_true", help="keep summary / answer caches between requests")
+    ap.add_argument("--out", default=None, help="write results JSON here")
+    ap.add_argument("--compare", default=None, help="baseline results JSON to diff against")
+    args = ap.parse_args()
+
+    if not os.environ.get("LLM_STUB") == "1":
+        sys.exit("Set LLM_STUB=1 (benchmarks never call OpenAI).")
+
+    if not args.warm:
+        answer_cache.threshold = 1.01   # never hit
+
+    http = TestClient(app)
+    fixtures = build_fixtures(repeat=args.repeat)
+    names = list(fixtures)
+    wanted = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+
+    def upload(i):
+        fname, data = fixtures[names[i % len(names)]]
+        return http.post("/upload_contract", files={"file": (fname, data)}).json()
+
+    # one indexed contract per fixture for the read scenarios
+    contracts = [(name, upload(j)["contract_id"]) for j, name in enumerate(names)]
+
+    def ask(i):
+        name, cid = contracts[i % len(contracts)]
+        qs = ASK_QUESTIONS["ar" if name.startswith("ar") else "en"]
+        return http.post("/ask", json={"contract_id": cid, "question": qs[i % len(qs)], "debug": True}).json()
+
+    def ask_general(i):
+        return http.post("/ask_general", json={"question": GENERAL_QUESTIONS[i % len(GENERAL_QUESTIONS)]}).json()
+
+    def summary(strategy):
+        def fn(i):
+            name, cid = contracts[i % len(contracts)]
+            if not args.warm:
+                summary_cache.invalidate(cid)
+            lang = "ar" if name.startswith("ar") else "en"
+            return http.post(
+                "/summary", json={"contract_id": cid, "language": lang, "strategy": strategy, "debug": True}
+            ).json()
+        return fn
+
+    scenarios = {
+        "upload": upload,
+        "ask": ask,
+        "ask_general": ask_general,
+        "summary": summary("single"),
+        "summary_sections": summary("sections"),
+    }
+
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "llm_stub_latency_ms": getattr(llm_client, "latency_ms", None),
+            "llm_stub_ms_per_token": getattr(llm_client, "ms_per_token", None),
+            "contract_index_mode": os.environ.get("CONTRACT_INDEX_MODE", "flat"),
+            "rerank": os.environ.get("RERANK_ENABLED", "0") == "1",
+            "warm_caches": args.warm,
+            "fixtures": {k: len(v[1]) for k, v in fixtures.items()},
+        },
+        "scenarios": {},
+    }
+
+    print(f"{'scenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rps':>7} {'err':>4}  top stages (ms/request)")
+    for name in wanted:
+        r = run_load(name, scenarios[name], args.requests, args.concurrency)
+        results["scenarios"][name] = r
+        top = sorted(r["stages_ms_per_request"].items(), key=lambda kv: -kv[1])[:4]
+        top_s = ", ".join(f"{k}={v:.0f}" for k, v in top)
+        print(f"{name:<20} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f} {r['rps']:>7.2f} {r['errors']:>4}  {top_s}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\nwrote {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
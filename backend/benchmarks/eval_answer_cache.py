@@ -0,0 +1,60 @@
+"""
+Semantic answer cache (rag.answer_cache) on confusable question pairs:
+questions that differ only in a number or article embed almost identically
+and must NOT share a cached answer; paraphrases with the same numbers may.
+
+Prints the cosine similarity of each pair next to the cache decision and
+exits non-zero on any wrong hit.
+
+    cd backend
+    python -m benchmarks.eval_answer_cache
+"""
+import argparse
+import sys
+
+from sentence_transformers import SentenceTransformer
+
+from rag.answer_cache import SemanticAnswerCache
+from rag.engine import EMBED_MODEL_NAME
+
+# (cached question, new question, lang, may the answer be reused?)
+PAIRS = [
+    ("How is the end of service award calculated after 3 years?",
+     "How is the end of service award calculated after 7 years?", "en", False),
+    ("What does Article 77 say?", "What does Article 80 say?", "en", False),
+    ("Can I be dismissed under Article 80?", "Can I be dismissed under Article 81?", "en", False),
+    ("How much notice for a salary of 5000 SAR?", "How much notice for a salary of 9000 SAR?", "en", False),
+    ("ماذا تنص المادة 77 من نظام العمل؟", "ماذا تنص المادة 80 من نظام العمل؟", "ar", False),
+    ("ماذا تنص المادة الأولى؟", "ماذا تنص المادة الثانية؟", "ar", False),
+    ("كم مكافأة نهاية الخدمة بعد ٣ سنوات؟", "كم مكافأة نهاية الخدمة بعد 7 سنوات؟", "ar", False),
+    ("What does Article 80 say?", "what does article 80 say", "en", True),
+    ("كم مكافأة نهاية الخدمة بعد ٣ سنوات؟", "كم مكافأة نهاية الخدمة بعد 3 سنوات", "ar", True),
+]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--threshold", type=float, default=0.92)
+    args = ap.parse_args()
+
+    embedder = SentenceTransformer(EMBED_MODEL_NAME)
+    wrong = 0
+    print(f"{'cosine':>7} {'hit':>4} {'expect':>7}  pair")
+    for cached_q, new_q, lang, reusable in PAIRS:
+        cache = SemanticAnswerCache(embedder, threshold=args.threshold)
+        cache.put(cached_q, lang, f"answer to: {cached_q}")
+        sim = float(cache.embed(cached_q) @ cache.embed(new_q).T)
+        hit, _ = cache.lookup(new_q, lang)
+        ok = reusable or hit is None     # a missed paraphrase only costs a hit
+        wrong += not ok
+        print(f"{sim:>7.3f} {'yes' if hit else 'no':>4} {'hit' if reusable else 'miss':>7}  "
+              f"{cached_q!r} -> {new_q!r}{'' if ok else '   <-- WRONG ANSWER REUSED'}")
+
+    if wrong:
+        print(f"FAIL: {wrong} question(s) got another question's cached answer")
+        sys.exit(1)
+    print("OK: no cached answer reused across different numbers / articles")
+
+
+if __name__ == "__main__":
+    main()
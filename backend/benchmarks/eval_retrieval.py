@@ -0,0 +1,228 @@
+"""
+Offline retrieval evaluation: quality (recall@k, MRR, nDCG@k) next to
+latency and index memory for each retriever configuration.
+
+Contract side: the labeled clauses in data/dataset_contract_clean.csv are the
+corpus (one index per contract, as at upload); a clause is relevant to a
+query in eval_sets/contract_queries.jsonl when it carries the query's label.
+Configurations: flat / fp16 / int8 storage, with and without the
+cross-encoder reranker (--rerank).
+
+Law side: eval_sets/law_queries.jsonl lists the relevant article numbers per
+query; configurations: semantic only vs. with direct article lookup.
+
+Topic-profile shortcuts are disabled so every query really hits the index.
+
+    cd backend
+    python -m benchmarks.eval_retrieval --k 5 --rerank
+"""
+import argparse
+import csv
+import json
+import math
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+import faiss
+import numpy as np
+
+from rag.articles import parse_article_number
+from rag.engine import CONTRACT_INDEX_MODES, RAGEngine
+from rag.rerank import Reranker
+
+BASE_DIR = Path(__file__).resolve().parents[1]          # backend/
+ARTIFACTS_DIR = BASE_DIR.parent / "artifacts" / "law"
+EVAL_DIR = Path(__file__).resolve().parent / "eval_sets"
+DATA_PATH = BASE_DIR / "data" / "dataset_contract_clean.csv"
+
+RERANK_CANDIDATES = 20
+
+
+# -------------------------
+# Metrics
+# -------------------------
+
+def recall_at_k(ranked: List, relevant: Set, k: int) -> float:
+    return len(set(ranked[:k]) & relevant) / len(relevant) if relevant else 0.0
+
+
+def reciprocal_rank(ranked: List, relevant: Set) -> float:
+    for i, d in enumerate(ranked, start=1):
+        if d in relevant:
+            return 1.0 / i
+    return 0.0
+
+
+def ndcg_at_k(ranked: List, relevant: Set, k: int) -> float:
+    dcg = sum(1.0 / math.log2(i + 1) for i, d in enumerate(ranked[:k], start=1) if d in relevant)
+    ideal = sum(1.0 / math.log2(i + 1) for i in range(1, min(k, len(relevant)) + 1))
+    return dcg / ideal if ideal else 0.0
+
+
+def dedupe(ids: Iterable) -> List:
+    return list(dict.fromkeys(ids))
+
+
+def summarize(rows: List[dict]) -> dict:
+    lat = np.array([r["ms"] for r in rows]) if rows else np.zeros(1)
+    out = {
+        "queries": len(rows),
+        "recall": float(np.mean([r["recall"] for r in rows])) if rows else 0.0,
+        "mrr": float(np.mean([r["rr"] for r in rows])) if rows else 0.0,
+        "ndcg": float(np.mean([r["ndcg"] for r in rows])) if rows else 0.0,
+        "p50_ms": float(np.percentile(lat, 50)),
+        "p95_ms": float(np.percentile(lat, 95)),
+    }
+    for lang in ("ar", "en"):
+        sub = [r["recall"] for r in rows if r["lang"] == lang]
+        out[f"recall_{lang}"] = float(np.mean(sub)) if sub else float("nan")
+    return out
+
+
+def index_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+# -------------------------
+# Data
+# -------------------------
+
+def load_jsonl(path: Path) -> List[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def load_contracts(path: Path) -> Dict[str, List[dict]]:
+    contracts: Dict[str, List[dict]] = {}
+    with open(path, encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            contracts.setdefault(row["contract_id"], []).append({
+                "contract_id": row["contract_id"],
+                "clause_id": row["clause_id"],
+                "clause_text": row["clause_text"],
+                "language": row["language"],
+                "label": row["label"],
+            })
+    return contracts
+
+
+# -------------------------
+# Evaluation
+# -------------------------
+
+def eval_contract(rag: RAGEngine, contracts, queries, mode: str, reranker, k: int) -> Tuple[dict, int]:
+    rag.contract_index_mode = mode
+    mem = 0
+    for cid, clauses in contracts.items():
+        rag.build_contract_index(cid, clauses)
+        bundle = rag.store.get(cid)
+        mem += index_bytes(bundle["index"])
+        mem += sum(index_bytes(p["index"]) for p in (bundle.get("partitions") or {}).values())
+
+    rows = []
+    for cid, clauses in contracts.items():
+        for q in queries:
+            relevant = {(c["clause_id"], c["language"]) for c in clauses if c["label"] == q["label"]}
+            if not relevant:
+                continue
+            t = time.perf_counter()
+            if reranker is not None:
+                hits = rag.retrieve_contract(cid, q["query"], k=RERANK_CANDIDATES)
+                hits = reranker.rerank(q["query"], hits, top_n=k)
+            else:
+                hits = rag.retrieve_contract(cid, q["query"], k=k)
+            ms = (time.perf_counter() - t) * 1000
+            ranked = dedupe((h["clause_id"], h.get("language")) for h in hits)
+            rows.append({
+                "lang": q["lang"], "ms": ms,
+                "recall": recall_at_k(ranked, relevant, k),
+                "rr": reciprocal_rank(ranked, relevant),
+                "ndcg": ndcg_at_k(ranked, relevant, k),
+            })
+    return summarize(rows), mem
+
+
+def eval_law(rag: RAGEngine, queries, lookup: bool, k: int) -> dict:
+    saved = rag.law_articles
+    if not lookup:
+        rag.law_articles = {}
+    rows = []
+    try:
+        for q in queries:
+            relevant = set(q["articles"])
+            t = time.perf_counter()
+            hits = rag.retrieve_law(q["query"], lang=q["lang"], k=k)
+            ms = (time.perf_counter() - t) * 1000
+            ranked = dedupe(
+                n for n in (parse_article_number(h.get("article")) for h in hits) if n is not None
+            )
+            rows.append({
+                "lang": q["lang"], "ms": ms,
+                "recall": recall_at_k(ranked, relevant, k),
+                "rr": reciprocal_rank(ranked, relevant),
+                "ndcg": ndcg_at_k(ranked, relevant, k),
+            })
+    finally:
+        rag.law_articles = saved
+    return summarize(rows)
+
+
+def print_table(title: str, results: Dict[str, dict], k: int) -> None:
+    print(f"\n{title}")
+    print(
+        f"{'config':<22} {'n':>4} {f'R@{k}':>7} {'R@k ar':>7} {'R@k en':>7} {'MRR':>7} "
+        f"{f'nDCG@{k}':>8} {'p50 ms':>8} {'p95 ms':>8} {'index KB':>9}"
+    )
+    for name, r in results.items():
+        mem = f"{r['bytes'] / 1024:>9.1f}" if r.get("bytes") is not None else f"{'-':>9}"
+        print(
+            f"{name:<22} {r['queries']:>4} {r['recall']:>7.3f} {r['recall_ar']:>7.3f} {r['recall_en']:>7.3f} "
+            f"{r['mrr']:>7.3f} {r['ndcg']:>8.3f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {mem}"
+        )
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--k", type=int, default=5)
+    ap.add_argument("--data", default=str(DATA_PATH))
+    ap.add_argument("--contract-queries", default=str(EVAL_DIR / "contract_queries.jsonl"))
+    ap.add_argument("--law-queries", default=str(EVAL_DIR / "law_queries.jsonl"))
+    ap.add_argument("--law-index", default=str(ARTIFACTS_DIR / "law.index"))
+    ap.add_argument("--law-meta", default=str(ARTIFACTS_DIR / "law_meta.json"))
+    ap.add_argument("--modes", default=",".join(CONTRACT_INDEX_MODES))
+    ap.add_argument("--rerank", action="store_true", help="also evaluate each mode with the cross-encoder")
+    ap.add_argument("--out", default=None, help="write results JSON here")
+    args = ap.parse_args()
+
+    rag = RAGEngine(args.law_index, args.law_meta, profile_queries=None)
+    contracts = load_contracts(Path(args.data))
+    contract_queries = load_jsonl(Path(args.contract_queries))
+    law_queries = load_jsonl(Path(args.law_queries))
+    reranker = Reranker(enabled=True, budget_ms=1e9) if args.rerank else None
+
+    contract_results = {}
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        summary, mem = eval_contract(rag, contracts, contract_queries, mode, None, args.k)
+        contract_results[mode] = {**summary, "bytes": mem}
+        if reranker is not None:
+            summary, mem = eval_contract(rag, contracts, contract_queries, mode, reranker, args.k)
+            contract_results[f"{mode}+rerank"] = {**summary, "bytes": mem}
+
+    law_results = {
+        "semantic": {**eval_law(rag, law_queries, lookup=False, k=args.k), "bytes": index_bytes(rag.law_index)},
+        "semantic+article_lookup": {**eval_law(rag, law_queries, lookup=True, k=args.k), "bytes": index_bytes(rag.law_index)},
+    }
+
+    print(f"contracts={len(contracts)} contract_queries={len(contract_queries)} law_queries={len(law_queries)} k={args.k}")
+    print_table("CONTRACT RETRIEVAL (retrieve_contract)", contract_results, args.k)
+    print_table("LAW RETRIEVAL (retrieve_law)", law_results, args.k)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"k": args.k, "contract": contract_results, "law": law_results}, f, indent=2)
+        print(f"\nwrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
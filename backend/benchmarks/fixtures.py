@@ -0,0 +1,121 @@
+"""
+Synthetic employment-contract fixtures (Arabic / English / mixed) as PDF and
+DOCX bytes, for the end-to-end benchmarks. Deterministic for a given seed.
+"""
+import io
+import random
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+from docx import Document
+
+REPO_DIR = Path(__file__).resolve().parents[2]
+ARABIC_FONT = REPO_DIR / "web" / "public" / "fonts" / "sf-mada-bold.ttf"
+
+EN_CLAUSES = [
+    ("Salary", "The Employee shall receive a basic monthly salary of {n}000 SAR, paid on the last working day of each month, in addition to a housing allowance of {m}00 SAR."),
+    ("Probation", "The Employee shall be subject to a probation period of {p} days, during which either party may terminate this contract without compensation."),
+    ("Working Hours", "Working hours shall be eight hours per day and forty-eight hours per week, with one paid rest day per week. Overtime is paid at 150% of the basic wage."),
+    ("Leave", "The Employee is entitled to an annual leave of {l} days with full pay, in addition to official public holidays."),
+    ("Termination", "Either party may terminate this contract by giving the other party written notice of {q} days. End of service award is calculated under the Labor Law."),
+    ("Benefits", "The Employer shall provide medical insurance for the Employee and an annual return air ticket."),
+    ("Penalties", "Disciplinary penalties shall follow the Employer's approved work regulations and the Labor Law."),
+    ("Duration", "This contract is concluded for a fixed term of {y} year(s) starting from the date of joining and may be renewed by written agreement."),
+    ("Non-Compete", "The Employee shall not work for a competitor within the Kingdom for {c} months after the end of this contract."),
+    ("Confidentiality", "The Employee shall keep confidential all information obtained during employment. Contact: hr@example.com, +966 5{n}1234567."),
+]
+
+AR_CLAUSES = [
+    ("الأجر", "يتقاضى الموظف أجرا أساسيا شهريا قدره {n}000 ريال يصرف في آخر يوم عمل من كل شهر بالإضافة إلى بدل سكن قدره {m}00 ريال."),
+    ("التجربة", "يخضع الموظف لفترة تجربة مدتها {p} يوما ويجوز لأي من الطرفين إنهاء العقد خلالها دون تعويض."),
+    ("ساعات العمل", "تكون ساعات العمل ثماني ساعات يوميا وثماني وأربعين ساعة أسبوعيا مع يوم راحة أسبوعي مدفوع الأجر."),
+    ("الإجازات", "يستحق الموظف إجازة سنوية مدتها {l} يوما بأجر كامل إضافة إلى العطل الرسمية."),
+    ("إنهاء العقد", "يجوز لأي من الطرفين إنهاء هذا العقد بإشعار كتابي مدته {q} يوما وتحسب مكافأة نهاية الخدمة وفق نظام العمل."),
+    ("المزايا", "يلتزم صاحب العمل بتوفير التأمين الطبي للموظف وتذكرة سفر سنوية ذهابا وإيابا."),
+    ("الجزاءات", "تطبق الجزاءات التأديبية وفق لائحة تنظيم العمل المعتمدة ونظام العمل."),
+    ("مدة العقد", "يبرم هذا العقد لمدة {y} سنة تبدأ من تاريخ المباشرة ويجوز تجديده باتفاق كتابي."),
+    ("عدم المنافسة", "يلتزم الموظف بعدم العمل لدى منافس داخل المملكة لمدة {c} أشهر بعد انتهاء العقد."),
+]
+
+LANGS = ("en", "ar", "mixed")
+
+
+def _fill(template: str, rng: random.Random) -> str:
+    return template.format(
+        n=rng.randint(4, 9), m=rng.randint(5, 9), p=rng.choice((30, 60, 90)), l=rng.choice((21, 30)),
+        q=rng.choice((30, 60)), y=rng.randint(1, 3), c=rng.choice((6, 12)),
+    )
+
+
+def contract_articles(lang: str, seed: int = 0, repeat: int = 1) -> List[Tuple[str, str]]:
+    """
+    [(heading, body)] for an "en", "ar" or "mixed" contract.
+    `repeat` multiplies the clause list to produce longer documents.
+    """
+    rng = random.Random(f"{lang}:{seed}")
+    out = []
+    for r in range(repeat):
+        if lang in ("en", "mixed"):
+            out += [(h, _fill(t, rng)) for h, t in EN_CLAUSES]
+        if lang in ("ar", "mixed"):
+            out += [(h, _fill(t, rng)) for h, t in AR_CLAUSES]
+    return out
+
+
+def _heading(i: int, title: str) -> str:
+    if any("\u0600" <= ch <= "\u06ff" for ch in title):
+        return f"المادة {i}: {title}"
+    return f"Article {i}: {title}"
+
+
+def contract_docx(lang: str, seed: int = 0, repeat: int = 1) -> bytes:
+    doc = Document()
+    doc.add_paragraph("EMPLOYMENT CONTRACT / عقد عمل")
+    for i, (title, body) in enumerate(contract_articles(lang, seed, repeat), start=1):
+        doc.add_paragraph(_heading(i, title))
+        doc.add_paragraph(body)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def contract_pdf(lang: str, seed: int = 0, repeat: int = 1) -> bytes:
+    """
+    A4 pages, one line per paragraph; Arabic text uses the bundled SF Mada font.
+    """
+    doc = fitz.open()
+    has_font = ARABIC_FONT.exists()
+    page, y = None, 0.0
+    lines = ["EMPLOYMENT CONTRACT"]
+    for i, (title, body) in enumerate(contract_articles(lang, seed, repeat), start=1):
+        lines += [_heading(i, title), body, ""]
+
+    for line in lines:
+        if page is None or y > 780:
+            page = doc.new_page(width=595, height=842)
+            if has_font:
+                page.insert_font(fontname="mada", fontfile=str(ARABIC_FONT))
+            y = 50.0
+        if not line:
+            y += 10
+            continue
+        rect = fitz.Rect(40, y, 555, y + 60)
+        arabic = any("\u0600" <= ch <= "\u06ff" for ch in line)
+        fontname = "mada" if (arabic and has_font) else "helv"
+        page.insert_textbox(rect, line, fontsize=10, fontname=fontname, align=2 if arabic else 0)
+        y += 14 * (1 + len(line) // 95) + 4
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def build_fixtures(repeat: int = 1) -> Dict[str, Tuple[str, bytes]]:
+    """
+    name -> (filename, bytes) for every language x format.
+    """
+    out = {}
+    for lang in LANGS:
+        out[f"{lang}_pdf"] = (f"contract_{lang}.pdf", contract_pdf(lang, repeat=repeat))
+        out[f"{lang}_docx"] = (f"contract_{lang}.docx", contract_docx(lang, repeat=repeat))
+    return out
@@ -0,0 +1,139 @@
+"""
+Deterministic local stand-in for the OpenAI client (benchmarks only).
+
+Enabled in api/deps.py with LLM_STUB=1. Implements the two calls the app
+makes:
+
+    client.responses.create(model, input, temperature)          -> .output_text, .usage
+    client.chat.completions.create(model, messages, ..., response_format) -> .choices[0].message.content, .usage
+
+Latency per call = LLM_STUB_LATENCY_MS + LLM_STUB_MS_PER_TOKEN * output tokens
+(+/- LLM_STUB_JITTER, seeded), so runs are comparable across commits.
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List
+
+from api.constants import TOPIC_QUERIES
+from services.token_budget import count_tokens
+
+_CLAUSE_ID_RE = re.compile(r"clause_id=(\w+)")
+_ARTICLE_RE = re.compile(r"article=([^|\n]+)")
+_ARABIC_RE = re.compile(r"[\u0600-\u06FF]")
+
+
+def _section_key(topic: str) -> str:
+    return topic.lower().replace(" ", "_").replace("-", "_")
+
+
+class StubClient:
+    def __init__(self, latency_ms: float = 300.0, ms_per_token: float = 0.0, jitter: float = 0.1, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.ms_per_token = ms_per_token
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+
+    # -------------------------
+    # Timing / usage
+    # -------------------------
+
+    def _sleep(self, out_tokens: int) -> None:
+        with self._lock:
+            self.calls += 1
+            j = self._rng.uniform(-self.jitter, self.jitter)
+        ms = (self.latency_ms + self.ms_per_token * out_tokens) * (1.0 + j)
+        if ms > 0:
+            time.sleep(ms / 1000)
+
+    @staticmethod
+    def _text_of(messages) -> str:
+        if isinstance(messages, str):
+            return messages
+        return "\n".join(str(m.get("content", "")) for m in messages)
+
+    # -------------------------
+    # responses.create (translate / detect language / answers)
+    # -------------------------
+
+    def _responses_create(self, model: str, input: Any, temperature: float = 0, **kwargs):
+        prompt = self._text_of(input)
+
+        if prompt.startswith("Detect the language"):
+            out = "ar" if _ARABIC_RE.search(prompt.split("TEXT:", 1)[-1]) else "en"
+        elif prompt.startswith("Translate the following text"):
+            # identity "translation": keeps retrieval behaviour realistic
+            out = prompt.split("\n\n", 1)[-1]
+        else:
+            out = self._answer(prompt)
+
+        in_tok, out_tok = count_tokens(prompt), count_tokens(out)
+        self._sleep(out_tok)
+        return SimpleNamespace(
+            output_text=out,
+            usage=SimpleNamespace(input_tokens=in_tok, output_tokens=out_tok, total_tokens=in_tok + out_tok),
+        )
+
+    def _answer(self, prompt: str) -> str:
+        clauses = _CLAUSE_ID_RE.findall(prompt)[:3]
+        articles = [a.strip() for a in _ARTICLE_RE.findall(prompt)][:2]
+        digest = hashlib.sha1(prompt.encode("utf-8")).hexdigest()[:8]
+        lines = [f"Stub answer {digest}."]
+        lines += [f"- Per clause {cid}, the contract addresses this point. [CONTRACT {cid}]" for cid in clauses]
+        lines += [f"- Labor law {a} applies. [LAW {a}]" for a in articles]
+        return "\n".join(lines)
+
+    # -------------------------
+    # chat.completions.create (summary JSON)
+    # -------------------------
+
+    def _chat_create(self, model: str, messages: List[Dict[str, str]], temperature: float = 0, response_format=None, **kwargs):
+        prompt = self._text_of(messages)
+        schema_name = ((response_format or {}).get("json_schema") or {}).get("name", "")
+
+        user = messages[-1]["content"] if messages else ""
+        if "CONTRACT SUMMARY JSON from" in prompt:
+            obj = json.loads(user)                       # translation of a cached summary
+        elif schema_name == "contract_summary_section":
+            m = re.search(r'"key":\s*"(\w+)"', prompt)
+            obj = self._section(m.group(1) if m else "general", prompt)
+        elif schema_name == "contract_summary_overview":
+            obj = {"overview": self._overview(prompt)}
+        else:
+            obj = {
+                "mode": "focused" if "MODE: focused" in prompt else "full",
+                "language": "en",
+                "overview": self._overview(prompt),
+                "sections": [self._section(_section_key(t), prompt) for t in TOPIC_QUERIES],
+            }
+
+        content = json.dumps(obj, ensure_ascii=False)
+        in_tok, out_tok = count_tokens(prompt), count_tokens(content)
+        self._sleep(out_tok)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=in_tok, completion_tokens=out_tok, total_tokens=in_tok + out_tok),
+        )
+
+    @staticmethod
+    def _sources(prompt: str) -> List[dict]:
+        return [{"type": "contract", "id": cid} for cid in _CLAUSE_ID_RE.findall(prompt)[:2]]
+
+    def _section(self, key: str, prompt: str) -> dict:
+        return {
+            "key": key,
+            "title": key.replace("_", " ").title(),
+            "bullets": [{"text": f"Stub bullet for {key}.", "sources": self._sources(prompt)}],
+        }
+
+    def _overview(self, prompt: str) -> List[dict]:
+        return [{"text": "Stub overview of the contract.", "sources": self._sources(prompt)}]
@@ -1,26 +1,65 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 from utils.check_env import check_environment
+from security.guardrails import GuardrailError
+from security.tenants import TenantAuthError
+from security.rate_limit import limiter
+from api.deps import RATE_LIMIT_UNITS, MAX_UPLOAD_BYTES, ocr, ingest_pool
+from api.middleware import BodySizeLimitMiddleware, RateLimitMiddleware
 
 from api.health import router as health_router
 from api.upload import router as upload_router
 from api.ask import router as ask_router
 from api.summary import router as summary_router
+from api.search import router as search_router
+from api.metrics import router as metrics_router
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = asyncio.create_task(limiter.sweep_forever())
+    yield
+    sweeper.cancel()
+    # stop worker pools on shutdown (OCR processes would otherwise outlive the server)
+    ocr.close()
+    ingest_pool.shutdown(wait=False, cancel_futures=True)
+
 
-app = FastAPI(title="Contract Understanding API")
+app = FastAPI(title="Contract Understanding API", lifespan=lifespan)
 
 check_environment()
 
+# added before CORS so it wraps them (413 / 429 responses stay readable from the browser)
+app.add_middleware(BodySizeLimitMiddleware, limits={"/upload_contract": MAX_UPLOAD_BYTES})
+app.add_middleware(RateLimitMiddleware, limiter=limiter, limit=RATE_LIMIT_UNITS)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-RateLimit-Limit", "X-RateLimit-Remaining", "X-RateLimit-Reset"],
 )
 
+
+@app.exception_handler(GuardrailError)
+def guardrail_error(request: Request, exc: GuardrailError):
+    return JSONResponse(status_code=400, content={"error": str(exc)})
+
+
+@app.exception_handler(TenantAuthError)
+def tenant_auth_error(request: Request, exc: TenantAuthError):
+    return JSONResponse(status_code=401, content={"error": str(exc)})
+
+
 app.include_router(health_router)
 app.include_router(upload_router)
 app.include_router(ask_router)
 app.include_router(summary_router)
+app.include_router(search_router)
+app.include_router(metrics_router)
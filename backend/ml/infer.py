@@ -1,6 +1,7 @@
 # backend/ml/infer.py
 
 from pathlib import Path
+from typing import List, Sequence
 import joblib
 from ml.preprocess import preprocess
 
@@ -43,3 +44,13 @@ def predict_clause(text: str, lang: str) -> str:
 
     final_label = postprocess_label(text, raw_label)
     return final_label
+
+
+def predict_clauses(texts: Sequence[str], langs: Sequence[str]) -> List[str]:
+    """
+    Batch predict_clause: one vectorizer / classifier call for the batch.
+    """
+    if not texts:
+        return []
+    X = vectorizer.transform([preprocess(t, l) for t, l in zip(texts, langs)])
+    return [postprocess_label(t, raw) for t, raw in zip(texts, clf.predict(X))]
@@ -0,0 +1,201 @@
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Optional, Tuple
+
+import faiss
+import numpy as np
+
+from ml.preprocess import normalize_arabic
+from rag.articles import _DIGITS, find_article_refs
+
+# -----------------------------
+# Semantic answer cache (/ask_general)
+# -----------------------------
+
+_TASHKEEL_RE = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u0640]")  # diacritics + tatweel
+_PUNCT_RE = re.compile(r"[^\w\s]", re.UNICODE)
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+TUNING_THRESHOLDS = (0.80, 0.85, 0.88, 0.90, 0.92, 0.94, 0.96, 0.98)
+
+
+def normalize_question(text: str) -> str:
+    t = (text or "").lower()
+    t = _TASHKEEL_RE.sub("", t)
+    t = normalize_arabic(t)
+    t = _PUNCT_RE.sub(" ", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def question_numbers(text: str) -> Tuple[str, ...]:
+    """
+    Article references and numbers in a question ("Article 77", "المادة الأولى",
+    "after 3 years"). Questions differing only in these embed almost
+    identically, so a cached answer is only reused when they match exactly.
+    """
+    nums = {f"art:{n}" for n in find_article_refs(text or "")}
+    nums.update(m.group(0).replace(",", "") for m in _NUMBER_RE.finditer((text or "").translate(_DIGITS)))
+    return tuple(sorted(nums))
+
+
+class SemanticAnswerCache:
+    """
+    Per-language FAISS index over past answered (normalized) questions.
+
+    - lookup() returns a cached answer when the nearest past question is
+      above `threshold` cosine similarity, not older than `ttl_seconds`
+      and mentions the same numbers / articles (question_numbers)
+    - each language keeps at most `max_per_lang` entries (oldest evicted)
+    - best-match scores of recent lookups are kept for tuning_report()
+    """
+
+    def __init__(self, embedder, threshold: float = 0.92, ttl_seconds: float = 24 * 3600, max_per_lang: int = 2000):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_per_lang = max_per_lang
+
+        self._langs: Dict[str, dict] = {}
+        self._lang_memo: "OrderedDict[str, str]" = OrderedDict()  # normalized question -> detected lang
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._scores = deque(maxlen=5000)
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "inserts": 0}
+
+    # -------------------------
+    # Language memo (skips the detection call for repeated questions)
+    # -------------------------
+
+    def known_language(self, question: str) -> Optional[str]:
+        with self._lock:
+            return self._lang_memo.get(normalize_question(question))
+
+    def remember_language(self, question: str, lang: str) -> None:
+        with self._lock:
+            self._lang_memo[normalize_question(question)] = lang
+            while len(self._lang_memo) > self.max_per_lang * 4:
+                self._lang_memo.popitem(last=False)
+
+    # -------------------------
+    # Lookup / insert
+    # -------------------------
+
+    def embed(self, question: str) -> np.ndarray:
+        return self.embedder.encode([normalize_question(question)], normalize_embeddings=True).astype("float32")
+
+    def _bucket(self, lang: str, dim: int) -> dict:
+        b = self._langs.get(lang)
+        if b is None:
+            b = {"index": faiss.IndexIDMap2(faiss.IndexFlatIP(dim)), "entries": OrderedDict()}
+            self._langs[lang] = b
+        return b
+
+    def _remove(self, b: dict, ids) -> None:
+        ids = [i for i in ids if i in b["entries"]]
+        if not ids:
+            return
+        b["index"].remove_ids(np.array(ids, dtype="int64"))
+        for i in ids:
+            b["entries"].pop(i, None)
+
+    def lookup(self, question: str, lang: str) -> Tuple[Optional[dict], np.ndarray]:
+        """
+        Returns (cached_entry or None, query_vector). Pass the vector back to
+        put() to avoid embedding the question twice.
+        """
+        vec = self.embed(question)
+        numbers = question_numbers(question)
+        now = time.time()
+        with self._lock:
+            b = self._langs.get(lang)
+            if not b or b["index"].ntotal == 0:
+                self._stats["misses"] += 1
+                return None, vec
+
+            D, I = b["index"].search(vec, min(4, b["index"].ntotal))
+            best = float(D[0][0])
+            self._scores.append(best)
+
+            expired = []
+            hit = None
+            for score, idx in zip(D[0], I[0]):
+                entry = b["entries"].get(int(idx))
+                if entry is None or score < self.threshold:
+                    continue
+                if now - entry["created"] > self.ttl_seconds:
+                    expired.append(int(idx))
+                    continue
+                if entry["numbers"] != numbers:
+                    continue
+                hit = {**entry, "similarity": float(score)}
+                break
+
+            if expired:
+                self._remove(b, expired)
+                self._stats["expired"] += len(expired)
+
+            self._stats["hits" if hit else "misses"] += 1
+            return hit, vec
+
+    def put(self, question: str, lang: str, answer: str, vec: Optional[np.ndarray] = None) -> None:
+        if vec is None:
+            vec = self.embed(question)
+        with self._lock:
+            b = self._bucket(lang, vec.shape[1])
+
+            # same normalized question already cached -> replace it
+            norm = normalize_question(question)
+            dup = [i for i, e in b["entries"].items() if e["normalized"] == norm]
+            self._remove(b, dup)
+
+            entry_id = self._next_id
+            self._next_id += 1
+            b["index"].add_with_ids(vec, np.array([entry_id], dtype="int64"))
+            b["entries"][entry_id] = {
+                "question": question,
+                "normalized": norm,
+                "numbers": question_numbers(question),
+                "answer": answer,
+                "created": time.time(),
+            }
+            self._stats["inserts"] += 1
+
+            overflow = len(b["entries"]) - self.max_per_lang
+            if overflow > 0:
+                self._remove(b, list(b["entries"])[:overflow])
+                self._stats["evictions"] += overflow
+
+    # -------------------------
+    # Reporting
+    # -------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = {lang: len(b["entries"]) for lang, b in self._langs.items()}
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["threshold"] = self.threshold
+        stats["ttl_seconds"] = self.ttl_seconds
+        return stats
+
+    def tuning_report(self) -> dict:
+        """
+        Would-be hit rate of recent lookups at several thresholds, plus the
+        distribution of best-match similarities (10 buckets from 0.5 to 1.0).
+        """
+        with self._lock:
+            scores = np.array(self._scores, dtype="float32")
+        if scores.size == 0:
+            return {"lookups": 0, "hit_rate_at": {}, "histogram": {}}
+
+        hist, edges = np.histogram(np.clip(scores, 0.5, 1.0), bins=10, range=(0.5, 1.0))
+        return {
+            "lookups": int(scores.size),
+            "current_threshold": self.threshold,
+            "hit_rate_at": {f"{t:.2f}": round(float((scores >= t).mean()), 4) for t in TUNING_THRESHOLDS},
+            "histogram": {f"{edges[i]:.2f}-{edges[i + 1]:.2f}": int(hist[i]) for i in range(len(hist))},
+            "mean_best_similarity": round(float(scores.mean()), 4),
+        }
@@ -0,0 +1,106 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+from ml.preprocess import normalize_arabic
+from services.chunker import AR_ORDINALS
+
+# -----------------------------
+# Article number parsing
+# -----------------------------
+
+# Arabic-Indic (٠-٩) and Extended Arabic-Indic / Persian-Urdu (۰-۹) digits -> ASCII
+_DIGITS = str.maketrans(
+    "٠١٢٣٤٥٦٧٨٩۰۱۲۳۴۵۶۷۸۹",
+    "01234567890123456789",
+)
+
+# "الأولى" -> 1 ... "العشرون" -> 20 (same ordinal list the chunker uses for headings)
+_AR_ORDINAL_TO_NUM = {
+    normalize_arabic(w.strip()): i
+    for i, w in enumerate(AR_ORDINALS.split("|"), start=1)
+}
+
+# longest first so "الحادية عشرة" wins over "الحادية"
+_AR_ORDINAL_RE = re.compile(
+    "|".join(sorted((re.escape(w) for w in _AR_ORDINAL_TO_NUM), key=len, reverse=True))
+)
+
+_NUM = r"[\d٠-٩۰-۹]{1,3}"
+
+# Article references inside a free-text query:
+# - Article 80 / Art. 80 / article (80) / Article No. 80
+# - المادة 80 / المادة (٨٠) / مادة رقم 80 / للمادة 80 / المادة الأولى
+ARTICLE_REF_RE = re.compile(
+    rf"""(?ix)
+    (?:
+        \b(?:article|art\.?)\s*(?:no\.?\s*|number\s*)?\(?\s*(?P<en>{_NUM})\s*\)?
+      |
+        (?:[وفب]?(?:ال|لل))?ماد[ةه]\s*(?:رقم\s*)?(?:\(?\s*(?P<ar>{_NUM})\s*\)?|(?P<ord>{_AR_ORDINAL_RE.pattern}))
+    )
+    """,
+    re.UNICODE,
+)
+
+
+def to_ascii_digits(text: str) -> str:
+    return text.translate(_DIGITS)
+
+
+def _to_int(digits: str) -> Optional[int]:
+    try:
+        return int(to_ascii_digits(digits))
+    except ValueError:
+        return None
+
+
+def parse_article_number(value) -> Optional[int]:
+    """
+    Normalize a law_meta "article" value (int, "80", "Article 80",
+    "المادة ٨٠", "المادة الأولى") to its integer number.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int):
+        return value
+
+    text = str(value).translate(_DIGITS)
+    m = re.search(r"\d+", text)
+    if m:
+        return int(m.group(0))
+
+    m = _AR_ORDINAL_RE.search(normalize_arabic(text))
+    if m:
+        return _AR_ORDINAL_TO_NUM[m.group(0)]
+    return None
+
+
+def find_article_refs(query: str) -> List[int]:
+    """
+    Article numbers explicitly referenced in a query, in order of appearance.
+    """
+    if not query:
+        return []
+
+    out: List[int] = []
+    for m in ARTICLE_REF_RE.finditer(normalize_arabic(query)):
+        if m.group("ord"):
+            num = _AR_ORDINAL_TO_NUM.get(m.group("ord"))
+        else:
+            num = _to_int(m.group("en") or m.group("ar"))
+        if num and num not in out:
+            out.append(num)
+    return out
+
+
+def build_article_index(law_meta: list) -> Dict[Tuple[int, str], List[int]]:
+    """
+    (article number, language) -> row indices in law_meta.
+    Several rows may share an article when long articles were chunked.
+    """
+    index: Dict[Tuple[int, str], List[int]] = {}
+    for i, item in enumerate(law_meta):
+        num = parse_article_number(item.get("article"))
+        if num is None:
+            continue
+        index.setdefault((num, item.get("language")), []).append(i)
+    return index
@@ -1,7 +1,14 @@
-import os, json, re
+import os, json, re, hashlib
 import faiss
+import numpy as np
 from sentence_transformers import SentenceTransformer
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
+
+from rag.articles import build_article_index, find_article_refs
+from rag.profile import build_contract_profile
+from rag.global_index import GlobalClauseIndex
+from utils.metrics import metrics
+from utils.tracing import record_embed, record_search
 
 # -----------------------------
 # Language Utilities
@@ -24,52 +31,464 @@ def detect_lang(text: str) -> str:
     return "ar" if re.search(r"[\u0600-\u06FF]", text) else "en"
 
 
+# -----------------------------
+# Contract index storage
+# -----------------------------
+
+EMBED_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+
+# "flat": float32 IndexFlatIP (exact)
+# "fp16": IndexScalarQuantizer QT_fp16  (~2x smaller, near-identical ranking)
+# "int8": IndexScalarQuantizer QT_8bit  (~4x smaller, trained on the contract's own vectors)
+CONTRACT_INDEX_MODES = ("flat", "fp16", "int8")
+
+# QT_8bit learns a per-dimension min/max from its training vectors; with only a
+# few (small contracts, per-language partitions) the ranges are degenerate and
+# scores get distorted, so such indexes are stored as fp16 instead.
+INT8_MIN_TRAIN_VECTORS = 256
+
+
+def make_contract_index(emb, mode: str = "flat", ids=None):
+    """
+    Inner-product index over normalized clause embeddings in the given storage mode.
+    Wrapped in IndexIDMap2 so clauses keep stable ids (default 0..n-1) and
+    can be added / removed in place when a contract is amended.
+    int8 with fewer than INT8_MIN_TRAIN_VECTORS vectors falls back to fp16.
+    """
+    dim = emb.shape[1]
+    if mode == "int8" and len(emb) < INT8_MIN_TRAIN_VECTORS:
+        mode = "fp16"
+    if mode == "flat":
+        index = faiss.IndexFlatIP(dim)
+    elif mode in ("fp16", "int8"):
+        qtype = faiss.ScalarQuantizer.QT_fp16 if mode == "fp16" else faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_INNER_PRODUCT)
+        if not index.is_trained:
+            index.train(emb)
+    else:
+        raise ValueError(f"Unknown contract index mode: {mode}")
+    index = faiss.IndexIDMap2(index)
+    if ids is None:
+        ids = np.arange(len(emb), dtype="int64")
+    index.add_with_ids(emb, np.asarray(ids, dtype="int64"))
+    return index
+
+
 # -----------------------------
 # Contract Store
 # -----------------------------
 
+def contract_content_hash(clauses_meta: list) -> str:
+    h = hashlib.sha256()
+    for c in clauses_meta:
+        h.update(c["clause_text"].encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+def clause_keys(clauses_meta: list, seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """
+    Identity of each clause across versions of a contract: hash of its text
+    plus an occurrence counter (for clauses repeated verbatim).
+    Clause numbering is ignored, so renumbered clauses still match.
+    seen: occurrence counts to continue from, when a document arrives in batches.
+    """
+    seen = {} if seen is None else seen
+    keys = []
+    for c in clauses_meta:
+        h = hashlib.sha1(c["clause_text"].encode("utf-8")).hexdigest()
+        n = seen.get(h, 0)
+        seen[h] = n + 1
+        keys.append(f"{h}:{n}")
+    return keys
+
+
 class ContractStore:
     """
-    In-memory store: contract_id -> {index, meta}
+    In-memory store: contract_id -> {index, meta, ids, keys, content_hash,
+    language, language_counts, profile, partitions, tenant_id}
+
+    `ids[row]` is the stable FAISS id of meta[row]; `keys[row]` its clause_keys() entry.
+
+    Listeners registered with subscribe() are called with the contract_id
+    every time a contract is (re-)indexed, e.g. to drop cached summaries.
     """
     def __init__(self):
         self.contracts = {}
+        self._listeners = []
+
+    def subscribe(self, fn) -> None:
+        self._listeners.append(fn)
 
-    def put(self, contract_id: str, index, meta):
-        self.contracts[contract_id] = {"index": index, "meta": meta}
+    def put(self, contract_id: str, index, meta, **info):
+        self.contracts[contract_id] = {"index": index, "meta": meta, **info}
+        for fn in self._listeners:
+            fn(contract_id)
 
     def get(self, contract_id: str):
         return self.contracts.get(contract_id)
 
+    def content_hash(self, contract_id: str):
+        bundle = self.contracts.get(contract_id)
+        return bundle.get("content_hash") if bundle else None
+
+    def language(self, contract_id: str, default: str = "en") -> str:
+        """
+        Contract-level language: "ar" / "en" / "mixed" (from all clauses).
+        """
+        bundle = self.contracts.get(contract_id)
+        return bundle.get("language", default) if bundle else default
+
+    def language_counts(self, contract_id: str) -> dict:
+        """
+        Per-language clause counts, e.g. {"ar": 31, "en": 4}.
+        """
+        bundle = self.contracts.get(contract_id)
+        return dict(bundle.get("language_counts") or {}) if bundle else {}
+
 
 # -----------------------------
 # RAG Engine
 # -----------------------------
 
+class ContractIndexBuilder:
+    """
+    Builds a new contract's index batch by batch (RAGEngine.begin_contract_index).
+    Each add() embeds its batch and, for flat / fp16 storage, adds it to the
+    FAISS index right away; int8 needs every vector to train its quantizer,
+    so that index is built in finalize(). Ids are 0..n-1 in arrival order,
+    exactly as build_contract_index assigns them.
+    """
+
+    def __init__(self, rag: "RAGEngine", contract_id: str, tenant_id: Optional[str] = None):
+        self.rag = rag
+        self.contract_id = contract_id
+        self.tenant_id = tenant_id
+        self.meta: list = []
+        self.emb: List[np.ndarray] = []
+        self.index = None
+
+    def add(self, clauses_meta: list) -> None:
+        if not clauses_meta:
+            return
+        with metrics.timer("embed"):
+            emb = self.rag._encode([c["clause_text"] for c in clauses_meta])
+
+        with metrics.timer("index"):
+            mode = self.rag.contract_index_mode
+            ids = np.arange(len(self.meta), len(self.meta) + len(clauses_meta), dtype="int64")
+            if mode != "int8":          # int8 is trained on all vectors in finalize()
+                if self.index is None:
+                    self.index = make_contract_index(emb, mode, ids=ids)
+                else:
+                    self.index.add_with_ids(emb, ids)
+        self.meta.extend(clauses_meta)
+        self.emb.append(emb)
+
+    def finalize(self) -> None:
+        if not self.meta:
+            raise ValueError(f"No clauses to index for contract {self.contract_id}")
+        emb = self.emb[0] if len(self.emb) == 1 else np.vstack(self.emb)
+        with metrics.timer("index"):
+            index = self.index if self.index is not None else make_contract_index(emb, self.rag.contract_index_mode)
+            ids = list(range(len(self.meta)))
+            self.rag._put_contract(
+                self.contract_id, index, self.meta, ids, clause_keys(self.meta), self.tenant_id, emb=emb
+            )
+            if self.tenant_id is not None:
+                self.rag.global_index.add_contract(self.tenant_id, self.contract_id, self.meta, emb)
+
+
+class ContractUpdater:
+    """
+    Applies an amended version of an existing contract batch by batch
+    (RAGEngine.begin_contract_update). Each add() matches its batch to the
+    previous version by clause_keys and embeds only added / changed clauses;
+    for flat / fp16 storage they go straight into a copy of the index, so
+    only the new vectors are held. finalize() drops removed clauses, publishes
+    the new bundle and returns the change summary. int8 re-trains its
+    quantizer over kept + new vectors in finalize().
+    """
+
+    def __init__(self, rag: "RAGEngine", contract_id: str):
+        bundle = rag.store.get(contract_id)
+        if not bundle:
+            raise ValueError(f"Unknown contract_id: {contract_id}")
+        self.rag = rag
+        self.contract_id = contract_id
+        self.bundle = bundle
+        self.old_id_by_key = dict(zip(bundle["keys"], bundle["ids"]))
+        self.next_id = bundle.get("next_id", len(bundle["ids"]))
+        self.meta: list = []
+        self.ids: List[int] = []
+        self.keys: List[str] = []
+        self.added_rows: List[int] = []
+        self.emb_added: List[np.ndarray] = []
+        self._seen: Dict[str, int] = {}
+        # copy-on-write: readers keep the old index + meta until finalize() swaps the bundle
+        self.index = faiss.clone_index(bundle["index"])
+
+    def add(self, clauses_meta: list) -> None:
+        if not clauses_meta:
+            return
+        start = len(self.meta)
+        keys = clause_keys(clauses_meta, self._seen)
+        rows = []
+        # stable ids: unchanged clauses keep theirs, new clauses get fresh ones
+        for j, k in enumerate(keys):
+            old_id = self.old_id_by_key.get(k)
+            if old_id is None:
+                rows.append(j)
+                self.ids.append(self.next_id)
+                self.next_id += 1
+            else:
+                self.ids.append(old_id)
+        self.meta.extend(clauses_meta)
+        self.keys.extend(keys)
+        if not rows:
+            return
+
+        with metrics.timer("embed", kind="amended"):
+            emb = self.rag._encode([clauses_meta[j]["clause_text"] for j in rows])
+        self.added_rows.extend(start + j for j in rows)
+        self.emb_added.append(emb)
+        if self.rag.contract_index_mode != "int8":     # int8 is re-trained in finalize()
+            with metrics.timer("index"):
+                self.index.add_with_ids(emb, np.array([self.ids[start + j] for j in rows], dtype="int64"))
+
+    def finalize(self) -> dict:
+        if not self.meta:
+            raise ValueError(f"No clauses to index for contract {self.contract_id}")
+        rag, bundle = self.rag, self.bundle
+        clauses_meta, ids, new_keys, added_rows = self.meta, self.ids, self.keys, self.added_rows
+        old_meta, old_keys = bundle["meta"], bundle["keys"]
+        old_cid_by_key = {k: m.get("clause_id") for k, m in zip(old_keys, old_meta)}
+        new_key_set = set(new_keys)
+        removed_keys = [k for k in old_keys if k not in new_key_set]
+        removed_ids = [self.old_id_by_key[k] for k in removed_keys]
+        emb_added = None
+        if self.emb_added:
+            emb_added = self.emb_added[0] if len(self.emb_added) == 1 else np.vstack(self.emb_added)
+
+        index = self.index
+        with metrics.timer("index"):
+            if rag.contract_index_mode == "int8" and added_rows:
+                # the quantizer's ranges come from the vectors it was trained on:
+                # retrain over kept (decoded) + new vectors instead of clipping the new ones
+                added_set = set(added_rows)
+                kept = [i for i in range(len(ids)) if i not in added_set]
+                emb = np.empty((len(ids), emb_added.shape[1]), dtype="float32")
+                if kept:
+                    emb[kept] = rag._vectors(index, [ids[i] for i in kept])
+                emb[added_rows] = emb_added
+                index = make_contract_index(emb, rag.contract_index_mode, ids=ids)
+                rag._put_contract(
+                    self.contract_id, index, clauses_meta, ids, new_keys, bundle.get("tenant_id"),
+                    emb=emb, next_id=self.next_id,
+                )
+            else:
+                if removed_ids:
+                    index.remove_ids(np.array(removed_ids, dtype="int64"))
+                rag._put_contract(
+                    self.contract_id, index, clauses_meta, ids, new_keys, bundle.get("tenant_id"),
+                    next_id=self.next_id, old_partitions=bundle.get("partitions"),
+                    removed_ids=removed_ids, added=(added_rows, emb_added),
+                )
+
+        # global index: drop rows whose (clause_id, text) no longer exists, add the new ones
+        if bundle.get("tenant_id") is not None:
+            old_pairs = set(zip(old_keys, (m.get("clause_id") for m in old_meta)))
+            new_pairs = set(zip(new_keys, (c.get("clause_id") for c in clauses_meta)))
+            shard = rag.global_index.shard(bundle["tenant_id"])
+            stale = [cid for k, cid in old_pairs - new_pairs]
+            fresh = [i for i, pair in enumerate(zip(new_keys, (c.get("clause_id") for c in clauses_meta))) if pair not in old_pairs]
+            if stale:
+                shard.remove_rows(self.contract_id, stale)
+            if fresh:
+                shard.add(self.contract_id, [clauses_meta[i] for i in fresh], rag._vectors(index, [ids[i] for i in fresh]))
+
+        added_cids = {clauses_meta[i].get("clause_id") for i in added_rows}
+        removed_cids = {old_cid_by_key[k] for k in removed_keys}
+        modified = sorted(added_cids & removed_cids)
+        return {
+            "added": sorted(added_cids - removed_cids),
+            "removed": sorted(removed_cids - added_cids),
+            "modified": modified,
+            "unchanged": len(clauses_meta) - len(added_rows),
+            "renumbered": sum(
+                1 for k, c in zip(new_keys, clauses_meta)
+                if k in old_cid_by_key and old_cid_by_key[k] != c.get("clause_id")
+            ),
+            "embedded": len(added_rows),
+        }
+
+
 class RAGEngine:
-    def __init__(self, law_index_path: str, law_meta_path: str):
-        self.embedder = SentenceTransformer(
-            "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    def __init__(
+        self,
+        law_index_path: str,
+        law_meta_path: str,
+        profile_queries: Optional[List[str]] = None,
+        contract_index_mode: str = "flat",
+    ):
+        if contract_index_mode not in CONTRACT_INDEX_MODES:
+            raise ValueError(f"contract_index_mode must be one of {CONTRACT_INDEX_MODES}")
+        self.contract_index_mode = contract_index_mode
+
+        self.embedder = SentenceTransformer(EMBED_MODEL_NAME)
+
+        # Fixed topic queries (summary topics) embedded once; their top clauses
+        # are precomputed per contract at ingestion (see rag/profile.py)
+        self.profile_queries = list(dict.fromkeys(profile_queries or []))
+        self.profile_query_emb = (
+            self.embedder.encode(self.profile_queries, normalize_embeddings=True)
+            if self.profile_queries else None
         )
 
         self.law_index = faiss.read_index(law_index_path)
         with open(law_meta_path, "r", encoding="utf-8") as f:
             self.law_meta = json.load(f)
 
+        # (article number, language) -> law_meta rows, for direct "Article 80" lookups
+        self.law_articles = build_article_index(self.law_meta)
+
         self.store = ContractStore()
 
+        # Portfolio-wide clause search (HNSW shard per tenant)
+        self.global_index = GlobalClauseIndex(self.embedder.get_sentence_embedding_dimension())
+
     # -------------------------
     # Contract Indexing
     # -------------------------
 
-    def build_contract_index(self, contract_id: str, clauses_meta: list):
-        texts = [c["clause_text"] for c in clauses_meta]
-        emb = self.embedder.encode(texts, normalize_embeddings=True)
+    def build_contract_index(self, contract_id: str, clauses_meta: list, tenant_id: Optional[str] = None):
+        builder = self.begin_contract_index(contract_id, tenant_id)
+        builder.add(clauses_meta)
+        builder.finalize()
+
+    def begin_contract_index(self, contract_id: str, tenant_id: Optional[str] = None) -> "ContractIndexBuilder":
+        """
+        Incremental build_contract_index: add() clause batches as they are
+        produced, finalize() to publish. Nothing is visible before finalize().
+        tenant_id None: the contract is not added to any portfolio (global) index.
+        """
+        return ContractIndexBuilder(self, contract_id, tenant_id)
+
+    def update_contract_index(self, contract_id: str, clauses_meta: list) -> dict:
+        """
+        Re-index an amended version of an existing contract (same contract_id).
+
+        Clauses are matched to the previous version by text (clause_keys), so
+        only added / changed clauses are embedded; removed ones are dropped
+        with remove_ids. Changes are applied to a copy of the index, published
+        with the new meta in a single store.put, so concurrent readers never
+        see new vectors with old meta. Callers can reuse labels of
+        unchanged clauses via previous_clauses_by_key().
+        (int8 storage re-trains its quantizer when clauses are added.)
+
+        Returns a clause-level change summary.
+        """
+        updater = self.begin_contract_update(contract_id)
+        updater.add(clauses_meta)
+        return updater.finalize()
+
+    def begin_contract_update(self, contract_id: str) -> "ContractUpdater":
+        """
+        Incremental update_contract_index: add() the amended version's clause
+        batches as they are produced, finalize() to publish and get the
+        change summary. Raises ValueError for an unknown contract_id.
+        """
+        return ContractUpdater(self, contract_id)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        record_embed(len(texts))
+        return self.embedder.encode(texts, normalize_embeddings=True)
 
-        index = faiss.IndexFlatIP(emb.shape[1])
-        index.add(emb)
+    def previous_clauses_by_key(self, contract_id: str) -> Dict[str, dict]:
+        """
+        clause_keys() entry -> stored clause meta of the current version.
+        """
+        bundle = self.store.get(contract_id)
+        if not bundle:
+            return {}
+        return dict(zip(bundle["keys"], bundle["meta"]))
+
+    @staticmethod
+    def _vectors(index, ids: List[int]) -> np.ndarray:
+        # decoded vectors (lossy for fp16/int8 storage)
+        return np.vstack([index.reconstruct(int(i)) for i in ids]).astype("float32")
+
+    def _put_contract(
+        self, contract_id: str, index, clauses_meta: list, ids: List[int], keys: List[str], tenant_id: Optional[str],
+        emb=None, next_id: Optional[int] = None, old_partitions=None, removed_ids=(), added=None,
+    ):
+        row_of = {i: row for row, i in enumerate(ids)}
+        profile = build_contract_profile(
+            clauses_meta, index, self.profile_queries, self.profile_query_emb, id_to_row=row_of
+        )
+
+        partitions = None
+        if profile["language"] == "mixed":
+            if old_partitions and added is not None:
+                partitions = self._update_partitions(old_partitions, clauses_meta, ids, removed_ids, *added)
+            else:
+                if emb is None:
+                    emb = self._vectors(index, ids)
+                partitions = self._build_partitions(clauses_meta, emb, ids)
+
+        self.store.put(
+            contract_id, index, clauses_meta,
+            ids=ids,
+            row_of=row_of,
+            keys=keys,
+            next_id=len(ids) if next_id is None else next_id,
+            content_hash=contract_content_hash(clauses_meta),
+            language=profile["language"],
+            language_counts=profile["language_stats"],
+            profile=profile,
+            partitions=partitions,
+            tenant_id=tenant_id,
+        )
+
+    def _build_partitions(self, clauses_meta: list, emb, ids: List[int]) -> Dict[str, dict]:
+        """
+        Per-language sub-indexes for mixed contracts, so an Arabic query
+        only scans Arabic clauses (and English only English).
+        lang -> {"index": contract index with the same stable ids}
+        """
+        by_lang: Dict[str, List[int]] = {}
+        for i, c in enumerate(clauses_meta):
+            by_lang.setdefault(c.get("language", "en"), []).append(i)
+
+        partitions = {}
+        for lang, rows in by_lang.items():
+            sub = make_contract_index(emb[rows], self.contract_index_mode, ids=[ids[r] for r in rows])
+            partitions[lang] = {"index": sub}
+        return partitions
+
+    def _update_partitions(self, partitions, clauses_meta: list, ids: List[int], removed_ids, added_rows, emb_added):
+        """
+        Apply a diff to copies of the per-language partitions (the live
+        ones stay untouched until the new bundle is stored).
+        """
+        partitions = {lang: {"index": faiss.clone_index(p["index"])} for lang, p in partitions.items()}
+        if len(removed_ids):
+            drop = np.array(list(removed_ids), dtype="int64")
+            for part in partitions.values():
+                part["index"].remove_ids(drop)
 
-        self.store.put(contract_id, index, clauses_meta)
+        by_lang: Dict[str, List[int]] = {}
+        for j, row in enumerate(added_rows):
+            by_lang.setdefault(clauses_meta[row].get("language", "en"), []).append(j)
+        for lang, js in by_lang.items():
+            vecs = emb_added[js]
+            new_ids = [ids[added_rows[j]] for j in js]
+            part = partitions.get(lang)
+            if part is None:
+                partitions[lang] = {"index": make_contract_index(vecs, self.contract_index_mode, ids=new_ids)}
+            else:
+                part["index"].add_with_ids(vecs, np.array(new_ids, dtype="int64"))
+        return {lang: p for lang, p in partitions.items() if p["index"].ntotal}
 
     def get_contract_clauses(self, contract_id: str):
         bundle = self.store.get(contract_id)
@@ -77,38 +496,175 @@ class RAGEngine:
             return []
         return bundle["meta"]
 
+    def get_contract_profile(self, contract_id: str) -> Optional[dict]:
+        bundle = self.store.get(contract_id)
+        return bundle.get("profile") if bundle else None
+
     # -------------------------
     # Retrieval
     # -------------------------
 
+    def _contract_hits(self, bundle, scores, ids):
+        # ids are stable FAISS ids -> rows into meta
+        row_of = bundle["row_of"]
+        hits = []
+        for score, idx in zip(scores, ids):
+            row = row_of.get(int(idx))
+            if row is None:  # idx -1 (fewer clauses than k) or mid-update id
+                continue
+            item = bundle["meta"][row]
+            hits.append({**item, "score": float(score)})
+        return hits
+
+    def _profile_hits(self, bundle, query: str, k: int):
+        """
+        Precomputed hits for fixed topic queries (no encoder pass, no search).
+        """
+        profile = bundle.get("profile") or {}
+        rows = profile.get("topic_hits", {}).get(query)
+        if rows is None or k > profile.get("topic_k", 0):
+            return None
+        return [{**bundle["meta"][i], "score": score} for i, score in rows[:k]]
+
     def retrieve_contract(self, contract_id: str, query: str, k=5):
         bundle = self.store.get(contract_id)
         if not bundle:
             return []
 
-        q = self.embedder.encode([query], normalize_embeddings=True)
+        hits = self._profile_hits(bundle, query, k)
+        if hits is not None:
+            return hits
+
+        q = self._encode([query])
         D, I = bundle["index"].search(q, k)
+        record_search()
+        return self._contract_hits(bundle, D[0], I[0])
 
-        hits = []
-        for score, idx in zip(D[0], I[0]):
-            item = bundle["meta"][int(idx)]
-            hits.append({**item, "score": float(score)})
+    def retrieve_contract_batch(self, contract_id: str, queries: List[str], k=5) -> List[list]:
+        """
+        Same as retrieve_contract for several queries:
+        one encoder pass + one FAISS search for the whole batch.
+        """
+        bundle = self.store.get(contract_id)
+        if not bundle or not queries:
+            return [[] for _ in queries]
+
+        out = [self._profile_hits(bundle, q, k) for q in queries]
+        todo = [i for i, hits in enumerate(out) if hits is None]
+        if todo:
+            q = self._encode([queries[i] for i in todo])
+            D, I = bundle["index"].search(q, k)
+            record_search()
+            for row, i in enumerate(todo):
+                out[i] = self._contract_hits(bundle, D[row], I[row])
+        return out
+
+    def retrieve_contract_multi(self, contract_id: str, queries_by_lang: Dict[str, str], k=5) -> Dict[str, list]:
+        """
+        One query per language (e.g. {"ar": q_ar, "en": q_en}) in a single
+        encoder pass. For mixed contracts each query only searches the
+        partition of its language; otherwise the full index is used.
+        Returns lang -> hits.
+        """
+        bundle = self.store.get(contract_id)
+        if not bundle or not queries_by_lang:
+            return {lang: [] for lang in queries_by_lang}
+
+        langs = list(queries_by_lang)
+        q = self._encode([queries_by_lang[l] for l in langs])
+        partitions = bundle.get("partitions") or {}
+
+        out = {}
+        for i, lang in enumerate(langs):
+            part = partitions.get(lang)
+            if part is None:
+                D, I = bundle["index"].search(q[i:i + 1], k)
+                record_search()
+                out[lang] = self._contract_hits(bundle, D[0], I[0])
+                continue
+            D, I = part["index"].search(q[i:i + 1], k)
+            record_search()
+            out[lang] = self._contract_hits(bundle, D[0], I[0])
+        return out
+
+    def search_clauses(
+        self,
+        query: str,
+        tenant_id: str,
+        k: int = 20,
+        labels: Optional[List[str]] = None,
+        language: Optional[str] = None,
+        contract_ids: Optional[List[str]] = None,
+    ) -> List[dict]:
+        """
+        Portfolio-wide clause search across a tenant's contracts,
+        filtered by label / language / contract_id.
+        Hits carry clause_text when the contract is still in the store.
+        """
+        q = self._encode([query])
+        record_search()
+        hits = self.global_index.search(
+            tenant_id, q, k=k, labels=labels, language=language, contract_ids=contract_ids
+        )
+        rows: Dict[str, Dict[str, dict]] = {}
+        for h in hits:
+            cid = h["contract_id"]
+            if cid not in rows:
+                rows[cid] = {m["clause_id"]: m for m in self.get_contract_clauses(cid)}
+            m = rows[cid].get(h["clause_id"], {})
+            h["clause_text"] = m.get("clause_text", "")
+            h["pii_masked"] = m.get("pii_masked", False)
         return hits
 
-    def retrieve_law(self, query: str, lang: str, k=6):
-        q = self.embedder.encode([query], normalize_embeddings=True)
-        D, I = self.law_index.search(q, 50)
+    def lookup_law_articles(self, query: str, lang: str) -> List[int]:
+        """
+        law_meta rows for articles explicitly named in the query
+        (e.g. "Article 80", "المادة ٨٠", "المادة الأولى").
+        """
+        rows = []
+        for num in find_article_refs(query):
+            rows.extend(self.law_articles.get((num, lang), []))
+        return rows
 
-        hits = []
-        for score, idx in zip(D[0], I[0]):
+    def _law_hits(self, pinned: List[int], scores, ids, lang: str, k: int):
+        # Articles referenced by number are pinned on top of the semantic hits
+        hits = [{**self.law_meta[i], "score": 1.0, "pinned": True} for i in pinned[:k]]
+        seen = set(pinned)
+        for score, idx in zip(scores, ids):
+            if len(hits) >= k:
+                break
+            if idx < 0 or int(idx) in seen:
+                continue
             item = self.law_meta[int(idx)]
             if item.get("language") != lang:
                 continue
             hits.append({**item, "score": float(score)})
-            if len(hits) >= k:
-                break
         return hits
 
+    def retrieve_law(self, query: str, lang: str, k=6):
+        pinned = self.lookup_law_articles(query, lang)
+        if len(pinned) >= k:
+            return self._law_hits(pinned, [], [], lang, k)
+
+        q = self._encode([query])
+        D, I = self.law_index.search(q, 50)
+        record_search()
+        return self._law_hits(pinned, D[0], I[0], lang, k)
+
+    def retrieve_law_batch(self, queries: List[str], lang: str, k=6) -> List[list]:
+        """
+        Same as retrieve_law for several queries (one encoder pass + one search).
+        """
+        if not queries:
+            return []
+        q = self._encode(list(queries))
+        D, I = self.law_index.search(q, 50)
+        record_search()
+        return [
+            self._law_hits(self.lookup_law_articles(query, lang), D[i], I[i], lang, k)
+            for i, query in enumerate(queries)
+        ]
+
     # -------------------------
     # NEW: Multilingual Helpers
     # -------------------------
@@ -0,0 +1,117 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from rag.articles import to_ascii_digits
+
+# -----------------------------
+# Contract profile (computed once at ingestion)
+# -----------------------------
+
+# A contract counts as "mixed" when the minority language holds at least
+# this share of its clauses (a stray English header does not make it mixed).
+MIXED_MIN_SHARE = 0.2
+
+PROFILE_TOPIC_K = 8       # precomputed hits per topic query
+MAX_KEY_NUMBERS = 100
+
+_NUM = r"\d[\d,]*(?:\.\d+)?"
+
+KEY_NUMBER_PATTERNS = [
+    ("amount", re.compile(rf"(?P<value>{_NUM})\s*(?P<unit>SAR|S\.R|SR|riyals?|ريال|ر\.?\s?س)", re.IGNORECASE)),
+    ("amount", re.compile(rf"(?P<unit>SAR|SR)\s*(?P<value>{_NUM})", re.IGNORECASE)),
+    ("duration", re.compile(
+        rf"(?P<value>{_NUM})\s*(?P<unit>days?|weeks?|months?|years?|"
+        r"يوما|يومًا|يوم|أيام|ايام|أسابيع|أسبوع|شهرا|شهرًا|شهور|أشهر|اشهر|شهر|سنوات|سنة|أعوام|عام)",
+        re.IGNORECASE,
+    )),
+    ("hours", re.compile(rf"(?P<value>{_NUM})\s*(?P<unit>hours?|hrs?|ساعات|ساعة)", re.IGNORECASE)),
+    ("percent", re.compile(rf"(?P<value>{_NUM})\s*(?P<unit>%|٪|percent|بالمائة|في المائة)", re.IGNORECASE)),
+]
+
+
+def contract_language(language_stats: Dict[str, int]) -> str:
+    """
+    "ar" / "en" / "mixed" from per-clause language counts.
+    """
+    total = sum(language_stats.values())
+    if not total:
+        return "en"
+    ar = language_stats.get("ar", 0)
+    minority = min(ar, total - ar)
+    if minority and minority / total >= MIXED_MIN_SHARE:
+        return "mixed"
+    return "ar" if ar > total - ar else "en"
+
+
+def extract_key_numbers(clauses_meta: list, limit: int = MAX_KEY_NUMBERS) -> List[dict]:
+    """
+    Amounts, durations, hours and percentages with the clause they come from.
+    """
+    out = []
+    for c in clauses_meta:
+        text = to_ascii_digits(c["clause_text"])
+        for kind, pat in KEY_NUMBER_PATTERNS:
+            for m in pat.finditer(text):
+                try:
+                    value = float(m.group("value").replace(",", ""))
+                except ValueError:
+                    continue
+                out.append({
+                    "clause_id": c.get("clause_id"),
+                    "kind": kind,
+                    "value": value,
+                    "unit": m.group("unit"),
+                    "text": m.group(0),
+                })
+                if len(out) >= limit:
+                    return out
+    return out
+
+
+def build_contract_profile(
+    clauses_meta: list,
+    index,
+    topic_queries: Optional[List[str]] = None,
+    topic_emb: Optional[np.ndarray] = None,
+    k: int = PROFILE_TOPIC_K,
+    id_to_row: Optional[Dict[int, int]] = None,
+) -> dict:
+    """
+    {
+      "language": "ar" | "en" | "mixed",
+      "language_stats": {"ar": n, "en": n},
+      "label_to_clause_ids": {label: [clause_id, ...]},
+      "topic_hits": {topic_query: [(row, score), ...]},   # rows into meta
+                                                          # (index ids mapped via id_to_row)
+      "topic_k": k,
+      "key_numbers": [...],
+    }
+    """
+    language_stats = dict(Counter(c.get("language", "en") for c in clauses_meta))
+
+    label_to_clause_ids: Dict[str, List[str]] = {}
+    for c in clauses_meta:
+        label_to_clause_ids.setdefault(c.get("label") or "unknown", []).append(c.get("clause_id"))
+
+    # one batched search for every topic query
+    topic_hits = {}
+    if topic_queries and topic_emb is not None and index.ntotal:
+        kk = min(k, index.ntotal)
+        D, I = index.search(topic_emb, kk)
+        for qi, query in enumerate(topic_queries):
+            topic_hits[query] = [
+                (id_to_row[int(i)] if id_to_row is not None else int(i), float(d))
+                for d, i in zip(D[qi], I[qi]) if i >= 0
+            ]
+
+    return {
+        "language": contract_language(language_stats),
+        "language_stats": language_stats,
+        "label_to_clause_ids": label_to_clause_ids,
+        "topic_hits": topic_hits,
+        "topic_k": k,
+        "key_numbers": extract_key_numbers(clauses_meta),
+    }
@@ -0,0 +1,79 @@
+import time
+from typing import List, Optional
+
+# -----------------------------
+# Cross-encoder reranking
+# -----------------------------
+
+DEFAULT_RERANK_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # multilingual (ar/en)
+
+
+class Reranker:
+    """
+    Optional second-stage reranker on top of bi-encoder hits.
+
+    - candidates are scored in batches, in bi-encoder order
+    - once the per-request time budget is spent, the remaining candidates
+      keep their bi-encoder order (after the reranked ones)
+    - the model is loaded lazily on first use
+    """
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_RERANK_MODEL,
+        enabled: bool = True,
+        budget_ms: float = 250.0,
+        batch_size: int = 8,
+        max_length: int = 256,
+    ):
+        self.model_name = model_name
+        self.enabled = enabled
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self._model = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            from sentence_transformers import CrossEncoder
+            self._model = CrossEncoder(self.model_name, max_length=self.max_length, device="cpu")
+        return self._model
+
+    def rerank(
+        self,
+        query: str,
+        hits: List[dict],
+        top_n: Optional[int] = None,
+        text_key: str = "clause_text",
+        query_key: Optional[str] = None,
+        budget_ms: Optional[float] = None,
+    ) -> List[dict]:
+        """
+        Returns hits reordered by cross-encoder score (as "rerank_score"),
+        cut to top_n. The original bi-encoder "score" is left untouched.
+        If query_key is given, each hit is scored against its own query
+        (e.g. "_topic_query" from build_contract_evidence).
+        """
+        top_n = top_n or len(hits)
+        if not self.enabled or len(hits) <= 1:
+            return hits[:top_n]
+
+        budget = (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        start = time.perf_counter()
+
+        scored: List[dict] = []
+        pos = 0
+        while pos < len(hits):
+            if scored and (time.perf_counter() - start) >= budget:
+                break
+            batch = hits[pos:pos + self.batch_size]
+            pairs = [((query_key and h.get(query_key)) or query, h.get(text_key, "")) for h in batch]
+            scores = self.model.predict(pairs, batch_size=self.batch_size, show_progress_bar=False)
+            for h, s in zip(batch, scores):
+                scored.append({**h, "rerank_score": float(s)})
+            pos += len(batch)
+
+        scored.sort(key=lambda x: x["rerank_score"], reverse=True)
+        # budget ran out -> unscored tail keeps bi-encoder order
+        return (scored + hits[pos:])[:top_n]
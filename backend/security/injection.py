@@ -0,0 +1,211 @@
+# backend/security/injection.py
+import os
+import re
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import ahocorasick  # optional: pyahocorasick (C automaton)
+except ImportError:
+    ahocorasick = None
+
+PATTERNS_PATH = Path(__file__).resolve().with_name("injection_patterns.txt")
+RELOAD_CHECK_SECONDS = 2.0
+
+# -----------------------------
+# Normalization
+# -----------------------------
+
+# after NFKD + casefold: combining marks (Latin accents, Arabic harakat,
+# hamza / madda on alef), tatweel and invisible characters are dropped
+_DROP = {
+    cp: None for cp in range(0x10000)
+    if unicodedata.combining(chr(cp))
+}
+_DROP.update(dict.fromkeys(map(ord, "\u0640\u00ad\u200b\u200c\u200d\u200e\u200f\u2060\ufeff"), None))
+
+_FOLD = {
+    # Cyrillic / Greek look-alikes
+    "а": "a", "в": "b", "е": "e", "к": "k", "м": "m", "н": "h", "о": "o", "р": "p",
+    "с": "c", "т": "t", "у": "y", "х": "x", "і": "i", "ј": "j", "ѕ": "s",
+    "α": "a", "ε": "e", "ι": "i", "κ": "k", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x",
+    # leetspeak
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "@": "a", "$": "s",
+    # Arabic / Persian / Urdu letter variants
+    "ى": "ي", "ی": "ي", "ے": "ي", "ئ": "ي", "ة": "ه", "ہ": "ه", "ۃ": "ه", "ھ": "ه",
+    "ک": "ك", "ؤ": "و", "ٱ": "ا",
+}
+_TABLE = {**_DROP, **{ord(k): v for k, v in _FOLD.items()}}
+
+_SEP_RE = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form for matching: NFKD, casefold, marks / invisibles dropped,
+    homoglyphs folded, punctuation and whitespace collapsed to single spaces.
+    Padded with spaces so patterns can require word boundaries.
+    """
+    t = unicodedata.normalize("NFKD", text).casefold().translate(_TABLE)
+    return " " + _SEP_RE.sub(" ", t).strip() + " "
+
+
+def compile_pattern(line: str) -> Optional[str]:
+    """
+    One pattern-file line -> the key searched for in normalized text.
+    Patterns match whole words; a trailing * allows any word ending.
+    """
+    line = line.split("#", 1)[0].strip()
+    if not line:
+        return None
+    prefix = line.endswith("*")
+    core = normalize(line.rstrip("*")).strip()
+    if not core:
+        return None
+    return " " + core + ("" if prefix else " ")
+
+
+# -----------------------------
+# Multi-pattern matcher
+# -----------------------------
+
+class PhraseMatcher:
+    """
+    Aho-Corasick automaton over characters: one pass over the text finds
+    any of the keys, independent of how many keys there are.
+    Uses pyahocorasick when installed, else a pure-Python automaton.
+    """
+
+    def __init__(self, keys: Dict[str, str]):
+        # keys: search key -> pattern as written in the file
+        self.size = len(keys)
+        if ahocorasick is not None:
+            self._auto = ahocorasick.Automaton()
+            for key, pattern in keys.items():
+                self._auto.add_word(key, pattern)
+            if keys:
+                self._auto.make_automaton()
+            return
+        self._auto = None
+        self._build(keys)
+
+    def _build(self, keys: Dict[str, str]) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[Optional[str]] = [None]
+        for key, pattern in keys.items():
+            s = 0
+            for ch in key:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[s][ch] = nxt
+                    goto.append({})
+                    out.append(None)
+                s = nxt
+            out[s] = pattern
+
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        for s in queue:
+            for ch, nxt in goto[s].items():
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                if out[nxt] is None:
+                    out[nxt] = out[fail[nxt]]
+                queue.append(nxt)
+        self._goto, self._fail, self._out = goto, fail, out
+
+    def search(self, text: str) -> Optional[str]:
+        """
+        First pattern found in (normalized) text, or None.
+        """
+        if self._auto is not None:
+            if not self.size:
+                return None
+            for _, pattern in self._auto.iter(text):
+                return pattern
+            return None
+
+        goto, fail, out = self._goto, self._fail, self._out
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s] is not None:
+                return out[s]
+        return None
+
+
+def load_patterns(path: Path) -> Dict[str, str]:
+    keys: Dict[str, str] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            key = compile_pattern(line)
+            if key is not None:
+                keys.setdefault(key, line.split("#", 1)[0].strip())
+    return keys
+
+
+class InjectionGuard:
+    """
+    Prompt-injection screen over a pattern file. The file is re-read when
+    its mtime changes (checked at most every RELOAD_CHECK_SECONDS); a file
+    that fails to load keeps the previous patterns.
+    """
+
+    def __init__(self, path: Path = PATTERNS_PATH, check_interval: float = RELOAD_CHECK_SECONDS):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.reloads = 0
+        self.reload_errors = 0
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._next_check = 0.0
+        self._matcher = PhraseMatcher({})
+        self.reload()
+
+    def reload(self) -> bool:
+        with self._lock:
+            try:
+                mtime = os.stat(self.path).st_mtime
+                matcher = PhraseMatcher(load_patterns(self.path))
+            except (OSError, UnicodeDecodeError):
+                self.reload_errors += 1
+                return False
+            self._matcher, self._mtime = matcher, mtime
+            self.reloads += 1
+            return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            return
+        if mtime != self._mtime:
+            self.reload()
+
+    def match(self, text: str) -> Optional[str]:
+        self._maybe_reload()
+        return self._matcher.search(normalize(text))
+
+    def stats(self) -> dict:
+        return {
+            "patterns": self._matcher.size,
+            "reloads": self.reloads,
+            "reload_errors": self.reload_errors,
+            "engine": "pyahocorasick" if ahocorasick is not None else "python",
+        }
+
+
+def guard_from_env() -> InjectionGuard:
+    return InjectionGuard(Path(os.environ.get("INJECTION_PATTERNS_PATH", str(PATTERNS_PATH))))
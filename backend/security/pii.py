@@ -4,38 +4,90 @@ from typing import Tuple, Dict
 
 EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b")
 PHONE_RE = re.compile(r"(?<!\d)(?:\+?966|0)?5\d{8}(?!\d)|(?<!\d)\+?\d{10,15}(?!\d)")
-IBAN_RE  = re.compile(r"\bSA\d{2}[A-Z0-9]{18}\b", re.IGNORECASE)
+# Saudi IBAN: SA + 2 check digits + 20 characters, optionally printed in groups of 4
+IBAN_RE  = re.compile(r"\bSA\d{2}(?: ?[A-Z0-9]){20}\b", re.IGNORECASE)
 
 # Saudi National ID / Iqama commonly 10 digits starting with 1 or 2
 SA_ID_RE = re.compile(r"(?<!\d)([12]\d{9})(?!\d)")
 
 # Optional: card-like sequences (very rough; avoid too aggressive masking)
-CARD_RE = re.compile(r"(?<!\d)(?:\d[ -]*?){13,19}(?!\d)")
+# 13 digits with optional space / dash separators, then up to 6 more adjacent
+# digits: same matches as the old lazy (?:\d[ -]*?){13,19}, which stops at the
+# first separator once it has 13 digits, without its backtracking.
+CARD_RE = re.compile(r"(?=\d)(?<!\d)\d(?:[ -]*\d){12}\d{0,6}(?!\d)")
+
+PII_KINDS = ("email", "iban", "sa_id", "phone", "card")
+
+REPLACEMENTS = {
+    "email": "[EMAIL_REDACTED]",
+    "iban": "[IBAN_REDACTED]",
+    "sa_id": "[NATIONAL_ID_REDACTED]",
+    "phone": "[PHONE_REDACTED]",
+    "card": "[CARD_REDACTED]",
+}
+
+# National IDs and phones in one scan (named groups, sa_id first). Both are
+# whole digit runs, so a run is an ID exactly when the sa_id pass would have
+# taken it; the phone branch skips "+<ID>" so the "+" stays, as before.
+# The first-char check keeps the lookbehind off non-digit positions.
+DIGITS_RE = re.compile(
+    r"(?=[+\d])(?<!\d)(?:"
+    r"(?P<sa_id>[12]\d{9})"
+    r"|(?P<phone>(?:\+?966|0)?5\d{8}|(?!\+[12]\d{9}(?!\d))\+?\d{10,15})"
+    r")(?!\d)"
+)
+
+# cheap pre-check: no digit and no "@" -> nothing to mask
+_HINT_RE = re.compile(r"[\d@]")
+
+
+def empty_stats() -> Dict[str, int]:
+    return dict.fromkeys(PII_KINDS, 0)
+
 
 def mask_pii(text: str) -> Tuple[str, Dict[str, int]]:
     """
     Returns (masked_text, stats).
     Safe for both Arabic & English.
     """
-    if not text:
-        return text, {"email": 0, "phone": 0, "iban": 0, "sa_id": 0, "card": 0}
-
-    stats = {"email": 0, "phone": 0, "iban": 0, "sa_id": 0, "card": 0}
-
-    def sub_count(pattern, repl, key):
-        nonlocal text
-        text, n = pattern.subn(repl, text)
-        stats[key] += n
-
-    sub_count(EMAIL_RE, "[EMAIL_REDACTED]", "email")
-    sub_count(IBAN_RE,  "[IBAN_REDACTED]", "iban")
-    sub_count(SA_ID_RE, "[NATIONAL_ID_REDACTED]", "sa_id")
-    sub_count(PHONE_RE, "[PHONE_REDACTED]", "phone")
+    stats = empty_stats()
+    if not text or not _HINT_RE.search(text):
+        return text, stats
+
+    def repl(m):
+        kind = m.lastgroup
+        stats[kind] += 1
+        return REPLACEMENTS[kind]
+
+    # Same precedence as one pass per kind: email, iban, sa_id / phone,
+    # and card last because it can over-match.
+    if "@" in text:
+        text, stats["email"] = EMAIL_RE.subn(REPLACEMENTS["email"], text)
+    text, stats["iban"] = IBAN_RE.subn(REPLACEMENTS["iban"], text)
+    text = DIGITS_RE.sub(repl, text)
+    text, stats["card"] = CARD_RE.subn(REPLACEMENTS["card"], text)
+    return text, stats
 
-    # Keep card masking last because it can over-match.
-    sub_count(CARD_RE,  "[CARD_REDACTED]", "card")
 
-    return text, stats
+def mask_rows(rows: list[dict], field: str) -> dict:
+    """
+    Mask `field` of stored rows in place, once (ingestion / index load).
+    Each row gets pii_masked=True and, when something was found, its
+    per-kind counts under "pii". Returns the totals.
+    """
+    total = empty_stats()
+    for r in rows:
+        if r.get("pii_masked"):
+            continue
+        masked, stats = mask_pii(r.get(field, ""))
+        found = {k: n for k, n in stats.items() if n}
+        if found:
+            r[field] = masked
+            r["pii"] = found
+            for k, n in found.items():
+                total[k] += n
+        r["pii_masked"] = True
+    return total
 
 
 def mask_hits_contract(contract_hits: list[dict]) -> tuple[list[dict], dict]:
@@ -43,33 +95,33 @@ def mask_hits_contract(contract_hits: list[dict]) -> tuple[list[dict], dict]:
     Mask PII inside clause_text for contract evidence hits.
     Keeps clause_id intact (important for citations).
     """
-    total = {"email": 0, "phone": 0, "iban": 0, "sa_id": 0, "card": 0}
-    out = []
-
-    for h in (contract_hits or []):
-        h2 = dict(h)
-        masked, stats = mask_pii(h2.get("clause_text", ""))
-        h2["clause_text"] = masked
-        for k in total:
-            total[k] += stats.get(k, 0)
-        out.append(h2)
-
-    return out, total
+    return _mask_hits(contract_hits, "clause_text")
 
 
 def mask_hits_law(law_hits: list[dict]) -> tuple[list[dict], dict]:
     """
     Mask PII inside law evidence text (rare, but safe).
     """
-    total = {"email": 0, "phone": 0, "iban": 0, "sa_id": 0, "card": 0}
+    return _mask_hits(law_hits, "text")
+
+
+def _mask_hits(hits: list[dict], field: str) -> tuple[list[dict], dict]:
+    """
+    Hits from rows already masked at ingestion pass through untouched;
+    others are copied only when something was masked.
+    """
+    total = empty_stats()
     out = []
 
-    for h in (law_hits or []):
-        h2 = dict(h)
-        masked, stats = mask_pii(h2.get("text", ""))
-        h2["text"] = masked
-        for k in total:
-            total[k] += stats.get(k, 0)
-        out.append(h2)
+    for h in (hits or []):
+        if h.get("pii_masked"):
+            out.append(h)
+            continue
+        masked, stats = mask_pii(h.get(field, ""))
+        if any(stats.values()):
+            h = {**h, field: masked}
+            for k in total:
+                total[k] += stats[k]
+        out.append(h)
 
     return out, total
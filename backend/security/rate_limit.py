@@ -1,26 +1,207 @@
 # backend/security/rate_limit.py
+import asyncio
+import os
+import threading
 import time
-from collections import defaultdict, deque
+from typing import Dict, List, NamedTuple, Optional
 
 # 30 requests per minute per IP per route
 DEFAULT_LIMIT = 30
 WINDOW_SECONDS = 60
 
+# idle keys (no hit for 2 windows) are dropped at most this often
+SWEEP_INTERVAL_SECONDS = 60
+
+LOCK_STRIPES = 64
+
+
+class RateDecision(NamedTuple):
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float   # seconds until `cost` more units fit (0 when allowed)
+    reset_after: float   # seconds until the current window rolls over
+
+
+def _decide(prev: float, curr: float, elapsed: float, window: float, limit: int, cost: int) -> RateDecision:
+    """
+    Sliding window counter: the previous window's count is weighted by the
+    part of it still inside the sliding window.
+    """
+    weight = 1.0 - elapsed / window
+    used = prev * weight + curr
+    allowed = used + cost <= limit
+    remaining = max(0, int(limit - used - (cost if allowed else 0)))
+
+    retry_after = 0.0
+    if not allowed:
+        if cost > limit:
+            retry_after = 2 * window                     # can never fit
+        elif curr + cost > limit:
+            # wait for the next window, then for this window's count to decay
+            retry_after = window - elapsed + window * max(0.0, 1.0 - (limit - cost) / curr)
+        else:
+            # wait until prev's weight has decayed enough
+            retry_after = window * (used + cost - limit) / prev
+    return RateDecision(allowed, limit, remaining, retry_after, window - elapsed)
+
+
+# -----------------------------
+# Backends
+# -----------------------------
+
+class LocalBackend:
+    """
+    In-process backend: key -> [window_start, prev_count, curr_count].
+    Striped locks keep updates atomic under the sync threadpool; idle keys
+    are swept periodically, inside hit() or, with inline_sweep=False, by
+    RateLimiter.sweep_forever off the request path. Limits are per process
+    (use RedisBackend to share them across workers).
+    """
+
+    blocking = False     # hit() is a dict update: fine on the event loop
+
+    def __init__(
+        self, sweep_interval: float = SWEEP_INTERVAL_SECONDS, stripes: int = LOCK_STRIPES, inline_sweep: bool = True
+    ):
+        self.state: Dict[str, List[float]] = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._sweep_lock = threading.Lock()
+        self.sweep_interval = sweep_interval
+        self.inline_sweep = inline_sweep
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._max_window = 0.0
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1, now: Optional[float] = None) -> RateDecision:
+        now = time.monotonic() if now is None else now
+        self._max_window = max(self._max_window, window)
+        with self._locks[hash(key) % len(self._locks)]:
+            s = self.state.get(key)
+            start = now - (now % window)
+            if s is None:
+                s = self.state[key] = [start, 0.0, 0.0]
+            elif s[0] != start:
+                # roll over: the old current window becomes "previous" only if adjacent
+                s[1] = s[2] if start - s[0] == window else 0.0
+                s[2] = 0.0
+                s[0] = start
+            d = _decide(s[1], s[2], now - start, window, limit, cost)
+            if d.allowed:
+                s[2] += cost
+
+        if self.inline_sweep and now >= self._next_sweep:
+            self.sweep(now)
+        return d
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """
+        Drop keys that saw no hit in the last two windows. Returns keys removed.
+        """
+        now = time.monotonic() if now is None else now
+        if not self._sweep_lock.acquire(blocking=False):
+            return 0
+        try:
+            self._next_sweep = now + self.sweep_interval
+            horizon = 2 * (self._max_window or WINDOW_SECONDS)
+            stale = [k for k, s in list(self.state.items()) if now - s[0] >= horizon]
+            for k in stale:
+                with self._locks[hash(k) % len(self._locks)]:
+                    s = self.state.get(k)
+                    if s is not None and now - s[0] >= horizon:
+                        del self.state[k]
+            return len(stale)
+        finally:
+            self._sweep_lock.release()
+
+    def __len__(self) -> int:
+        return len(self.state)
+
+
+# Atomic sliding-window counter in Redis (two keys per window, auto-expiring).
+_REDIS_SCRIPT = """
+local curr_key = KEYS[1]
+local prev_key = KEYS[2]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local elapsed = tonumber(ARGV[4])
+local prev = tonumber(redis.call('GET', prev_key) or '0')
+local curr = tonumber(redis.call('GET', curr_key) or '0')
+local used = prev * (1 - elapsed / window) + curr
+if used + cost <= limit then
+  curr = redis.call('INCRBY', curr_key, cost)
+  redis.call('EXPIRE', curr_key, math.ceil(window * 2))
+  return {1, prev, curr - cost}
+end
+return {0, prev, curr}
+"""
+
+
+class RedisBackend:
+    """
+    Shared backend so the limit holds across workers / instances.
+    Needs the optional `redis` package. Clock: server time of this process
+    (windows are aligned to epoch seconds, so workers agree).
+    """
+
+    blocking = True      # network round-trip: run off the event loop
+
+    def __init__(self, url: str, prefix: str = "rl:"):
+        import redis  # optional dependency
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.client.register_script(_REDIS_SCRIPT)
+
+    def hit(self, key: str, limit: int, window: float, cost: int = 1, now: Optional[float] = None) -> RateDecision:
+        now = time.time() if now is None else now
+        start = int(now // window)
+        elapsed = now - start * window
+        ok, prev, curr = self._script(
+            keys=[f"{self.prefix}{key}:{start}", f"{self.prefix}{key}:{start - 1}"],
+            args=[limit, window, cost, elapsed],
+        )
+        return _decide(float(prev), float(curr), elapsed, window, limit, cost)._replace(allowed=bool(ok))
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        return 0  # keys expire on their own
+
+
+# -----------------------------
+# Limiter
+# -----------------------------
+
 class RateLimiter:
-    def __init__(self):
-        self.buckets = defaultdict(deque)
+    def __init__(self, backend=None, window: float = WINDOW_SECONDS):
+        self.backend = backend or LocalBackend()
+        self.window = window
+
+    def hit(self, key: str, limit: int = DEFAULT_LIMIT, cost: int = 1) -> RateDecision:
+        return self.backend.hit(key, limit, self.window, cost)
+
+    async def hit_async(self, key: str, limit: int = DEFAULT_LIMIT, cost: int = 1) -> RateDecision:
+        """
+        hit() for async callers: blocking backends (Redis) run in a worker thread.
+        """
+        if self.backend.blocking:
+            return await asyncio.to_thread(self.backend.hit, key, limit, self.window, cost)
+        return self.backend.hit(key, limit, self.window, cost)
 
-    def check(self, key: str, limit: int = DEFAULT_LIMIT) -> None:
-        now = time.time()
-        q = self.buckets[key]
+    async def sweep_forever(self, interval: float = SWEEP_INTERVAL_SECONDS) -> None:
+        """
+        Background task (app lifespan): sweep idle keys in a worker thread.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(self.backend.sweep)
 
-        # drop old timestamps
-        while q and (now - q[0]) > WINDOW_SECONDS:
-            q.popleft()
 
-        if len(q) >= limit:
-            raise ValueError("Rate limit exceeded. Please slow down.")
+def _make_backend():
+    url = os.environ.get("RATE_LIMIT_REDIS_URL")
+    if url:
+        return RedisBackend(url)
+    # swept by RateLimiter.sweep_forever (started in main.py), not on the request path
+    return LocalBackend(inline_sweep=False)
 
-        q.append(now)
 
-limiter = RateLimiter()
+limiter = RateLimiter(_make_backend())
@@ -0,0 +1,50 @@
+# backend/security/raw_store.py
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class RawClauseStore:
+    """
+    Unmasked clause text, kept apart from the retrieval store (which only
+    holds redacted text). Nothing on the request path reads it; access is
+    explicit, per contract. Off by default (enabled=False keeps no raw text
+    at all); when on, at most max_contracts contracts are kept (least
+    recently written first out), and a contract's raw text is dropped when
+    it is re-indexed (subscribe drop() to ContractStore) until the new
+    version's text is put.
+    """
+
+    def __init__(self, enabled: bool = False, max_contracts: int = 100):
+        self.enabled = enabled
+        self.max_contracts = max(1, max_contracts)
+        self._data: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, contract_id: str, raw_by_clause: Dict[str, str]) -> None:
+        """
+        Replace the raw text of a contract (clause_id -> text).
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._data[contract_id] = dict(raw_by_clause)
+            self._data.move_to_end(contract_id)
+            while len(self._data) > self.max_contracts:
+                self._data.popitem(last=False)
+
+    def get(self, contract_id: str, clause_id: str) -> Optional[str]:
+        with self._lock:
+            return self._data.get(contract_id, {}).get(clause_id)
+
+    def drop(self, contract_id: str) -> None:
+        with self._lock:
+            self._data.pop(contract_id, None)
+
+    def __contains__(self, contract_id: str) -> bool:
+        with self._lock:
+            return contract_id in self._data
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,63 @@
+# backend/security/tenants.py
+import hashlib
+import hmac
+from typing import Dict, Optional
+
+
+class TenantAuthError(ValueError):
+    """Missing or unknown API key for a tenant-scoped endpoint (HTTP 401)."""
+
+
+def parse_tenant_keys(spec: str) -> Dict[str, str]:
+    """
+    "key1:tenant_a,key2:tenant_b" -> {key: tenant}. Blank entries are ignored.
+    """
+    keys = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        key, sep, tenant = item.partition(":")
+        if not sep or not key.strip() or not tenant.strip():
+            raise ValueError(f"Bad TENANT_API_KEYS entry (expected key:tenant): {item[:4]}...")
+        keys[key.strip()] = tenant.strip()
+    return keys
+
+
+class TenantKeys:
+    """
+    Server-side API key -> tenant mapping. The tenant of a request is never
+    taken from the client: without a known key there is no tenant, and
+    tenant-scoped data (the portfolio clause index) is not reachable.
+    """
+
+    def __init__(self, keys: Dict[str, str]):
+        # only digests are kept; lookups compare in constant time
+        self._keys = {self._digest(k): t for k, t in keys.items()}
+
+    @staticmethod
+    def _digest(key: str) -> bytes:
+        return hashlib.sha256(key.encode("utf-8")).digest()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._keys)
+
+    def tenant_for(self, api_key: Optional[str]) -> Optional[str]:
+        """
+        Tenant of a key, or None (no key / unknown key).
+        """
+        if not api_key:
+            return None
+        d = self._digest(api_key)
+        tenant = None
+        for digest, t in self._keys.items():
+            if hmac.compare_digest(digest, d):
+                tenant = t
+        return tenant
+
+    def require(self, api_key: Optional[str]) -> str:
+        tenant = self.tenant_for(api_key)
+        if tenant is None:
+            raise TenantAuthError("A valid X-API-Key is required for this endpoint.")
+        return tenant
@@ -1,5 +1,7 @@
 import re
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List
+
+from utils.metrics import metrics
 
 # ----------------------------
 # 1) Clean noisy PDF artifacts
@@ -126,97 +128,154 @@ def _chunk_text(body: str, max_chunk: int = 700, hard_max: int = 1100) -> List[s
 
 
 # ----------------------------
-# 4) Main splitter
+# 4) Main splitter (streaming)
 # ----------------------------
-def split_into_clauses(
-    text: str,
-    max_chunk: int = 1400,
-    hard_max: int = 2200,
-    min_chunk: int = 200
-) -> List[Dict[str, str]]:
+def _paragraph_clauses(text: str, max_chunk: int, hard_max: int, min_chunk: int) -> List[Dict[str, str]]:
     """
-    Returns list of {clause_id, clause_text}
-    - Detect headings (Article/المادة/numbering)
-    - For each section, chunk its body into smaller pieces
+    Fallback when the document has no headings: paragraphs, then chunks.
     """
+    paras = [p.strip() for p in text.split("\n\n") if p.strip()]
+    out = []
+    idx = 1
+    for p in paras:
+        for chunk in _chunk_text(p, max_chunk=max_chunk, hard_max=hard_max):
+            if len(chunk) < min_chunk:
+                # attach small chunk to previous clause instead of dropping it
+                if out:
+                    out[-1]["clause_text"] += "\n" + chunk
+                else:
+                    # first chunk, keep it
+                    out.append({"clause_id": f"P{idx:03d}", "clause_text": chunk})
+                    idx += 1
+                continue
 
-    text = _clean_text(text)
-
-    # If no headings found, fallback: paragraphs then chunk them
-    if not CLAUSE_HEAD_RE.search(text):
-        paras = [p.strip() for p in text.split("\n\n") if p.strip()]
-        out = []
-        idx = 1
-        for p in paras:
-            for chunk in _chunk_text(p, max_chunk=max_chunk, hard_max=hard_max):
-                if len(chunk) < min_chunk:
-                    # attach small chunk to previous clause instead of dropping it
-                    if out:
-                        out[-1]["clause_text"] += "\n" + chunk
-                    else:
-                        # first chunk, keep it
-                        out.append({"clause_id": f"P{idx:03d}", "clause_text": chunk})
-                        idx += 1
-                    continue
-
-                out.append({"clause_id": f"P{idx:03d}", "clause_text": chunk})
-                idx += 1
-        return out
-
-    # Split while keeping headings
-    parts = CLAUSE_HEAD_RE.split(text)
-    # parts = [pre, head1, body1, head2, body2, ...]
-
-    clauses: List[Dict[str, str]] = []
-    article_idx = 1
+            out.append({"clause_id": f"P{idx:03d}", "clause_text": chunk})
+            idx += 1
+    return out
 
-    # Handle possible text before first heading
-    pre = parts[0].strip()
-    if pre:
-        for chunk in _chunk_text(pre, max_chunk=max_chunk, hard_max=hard_max):
-            if len(chunk) >= min_chunk:
-                clauses.append({"clause_id": f"PRE-{article_idx:03d}", "clause_text": chunk})
-                article_idx += 1
-
-    for i in range(1, len(parts) - 1, 2):
-        head = (parts[i] or "").strip()
-        body = (parts[i + 1] or "").strip()
-        if not body:
-            continue
 
-        # Normalize head -> stable ID like A001
-        base_id = f"A{article_idx:03d}"
-        article_idx += 1
+def _section_clauses(
+    clauses: List[Dict[str, str]], head: str, body: str, base_id: str,
+    max_chunk: int, hard_max: int, min_chunk: int,
+) -> None:
+    """
+    Append the clauses of one heading section; short ones are merged into
+    the previous clause (clauses[-1]).
+    """
+    chunks = _chunk_text(body, max_chunk=max_chunk, hard_max=hard_max)
 
-        # chunk the body
-        chunks = _chunk_text(body, max_chunk=max_chunk, hard_max=hard_max)
+    if not chunks:
+        return
 
-        if not chunks:
-            continue
+    # If body is short, keep single clause including head
+    if len(chunks) == 1:
+        clause_text = f"{head}\n{chunks[0]}".strip()
+        if len(clause_text) < min_chunk:
+            if clauses:
+                clauses[-1]["clause_text"] += "\n" + clause_text
+            else:
+                clauses.append({"clause_id": base_id, "clause_text": clause_text})
+        else:
+            clauses.append({"clause_id": base_id, "clause_text": clause_text})
 
-        # If body is short, keep single clause including head
-        if len(chunks) == 1:
-            clause_text = f"{head}\n{chunks[0]}".strip()
+    else:
+        # multiple chunks: A001-01, A001-02...
+        for j, c in enumerate(chunks, start=1):
+            clause_text = f"{head}\n{c}".strip()
             if len(clause_text) < min_chunk:
                 if clauses:
                     clauses[-1]["clause_text"] += "\n" + clause_text
                 else:
-                    clauses.append({"clause_id": base_id, "clause_text": clause_text})
-            else:
-                clauses.append({"clause_id": base_id, "clause_text": clause_text})
+                    clauses.append({"clause_id": f"{base_id}-{j:02d}", "clause_text": clause_text})
+                continue
 
-        else:
-            # multiple chunks: A001-01, A001-02...
-            for j, c in enumerate(chunks, start=1):
-                clause_text = f"{head}\n{c}".strip()
-                if len(clause_text) < min_chunk:
-                    if clauses:
-                        clauses[-1]["clause_text"] += "\n" + clause_text
-                    else:
-                        clauses.append({"clause_id": f"{base_id}-{j:02d}", "clause_text": clause_text})
-                    continue
+            clauses.append({"clause_id": f"{base_id}-{j:02d}", "clause_text": clause_text})
+
+
+def iter_clauses(
+    pages: Iterable[str],
+    sep: str = "\n\n",
+    max_chunk: int = 1400,
+    hard_max: int = 2200,
+    min_chunk: int = 200,
+) -> Iterator[Dict[str, str]]:
+    """
+    Streaming split_into_clauses over page texts (joined with `sep`).
+
+    Each page is cleaned on arrival. A heading section is final once the
+    next heading has been seen, so clauses are yielded while later pages
+    are still being read; the latest clause is held back because a short
+    clause after it is merged into it. Documents without any heading fall
+    back to paragraph mode at the end.
+    """
+    buf = ""                # cleaned text from the last (unfinished) heading on
+    headed = False
+    article_idx = 1
+    held: List[Dict[str, str]] = []
+
+    def sections(final: bool):
+        nonlocal buf
+        matches = list(CLAUSE_HEAD_RE.finditer(buf))
+        done = matches if final else matches[:-1]
+        for m, nxt in zip(done, matches[1:] + [None]):
+            body = buf[m.end(): nxt.start() if nxt else len(buf)]
+            yield (m.group(1) or "").strip(), body.strip()
+        if not final and matches:
+            buf = buf[matches[-1].start():]
+
+    def take(final: bool):
+        nonlocal article_idx
+        for head, body in sections(final):
+            if not body:
+                continue
+            # Normalize head -> stable ID like A001
+            base_id = f"A{article_idx:03d}"
+            article_idx += 1
+            _section_clauses(held, head, body, base_id, max_chunk, hard_max, min_chunk)
+
+    for page in pages:
+        with metrics.timer("clean"):
+            page = _clean_text(page)
+        if not page:
+            continue
+        buf = page if not buf else buf + sep + page
 
-                clauses.append({"clause_id": f"{base_id}-{j:02d}", "clause_text": clause_text})
+        with metrics.timer("split"):
+            if not headed:
+                m = CLAUSE_HEAD_RE.search(buf)
+                if not m:
+                    continue
+                headed = True
+                # Handle possible text before first heading
+                pre = buf[:m.start()].strip()
+                if pre:
+                    for chunk in _chunk_text(pre, max_chunk=max_chunk, hard_max=hard_max):
+                        if len(chunk) >= min_chunk:
+                            held.append({"clause_id": f"PRE-{article_idx:03d}", "clause_text": chunk})
+                            article_idx += 1
+                buf = buf[m.start():]
+
+            take(final=False)
+        while len(held) > 1:
+            yield held.pop(0)
+
+    with metrics.timer("split"):
+        if not headed:
+            held = _paragraph_clauses(buf, max_chunk, hard_max, min_chunk)
+        else:
+            take(final=True)
+    yield from held
 
 
-    return clauses
+def split_into_clauses(
+    text: str,
+    max_chunk: int = 1400,
+    hard_max: int = 2200,
+    min_chunk: int = 200
+) -> List[Dict[str, str]]:
+    """
+    Returns list of {clause_id, clause_text}
+    - Detect headings (Article/المادة/numbering)
+    - For each section, chunk its body into smaller pieces
+    """
+    return list(iter_clauses([text], max_chunk=max_chunk, hard_max=hard_max, min_chunk=min_chunk))
@@ -0,0 +1,205 @@
+# backend/services/ocr.py
+import hashlib
+import io
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Iterator, Optional
+
+from services.parser import tidy_page_text
+from utils.metrics import metrics
+
+try:
+    import pytesseract  # optional: needs the tesseract binary + language data
+except ImportError:
+    pytesseract = None
+
+MIN_PAGE_CHARS = 20         # less embedded text than this (and an image) -> scanned page
+OCR_DPI = 300
+OCR_LANGS = "ara+eng"
+
+
+def _ocr_png(png: bytes, langs: str, deadline: float) -> Optional[str]:
+    """
+    Worker (runs in a pool process): Tesseract on one rendered page.
+    deadline (time.time()) is the document's OCR budget: Tesseract is killed
+    when it passes, and jobs that start after it do not run. None = out of budget.
+    """
+    from PIL import Image
+
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return None
+    with Image.open(io.BytesIO(png)) as img:
+        try:
+            return pytesseract.image_to_string(img, lang=langs, timeout=remaining)
+        except RuntimeError as e:
+            if "timeout" in str(e).lower():
+                return None
+            raise
+
+
+class PageOCR:
+    """
+    OCR fallback for scanned PDF pages, used by services.parser.iter_pdf_pages.
+
+    Pages with fewer than min_chars of embedded text that carry an image are
+    rendered and OCR'd on a process pool, up to `workers` pages ahead of the
+    consumer, so page order is kept while pages run in parallel. Results
+    are cached by hash of the rendered page image. Each document gets
+    budget_s seconds of OCR; pages not done by then keep their embedded
+    text, and their jobs stop too (Tesseract timeout in the worker), so a
+    slow document cannot hold workers into the next one's budget.
+    enabled=False (or no pytesseract) turns the stage off. close() on shutdown.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        langs: str = OCR_LANGS,
+        workers: int = 2,
+        budget_s: float = 60.0,
+        dpi: int = OCR_DPI,
+        min_chars: int = MIN_PAGE_CHARS,
+        cache_size: int = 512,
+    ):
+        self.enabled = enabled
+        self.langs = langs
+        self.workers = max(1, workers)
+        self.budget_s = budget_s
+        self.dpi = dpi
+        self.min_chars = min_chars
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and pytesseract is not None
+
+    # -------------------------
+    # Cache (page-image hash -> text)
+    # -------------------------
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._cache.get(key)
+            if text is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def _cache_put(self, key: str, text: str) -> None:
+        with self._lock:
+            self._cache[key] = text
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {"cache_entries": len(self._cache), "cache_hits": self.hits, "cache_misses": self.misses}
+
+    # -------------------------
+    # Pages
+    # -------------------------
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: the server process holds model threads, forking it is unsafe
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def close(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def needs_ocr(self, text: str, page) -> bool:
+        return len(text.strip()) < self.min_chars and bool(page.get_images())
+
+    def _submit(self, page, inflight: Dict[str, Future], deadline: float):
+        """
+        Render the page; cached text (str) or (key, Future). Identical page
+        images in the same document share one OCR job.
+        """
+        png = page.get_pixmap(dpi=self.dpi).tobytes("png")
+        key = hashlib.sha256(png + self.langs.encode()).hexdigest()
+        cached = self._cache_get(key)
+        if cached is not None:
+            metrics.inc("ocr_pages_total", result="cached")
+            return cached
+        if key not in inflight:
+            # the worker gets the deadline on the wall clock (monotonic clocks are per process)
+            wall_deadline = time.time() + (deadline - time.monotonic())
+            inflight[key] = self._executor().submit(_ocr_png, png, self.langs, wall_deadline)
+        return key, inflight[key]
+
+    def _resolve(self, item, deadline: float) -> str:
+        text, pending = item
+        if pending is None:
+            return text
+        if isinstance(pending, str):
+            return tidy_page_text(pending).strip() or text
+        key, future = pending
+        try:
+            out = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeout:
+            # not started: dropped; running: Tesseract hits the same deadline in the worker
+            future.cancel()
+            metrics.inc("ocr_pages_total", result="budget")
+            return text
+        except Exception:
+            metrics.inc("ocr_pages_total", result="error")
+            return text
+        if out is None:
+            metrics.inc("ocr_pages_total", result="budget")
+            return text
+        self._cache_put(key, out)
+        metrics.inc("ocr_pages_total", result="ok")
+        return tidy_page_text(out).strip() or text
+
+    def pages(self, doc, page_text: Callable) -> Iterator[str]:
+        """
+        Text of each page of an open fitz document, in order, OCR'ing
+        low-text pages. page_text(page) gives the embedded text.
+        """
+        deadline = time.monotonic() + self.budget_s
+        window: deque = deque()     # (embedded text, None | cached str | (key, Future))
+        inflight: Dict[str, Future] = {}
+
+        def ready(item) -> bool:
+            pending = item[1]
+            return not isinstance(pending, tuple) or pending[1].done()
+
+        try:
+            for page in doc:
+                text = page_text(page)
+                pending = None
+                if self.needs_ocr(text, page):
+                    if time.monotonic() < deadline:
+                        pending = self._submit(page, inflight, deadline)
+                    else:
+                        metrics.inc("ocr_pages_total", result="budget")
+                window.append((text, pending))
+                while window and (len(window) > self.workers or ready(window[0])):
+                    yield self._resolve(window.popleft(), deadline)
+
+            while window:
+                yield self._resolve(window.popleft(), deadline)
+        finally:
+            # consumer stopped early or budget spent: drop this document's jobs
+            # not started yet (running ones stop at the deadline)
+            for future in inflight.values():
+                future.cancel()
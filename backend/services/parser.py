@@ -1,47 +1,83 @@
+import io
 import fitz  # PyMuPDF
 from docx import Document
 
 import re
+from typing import Iterator, Union
 
+Source = Union[str, bytes]   # path of a spooled upload, or the raw bytes
 
-def extract_text_pdf(file_bytes: bytes) -> str:
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    pages_out = []
 
-    for page in doc:
-        d = page.get_text("dict")
+def iter_pdf_pages(source: Source, ocr=None) -> Iterator[str]:
+    """
+    Text of each page, as the page is read. PyMuPDF reads a path lazily
+    (page by page) instead of from a bytes copy.
+    ocr: optional services.ocr.PageOCR; pages with (almost) no embedded
+    text are OCR'd instead.
+    """
+    doc = fitz.open(source) if isinstance(source, str) else fitz.open(stream=source, filetype="pdf")
+    try:
+        if ocr is not None and ocr.available:
+            yield from ocr.pages(doc, _page_text)
+        else:
+            yield from (_page_text(page) for page in doc)
+    finally:
+        doc.close()
 
-        lines_out = []
 
-        for block in d.get("blocks", []):
-            # only text blocks
-            if block.get("type") != 0:
+def tidy_page_text(page_text: str) -> str:
+    # light cleanup
+    page_text = re.sub(r"[ \t]+", " ", page_text)
+    page_text = re.sub(r"\n{3,}", "\n\n", page_text)
+    return page_text
+
+
+def _page_text(page) -> str:
+    d = page.get_text("dict")
+
+    lines_out = []
+
+    for block in d.get("blocks", []):
+        # only text blocks
+        if block.get("type") != 0:
+            continue
+
+        for line in block.get("lines", []):
+            # each line has spans; join spans in their natural order
+            spans = line.get("spans", [])
+            if not spans:
                 continue
 
-            for line in block.get("lines", []):
-                # each line has spans; join spans in their natural order
-                spans = line.get("spans", [])
-                if not spans:
-                    continue
+            line_text = "".join(s.get("text", "") for s in spans).strip()
+            if line_text:
+                lines_out.append(line_text)
+
+    return tidy_page_text("\n".join(lines_out))
+
 
-                line_text = "".join(s.get("text", "") for s in spans).strip()
-                if line_text:
-                    lines_out.append(line_text)
+def extract_text_pdf(source: Source, ocr=None) -> str:
+    return "\n\n".join(iter_pdf_pages(source, ocr=ocr)).strip()
 
-        page_text = "\n".join(lines_out)
 
-        # light cleanup
-        page_text = re.sub(r"[ \t]+", " ", page_text)
-        page_text = re.sub(r"\n{3,}", "\n\n", page_text)
+DOCX_BLOCK_PARAS = 50
 
-        pages_out.append(page_text)
 
-    return "\n\n".join(pages_out).strip()
+def iter_docx_blocks(source: Source, block: int = DOCX_BLOCK_PARAS) -> Iterator[str]:
+    """
+    Non-empty paragraphs, `block` at a time, newline-joined. DOCX has no
+    pages; blocks play that role for the streaming splitter.
+    """
+    doc = Document(source if isinstance(source, str) else io.BytesIO(source))
+    paras = []
+    for p in doc.paragraphs:
+        if p.text and p.text.strip():
+            paras.append(p.text)
+            if len(paras) == block:
+                yield "\n".join(paras)
+                paras = []
+    if paras:
+        yield "\n".join(paras)
 
 
-def extract_text_docx(file_bytes: bytes) -> str:
-    import io
-    f = io.BytesIO(file_bytes)
-    doc = Document(f)
-    paras = [p.text for p in doc.paragraphs if p.text and p.text.strip()]
-    return "\n".join(paras).strip()
+def extract_text_docx(source: Source) -> str:
+    return "\n".join(iter_docx_blocks(source)).strip()
@@ -0,0 +1,90 @@
+import queue
+import threading
+from concurrent.futures import Executor
+from typing import Iterable, Iterator, List, TypeVar
+
+from utils.metrics import metrics
+
+T = TypeVar("T")
+
+PREFETCH_DEPTH = 4      # batches a producer may run ahead of its consumer
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, exc: BaseException):
+        self.exc = exc
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    batch: List[T] = []
+    for x in items:
+        batch.append(x)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def timed(items: Iterable[T], stage: str, **labels) -> Iterator[T]:
+    """
+    Yield from `items`, timing each step under metrics stage `stage`.
+    """
+    it = iter(items)
+    while True:
+        with metrics.timer(stage, **labels):
+            x = next(it, _DONE)
+        if x is _DONE:
+            return
+        yield x
+
+
+def prefetch(items: Iterable[T], pool: Executor, depth: int = PREFETCH_DEPTH) -> Iterator[T]:
+    """
+    Run the `items` generator on a pool thread, at most `depth` items ahead
+    of the caller, so the producing stage overlaps with the consuming one.
+    Exceptions are re-raised in the caller; closing the returned iterator
+    early stops (and closes) the producer.
+    """
+    q: "queue.Queue" = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(x) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(x, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        it = iter(items)
+        try:
+            for x in it:
+                if not put(x):
+                    break
+            else:
+                put(_DONE)
+        except BaseException as e:
+            put(_Failed(e))
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    future = pool.submit(produce)
+    try:
+        while True:
+            x = q.get()
+            if x is _DONE:
+                return
+            if isinstance(x, _Failed):
+                raise x.exc
+            yield x
+    finally:
+        stop.set()
+        if not future.cancel():
+            future.result()
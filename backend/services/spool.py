@@ -0,0 +1,72 @@
+import os
+import tempfile
+import zipfile
+from typing import Optional, Tuple
+
+import fitz  # PyMuPDF
+
+CHUNK_BYTES = 1 << 20          # 1 MB
+PDF_MAGIC_WINDOW = 1024        # "%PDF-" may follow a little leading junk
+
+
+class UploadRejected(ValueError):
+    """Upload refused before parsing; status is the HTTP status to return."""
+
+    def __init__(self, message: str, status: int, reason: str):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+
+
+async def spool_upload(upload, max_bytes: int) -> Tuple[str, int]:
+    """
+    Copy an UploadFile to a temp file in CHUNK_BYTES pieces, never holding
+    more than one chunk in memory. Stops as soon as max_bytes is exceeded.
+    Returns (path, size); the caller deletes the file.
+    """
+    fd, path = tempfile.mkstemp(prefix="upload_")
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadRejected(f"File too large. Max {max_bytes // (1 << 20)} MB.", 413, "size")
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, size
+
+
+def sniff_format(path: str) -> Optional[str]:
+    """
+    "pdf" / "docx" from the file's bytes (not its name), else None.
+    """
+    with open(path, "rb") as f:
+        head = f.read(PDF_MAGIC_WINDOW)
+    if b"%PDF-" in head:
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as z:      # reads the central directory only
+                if "word/document.xml" in z.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            return None
+    return None
+
+
+def pdf_page_count(path: str) -> int:
+    """
+    Page count; a PDF that does not open (broken body behind a valid
+    header) raises UploadRejected (422).
+    """
+    try:
+        with fitz.open(path, filetype="pdf") as doc:
+            return doc.page_count
+    except RuntimeError as e:     # fitz.FileDataError / EmptyFileError subclass it
+        raise UploadRejected("The PDF file is corrupt or unreadable.", 422, "corrupt") from e
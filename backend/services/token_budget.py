@@ -0,0 +1,154 @@
+import re
+from functools import lru_cache
+from typing import List, Set, Tuple
+
+from ml.preprocess import normalize_arabic
+from services.chunker import SENT_SPLIT_RE
+
+# ----------------------------
+# 1) Token counting
+# ----------------------------
+# gpt-4o / gpt-4o-mini tokenizer. tiktoken is optional: without it we fall
+# back to a word-piece estimate (~4 chars per token for long words).
+TOKENIZER_ENCODING = "o200k_base"
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(TOKENIZER_ENCODING)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return sum(max(1, (len(p) + 3) // 4) for p in _PIECE_RE.findall(text))
+
+
+def tokenizer_name() -> str:
+    return TOKENIZER_ENCODING if _encoding() is not None else "estimate"
+
+
+# ----------------------------
+# 2) Near-duplicate detection
+# ----------------------------
+def _shingles(text: str, n: int = 5) -> Set[int]:
+    t = re.sub(r"\s+", " ", normalize_arabic(text.lower())).strip()
+    if len(t) <= n:
+        return {hash(t)}
+    return {hash(t[i:i + n]) for i in range(len(t) - n + 1)}
+
+
+def _jaccard(a: Set[int], b: Set[int]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def drop_near_duplicates(hits: List[dict], text_key: str, threshold: float = 0.85) -> Tuple[List[dict], int]:
+    """
+    Keep hits in rank order, dropping any whose text is a near-duplicate
+    (char 5-gram Jaccard >= threshold) of an already kept one.
+    """
+    kept, kept_sh = [], []
+    dropped = 0
+    for h in hits:
+        sh = _shingles(h.get(text_key) or "")
+        if any(_jaccard(sh, k) >= threshold for k in kept_sh):
+            dropped += 1
+            continue
+        kept.append(h)
+        kept_sh.append(sh)
+    return kept, dropped
+
+
+# ----------------------------
+# 3) Query-aware trimming
+# ----------------------------
+def _terms(text: str) -> Set[str]:
+    return {w for w in re.findall(r"\w+", normalize_arabic((text or "").lower())) if len(w) >= 3}
+
+
+def trim_to_budget(text: str, query: str, max_tokens: int) -> str:
+    """
+    Cut text to max_tokens at sentence boundaries, keeping the window of
+    sentences around the one that overlaps the query the most.
+    """
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    sents = [s.strip() for s in SENT_SPLIT_RE.split(text) if s and s.strip()]
+    if not sents:
+        return text
+
+    q_terms = _terms(query)
+    overlaps = [len(q_terms & _terms(s)) for s in sents]
+    anchor = max(range(len(sents)), key=lambda i: overlaps[i])  # first best on ties
+    sizes = [count_tokens(s) + 1 for s in sents]
+
+    lo, hi = anchor, anchor + 1
+    used = sizes[anchor]
+    if used > max_tokens:
+        # single sentence over budget -> keep its head
+        s = sents[anchor]
+        keep = max(1, int(len(s) * max_tokens / used))
+        return s[:keep].rstrip() + " …"
+
+    # grow the window, preferring the side with more query overlap
+    while True:
+        left = lo - 1 if lo > 0 and used + sizes[lo - 1] <= max_tokens else None
+        right = hi if hi < len(sents) and used + sizes[hi] <= max_tokens else None
+        if left is None and right is None:
+            break
+        if right is None or (left is not None and overlaps[left] > overlaps[right]):
+            lo = left
+            used += sizes[left]
+        else:
+            hi += 1
+            used += sizes[right]
+
+    out = " ".join(sents[lo:hi])
+    if lo > 0:
+        out = "… " + out
+    if hi < len(sents):
+        out = out + " …"
+    return out
+
+
+# ----------------------------
+# 4) Fitting hits into a budget
+# ----------------------------
+MIN_SNIPPET_TOKENS = 40
+
+
+def fit_hits(hits: List[dict], text_key: str, query: str, budget: int, header_fn) -> Tuple[List[dict], int, int]:
+    """
+    Greedy in rank order: each hit gets a fair share of what is left
+    (remaining budget / remaining hits), unused share rolls over.
+    Returns (fitted_hits, tokens_used, trimmed_count).
+    """
+    out: List[dict] = []
+    used = 0
+    trimmed = 0
+    for i, h in enumerate(hits):
+        remaining = budget - used
+        header = count_tokens(header_fn(h)) + 1
+        share = max(MIN_SNIPPET_TOKENS, remaining // (len(hits) - i) - header)
+        if remaining - header < MIN_SNIPPET_TOKENS or share <= 0:
+            break
+
+        text = h.get(text_key) or ""
+        short = trim_to_budget(text, query, min(share, remaining - header))
+        if short != text:
+            trimmed += 1
+        out.append({**h, text_key: short})
+        used += header + count_tokens(short) + 1
+    return out, used, trimmed
@@ -0,0 +1,117 @@
+import json
+import re
+from typing import Any, Dict, Iterator, List, Optional
+
+# ----------------------------
+# Tolerant JSON helpers for LLM output
+# ----------------------------
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def strip_fences(raw: str) -> str:
+    return _FENCE_RE.sub("", (raw or "").strip()).strip()
+
+
+def loads_lenient(text: str):
+    """
+    json.loads, retrying once with trailing commas removed.
+    """
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", text))
+
+
+def _scan_value_end(raw: str, start: int) -> Optional[int]:
+    """
+    Given raw[start] == "{" or "[", return the index just past the matching
+    closing bracket, or None if the value is truncated.
+    String-aware (brackets inside strings and escapes are ignored).
+    """
+    depth = 0
+    in_str = False
+    esc = False
+    for i in range(start, len(raw)):
+        ch = raw[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == '"':
+                in_str = False
+            continue
+        if ch == '"':
+            in_str = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return None
+
+
+def iter_array_items(raw: str, key: str) -> Iterator[Any]:
+    """
+    Yield every complete, parseable element of the array stored under
+    "key" (first occurrence), even if the document is cut off or broken
+    further down. Elements that do not parse are skipped.
+    """
+    m = re.search(r'"%s"\s*:\s*\[' % re.escape(key), raw)
+    if not m:
+        return
+
+    i = m.end()
+    n = len(raw)
+    while i < n:
+        # skip whitespace / commas between elements
+        while i < n and raw[i] in " \t\r\n,":
+            i += 1
+        if i >= n or raw[i] == "]":
+            return
+        if raw[i] not in "{[":
+            # scalar element or garbage -> give up on this array
+            return
+        end = _scan_value_end(raw, i)
+        if end is None:
+            return  # truncated element
+        try:
+            yield loads_lenient(raw[i:end])
+        except (json.JSONDecodeError, ValueError):
+            pass
+        i = end
+
+
+def read_string_field(raw: str, key: str) -> Optional[str]:
+    m = re.search(r'"%s"\s*:\s*"((?:[^"\\]|\\.)*)"' % re.escape(key), raw)
+    if not m:
+        return None
+    try:
+        return json.loads('"%s"' % m.group(1))
+    except json.JSONDecodeError:
+        return None
+
+
+def salvage_summary(raw: str) -> Dict[str, Any]:
+    """
+    Best-effort recovery of a SUMMARY_SCHEMA object from truncated or
+    malformed model output: keeps every complete overview item and section.
+    """
+    raw = strip_fences(raw)
+    overview: List[dict] = [
+        o for o in iter_array_items(raw, "overview")
+        if isinstance(o, dict) and isinstance(o.get("text"), str)
+    ]
+    sections: List[dict] = [
+        s for s in iter_array_items(raw, "sections")
+        if isinstance(s, dict) and isinstance(s.get("bullets"), list)
+    ]
+    return {
+        "mode": read_string_field(raw, "mode"),
+        "language": read_string_field(raw, "language"),
+        "overview": overview,
+        "sections": sections,
+    }
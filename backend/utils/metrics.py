@@ -0,0 +1,219 @@
+import bisect
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# ----------------------------
+# Hot-path instrumentation (Prometheus text format at /metrics)
+# ----------------------------
+# METRICS_LEVEL:       "off" | "basic" (counters + stage timers) | "debug" (+ sampled debug logs)
+# METRICS_SAMPLE_RATE: fraction of stage timings / debug events recorded (0..1)
+#
+# Nothing here logs contract text; debug events carry sizes and counts only.
+
+# every name metrics.timer() accepts; stage_totals() reports all of them (zeros until used)
+STAGES = (
+    "extract", "clean", "split", "redact", "classify", "embed", "index",
+    "retrieve", "rerank", "translate", "generate",
+)
+
+LEVELS = {"off": 0, "basic": 1, "debug": 2}
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger("daleel.metrics")
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: dict) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    body = ",".join('%s="%s"' % (k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """
+    Counters, histograms and stage timers kept in memory; render() emits the
+    Prometheus text exposition format. Collectors registered with
+    register_collector() are called at scrape time and return gauges.
+    """
+
+    def __init__(self, level: str = "basic", sample_rate: float = 1.0, prefix: str = "daleel"):
+        self.level = LEVELS.get(level, 1)
+        self.sample_rate = max(0.0, min(1.0, sample_rate))
+        self.prefix = prefix
+
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, _Histogram]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Tuple[str, Callable[[], Dict[str, float]]]] = []
+        self._lock = threading.Lock()
+
+    # -------------------------
+    # Recording
+    # -------------------------
+
+    def enabled(self, level: str = "basic") -> bool:
+        return self.level >= LEVELS[level]
+
+    def sampled(self) -> bool:
+        return self.level > 0 and (self.sample_rate >= 1.0 or random.random() < self.sample_rate)
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        if not self.level:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, buckets: Iterable[float] = DEFAULT_BUCKETS, **labels) -> None:
+        if not self.level:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = _Histogram(tuple(buckets))
+            h.observe(value)
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        """
+        with metrics.timer("embed"): ...
+        Records stage_seconds{stage=...} for a sampled fraction of calls and
+        counts every call (stage_calls_total) so rates stay exact.
+        stage must be one of STAGES.
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown metrics stage: {stage!r} (add it to STAGES)")
+        if not self.level:
+            yield
+            return
+        sampled = self.sampled()
+        t0 = time.perf_counter() if sampled else 0.0
+        try:
+            yield
+        finally:
+            self.inc("stage_calls_total", stage=stage, **labels)
+            if sampled:
+                self.observe("stage_seconds", time.perf_counter() - t0, stage=stage, **labels)
+
+    def debug(self, event: str, **fields) -> None:
+        """
+        Sampled structured debug event (sizes / counts only, never text).
+        """
+        if self.level >= LEVELS["debug"] and self.sampled():
+            logger.debug("%s %s", event, fields)
+
+    def describe(self, name: str, text: str) -> None:
+        self._help[name] = text
+
+    def register_collector(self, name: str, fn: Callable[[], Dict[str, float]]) -> None:
+        """
+        fn() -> {"suffix": value}; exported as gauges <prefix>_<name>_<suffix>.
+        """
+        self._collectors.append((name, fn))
+
+    def stage_totals(self) -> Dict[str, dict]:
+        """
+        stage -> {"calls", "sampled", "seconds"} summed over all label sets.
+        """
+        out: Dict[str, dict] = {stage: {"calls": 0, "sampled": 0, "seconds": 0.0} for stage in STAGES}
+        with self._lock:
+            for key, n in self._counters.get("stage_calls_total", {}).items():
+                stage = dict(key)["stage"]
+                out.setdefault(stage, {"calls": 0, "sampled": 0, "seconds": 0.0})["calls"] += n
+            for key, h in self._histograms.get("stage_seconds", {}).items():
+                t = out.setdefault(dict(key)["stage"], {"calls": 0, "sampled": 0, "seconds": 0.0})
+                t["sampled"] += h.count
+                t["seconds"] += h.sum
+        return out
+
+    # -------------------------
+    # Export
+    # -------------------------
+
+    def render(self) -> str:
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            counters = {n: dict(s) for n, s in self._counters.items()}
+            histograms = {
+                n: {k: (h.buckets, list(h.counts), h.sum, h.count) for k, h in s.items()}
+                for n, s in self._histograms.items()
+            }
+
+        for name, series in sorted(counters.items()):
+            full = f"{p}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} counter")
+            for key, value in series.items():
+                lines.append(f"{full}{_fmt_labels(key)} {value:g}")
+
+        for name, series in sorted(histograms.items()):
+            full = f"{p}_{name}"
+            if name in self._help:
+                lines.append(f"# HELP {full} {self._help[name]}")
+            lines.append(f"# TYPE {full} histogram")
+            for key, (buckets, counts, total, count) in series.items():
+                cum = 0
+                for le, c in zip(buckets, counts):
+                    cum += c
+                    lines.append(f"{full}_bucket{_fmt_labels(key, ('le', f'{le:g}'))} {cum}")
+                lines.append(f"{full}_bucket{_fmt_labels(key, ('le', '+Inf'))} {count}")
+                lines.append(f"{full}_sum{_fmt_labels(key)} {total:g}")
+                lines.append(f"{full}_count{_fmt_labels(key)} {count}")
+
+        for name, fn in self._collectors:
+            try:
+                values = fn() or {}
+            except Exception:  # a broken collector must not break the scrape
+                logger.exception("metrics collector %s failed", name)
+                continue
+            for suffix, value in sorted(values.items()):
+                if not isinstance(value, (int, float)):
+                    continue  # skip None / nested dicts
+                full = f"{p}_{name}_{suffix}"
+                lines.append(f"# TYPE {full} gauge")
+                lines.append(f"{full} {float(value):g}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry(
+    level=os.environ.get("METRICS_LEVEL", "basic"),
+    sample_rate=float(os.environ.get("METRICS_SAMPLE_RATE", "1.0")),
+)
+metrics.describe("stage_seconds", "Wall time per pipeline stage (sampled).")
+metrics.describe("stage_calls_total", "Calls per pipeline stage.")
@@ -0,0 +1,205 @@
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.metrics import metrics
+
+# ----------------------------
+# Per-request traces for LangGraph nodes
+# ----------------------------
+# start_trace("ask") opens a trace for the current request; nodes wrapped with
+# traced() become spans recording wall time, LLM calls / tokens and
+# embed / search counts. Finished traces feed in-memory aggregates, the
+# node_seconds histogram in /metrics and (if TRACE_SINK_PATH is set) a
+# JSON-lines file for offline analysis.
+#
+# Worker threads do not inherit context variables: submit work with
+# contextvars.copy_context().run so it is attributed to the calling node.
+
+TRACE_SINK_PATH = os.environ.get("TRACE_SINK_PATH")
+
+_trace: ContextVar[Optional["Trace"]] = ContextVar("trace", default=None)
+_span: ContextVar[Optional[dict]] = ContextVar("trace_span", default=None)
+
+_COUNTERS = ("llm_calls", "prompt_tokens", "completion_tokens", "embed_calls", "embed_texts", "search_calls")
+
+
+def _new_span(name: str) -> dict:
+    return {"node": name, "ms": 0.0, **{c: 0 for c in _COUNTERS}}
+
+
+class Trace:
+    def __init__(self, name: str):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.started = time.time()
+        self.ms = 0.0
+        self.spans: List[dict] = []
+        # work done outside any node (e.g. the cache lookup before the graph)
+        self.root = _new_span("_request")
+        self.evidence: List[dict] = []     # token-budget reports (record_evidence)
+        self.lock = threading.Lock()
+
+    def add(self, span: Optional[dict], **counts) -> None:
+        span = span or self.root
+        with self.lock:
+            for k, v in counts.items():
+                span[k] += v
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            spans = [dict(s) for s in self.spans]
+            if any(self.root[c] for c in _COUNTERS):
+                spans.append(dict(self.root))
+            evidence = list(self.evidence)
+        totals = {c: sum(s[c] for s in spans) for c in _COUNTERS}
+        out = {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "started": round(self.started, 3),
+            "ms": round(self.ms, 2),
+            "nodes": [{**s, "ms": round(s["ms"], 2)} for s in spans],
+            "totals": totals,
+        }
+        if evidence:
+            out["evidence"] = evidence
+        return out
+
+
+# -------------------------
+# Aggregates
+# -------------------------
+
+_agg_lock = threading.Lock()
+_AGG: Dict[str, Dict[str, dict]] = {}   # trace name -> node -> totals
+_sink_lock = threading.Lock()
+
+
+def _aggregate(trace: Trace) -> None:
+    with _agg_lock:
+        nodes = _AGG.setdefault(trace.name, {})
+        for s in trace.spans + [{**trace.root, "ms": trace.ms, "node": "_total"}]:
+            a = nodes.setdefault(s["node"], {"count": 0, "ms": 0.0, "max_ms": 0.0, **{c: 0 for c in _COUNTERS}})
+            a["count"] += 1
+            a["ms"] += s["ms"]
+            a["max_ms"] = max(a["max_ms"], s["ms"])
+            for c in _COUNTERS:
+                a[c] += s[c]
+
+
+def trace_stats() -> Dict[str, Dict[str, dict]]:
+    """
+    trace name -> node -> {count, mean_ms, max_ms, llm_calls, tokens, ...}
+    ("_total" is the whole request, its counters are work outside nodes).
+    """
+    out = {}
+    with _agg_lock:
+        for name, nodes in _AGG.items():
+            out[name] = {
+                node: {**a, "ms": round(a["ms"], 2), "max_ms": round(a["max_ms"], 2), "mean_ms": round(a["ms"] / a["count"], 2)}
+                for node, a in nodes.items()
+            }
+    return out
+
+
+def _write_sink(record: dict) -> None:
+    if not TRACE_SINK_PATH:
+        return
+    line = json.dumps(record, ensure_ascii=False)
+    with _sink_lock:
+        with open(TRACE_SINK_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+# -------------------------
+# API
+# -------------------------
+
+@contextmanager
+def start_trace(name: str):
+    """
+    with start_trace("ask") as trace: ... ; trace.to_dict() for the debug field.
+    """
+    trace = Trace(name)
+    token = _trace.set(trace)
+    t0 = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        trace.ms = (time.perf_counter() - t0) * 1000
+        _trace.reset(token)
+        _aggregate(trace)
+        try:
+            _write_sink(trace.to_dict())
+        except OSError:
+            pass
+
+
+def traced(name: str, fn: Callable) -> Callable:
+    """
+    Wrap a graph node so each call becomes a span of the active trace.
+    """
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = _trace.get()
+        if trace is None:
+            return fn(*args, **kwargs)
+        span = _new_span(name)
+        token = _span.set(span)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            span["ms"] = (time.perf_counter() - t0) * 1000
+            _span.reset(token)
+            with trace.lock:
+                trace.spans.append(span)
+            metrics.observe("node_seconds", span["ms"] / 1000, graph=trace.name, node=name)
+    return wrapper
+
+
+def record_llm(resp: Any) -> None:
+    """
+    Count one LLM call and its token usage (chat.completions or responses API).
+    """
+    trace = _trace.get()
+    if trace is None:
+        return
+    usage = getattr(resp, "usage", None)
+    prompt = getattr(usage, "prompt_tokens", None) or getattr(usage, "input_tokens", None) or 0
+    completion = getattr(usage, "completion_tokens", None) or getattr(usage, "output_tokens", None) or 0
+    trace.add(_span.get(), llm_calls=1, prompt_tokens=int(prompt), completion_tokens=int(completion))
+
+
+def record_embed(n_texts: int) -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(_span.get(), embed_calls=1, embed_texts=n_texts)
+
+
+def record_evidence(report: dict) -> None:
+    """
+    Attach an evidence token-budget report (tokens before / after) to the
+    active trace, under the node that built it.
+    """
+    trace = _trace.get()
+    if trace is None:
+        return
+    span = _span.get()
+    with trace.lock:
+        trace.evidence.append({"node": span["node"] if span else "_request", **report})
+
+
+def record_search() -> None:
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(_span.get(), search_calls=1)
+
+
+metrics.describe("node_seconds", "Wall time per LangGraph node.")